@@ -1,5 +1,5 @@
 """Code Agent: Issue → plan → file discovery → patch → self-check → commit → PR."""
 
-from agents.code_agent.chain import CodeAgentChain, run_code_agent
+from agents.code_agent.chain import CodeAgentChain, arun_code_agent, run_code_agent
 
-__all__ = ["CodeAgentChain", "run_code_agent"]
+__all__ = ["CodeAgentChain", "arun_code_agent", "run_code_agent"]
@@ -2,17 +2,45 @@
 
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
+import asyncio
+import os
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
 from coding_agents.core.github import GitHubClient, get_issue_context
 from coding_agents.core.github.issues import IssueContext
-from coding_agents.core.git import GitRepo
-from coding_agents.core.llm import get_llm
+from coding_agents.core.git import GitRepo, WorktreePool
+from coding_agents.core.index import (
+    BM25Index,
+    FileSlice,
+    SymbolIndex,
+    bm25_available,
+    fuse_rankings,
+    slice_source,
+)
+from coding_agents.core.index.symbols import INDEX_DIR
+from coding_agents.core.llm import aclose_async_pools, get_llm
+from coding_agents.core.llm.base import StreamCapture
 from coding_agents.core.observability.langfuse import get_langfuse_client, trace_agent
-from coding_agents.core.prompts.code_agent import CODE_AGENT_PROMPTS
+from coding_agents.core.policies.iterations import IterationPolicy, StopReason
+from coding_agents.core.prompts import (
+    CODE_AGENT_BUDGET,
+    CODE_AGENT_PROMPTS,
+    BudgetReport,
+    Section,
+    get_token_counter,
+    prompt_token_budget,
+    render_prompt,
+)
+
+from agents.code_agent.checks import PreflightReport, preflight_config, run_preflight
+from agents.code_agent.edits import FULL_REWRITE_MAX_LINES, PatchConflictError, resolve_block
+from agents.code_agent.feedback import Feedback, FeedbackTimeouts, collect_feedback
+from agents.code_agent.file_blocks import DisallowedPathError, FileBlockParser, PatchBlock
+from agents.code_agent.speculative import speculate, variants
 
 
 @dataclass
@@ -49,17 +77,6 @@ def _parse_plan_output(text: str) -> tuple[str, list[str]]:
     return plan.strip(), [f for f in files if f and not f.startswith("#")]
 
 
-def _parse_patches(text: str, allowed_paths: set[str]) -> dict[str, str]:
-    """Extract FILE blocks; only allow paths in allowed_paths."""
-    out: dict[str, str] = {}
-    pattern = re.compile(r"---\s*FILE:\s*(.+?)\s*\n(.*?)(?=---\s*END FILE|---\s*FILE:|\Z)", re.DOTALL)
-    for m in pattern.finditer(text):
-        path = m.group(1).strip()
-        if path in allowed_paths:
-            out[path] = m.group(2).strip()
-    return out
-
-
 class CodeAgentChain:
     """Chain: read Issue → plan → file inventory → patch → self-check (no merge)."""
 
@@ -70,13 +87,62 @@ class CodeAgentChain:
         github_client: GitHubClient | None = None,
         llm_provider: str | None = None,
         max_iterations: int = 5,
+        use_cache: bool | None = None,
+        feedback_timeouts: FeedbackTimeouts | None = None,
+        candidates: int | None = None,
+        heartbeat: Callable[[], object] | None = None,
     ) -> None:
         self.repo_path = Path(repo_path)
         self.repo_full_name = repo_full_name
         self.gh = github_client or GitHubClient()
         self.git = GitRepo(self.repo_path)
-        self.llm = get_llm(provider=llm_provider, temperature=0.2)
+        self.llm_provider = llm_provider
+        self.use_cache = use_cache
+        self.llm = get_llm(provider=llm_provider, temperature=0.2, cache=use_cache)
         self.max_iterations = max_iterations
+        self.token_counter = get_token_counter(self.llm.model_name)
+        self.prompt_budget = prompt_token_budget(self.llm.model_name)
+        self._index: SymbolIndex | None = None
+        self._retrieval: BM25Index | None = None
+        self.feedback_timeouts = feedback_timeouts or FeedbackTimeouts.from_env()
+        # Patch candidates sampled in parallel; 1 streams a single answer.
+        self.candidates = max(1, candidates or int(os.environ.get("CODING_AGENTS_CANDIDATES", "1")))
+        self._scratch: WorktreePool | None = None
+        # Called while waiting on CI/review, e.g. to refresh the lease on repo_path.
+        self.heartbeat = heartbeat or (lambda: None)
+        # Local checks before each push; failures get this many regeneration attempts.
+        self.preflight_tools, self.preflight_timeouts = preflight_config()
+        self.preflight_retries = int(os.environ.get("CODING_AGENTS_PREFLIGHT_RETRIES", "1"))
+        self._slices: dict[str, FileSlice] = {}
+        # Carried from the first pass into fix iterations.
+        self._plan = ""
+        self._changed: list[str] = []
+
+    @property
+    def index(self) -> SymbolIndex:
+        """Symbol/import-graph index of the working tree, refreshed on first use per run."""
+        if self._index is None:
+            self._index = SymbolIndex.open(self.repo_path, self.git)
+        return self._index
+
+    @property
+    def retrieval(self) -> BM25Index | None:
+        """BM25 index over repository chunks; None without numpy (symbol index only)."""
+        if self._retrieval is None and bm25_available():
+            self._retrieval = BM25Index.open(self.repo_path, self.git)
+        return self._retrieval
+
+    @property
+    def scratch(self) -> WorktreePool:
+        """Worktrees where patch candidates are checked without touching the checkout."""
+        if self._scratch is None:
+            root = self.repo_path / INDEX_DIR / "scratch"
+            self._scratch = WorktreePool(self.repo_path, size=self.candidates, root=root)
+        return self._scratch
+
+    def close(self) -> None:
+        """Release the checkout's long-lived git processes (see GitRepo.close)."""
+        self.git.close()
 
     def run(self, issue_id: int) -> CodeAgentResult:
         """Full flow: fetch issue, plan, file inventory, patch, commit, push, create PR."""
@@ -84,42 +150,280 @@ class CodeAgentChain:
         with trace_agent("code_agent_run", metadata=metadata) as trace:
             return self._run_impl(issue_id, trace)
 
+    async def arun(self, issue_id: int) -> CodeAgentResult:
+        """Async run(): awaits plan/patch model calls; git and GitHub I/O run in worker threads."""
+        metadata = {"issue_id": issue_id, "repo": self.repo_full_name, "agent": "code_agent"}
+        with trace_agent("code_agent_run", metadata=metadata) as trace:
+            ctx, file_inventory, prompt_plan, plan_report = await asyncio.to_thread(
+                self._plan_prompt, issue_id
+            )
+            plan_result = await self.llm.ainvoke(prompt_plan)
+            self._span(trace, "plan", plan_report, plan_result.metrics())
+            files_to_touch, prompt_patch, patch_report = await asyncio.to_thread(
+                self._patch_prompt, ctx, plan_result.content, file_inventory
+            )
+            if self.candidates > 1:
+                content, metrics = await self._speculate(prompt_patch, file_inventory, trace)
+            else:
+                patch_result = await self.llm.ainvoke(prompt_patch)
+                content, metrics = patch_result.content, patch_result.metrics()
+            self._span(trace, "patch", patch_report, metrics)
+            result = await asyncio.to_thread(
+                self._apply, issue_id, ctx, [content], set(file_inventory), trace
+            )
+            return await asyncio.to_thread(
+                self._iterate, issue_id, ctx, file_inventory, result, trace
+            )
+
     def _run_impl(self, issue_id: int, trace: Any) -> CodeAgentResult:
+        ctx, file_inventory, prompt_plan, plan_report = self._plan_prompt(issue_id)
+        plan_result = self.llm.invoke(prompt_plan)
+        self._span(trace, "plan", plan_report, plan_result.metrics())
+        files_to_touch, prompt_patch, patch_report = self._patch_prompt(
+            ctx, plan_result.content, file_inventory
+        )
+        if self.candidates > 1:
+            content, metrics = asyncio.run(
+                self._speculate(prompt_patch, file_inventory, trace, own_loop=True)
+            )
+            result = self._apply(issue_id, ctx, [content], set(file_inventory), trace)
+            self._span(trace, "patch", patch_report, metrics)
+        else:
+            patch_stream = StreamCapture(self.llm.stream(prompt_patch))
+            result = self._apply(issue_id, ctx, patch_stream, set(file_inventory), trace)
+            self._span(trace, "patch", patch_report, patch_stream.metrics())
+        return self._iterate(issue_id, ctx, file_inventory, result, trace)
+
+    async def _speculate(
+        self, prompt: str, file_inventory: list[str], trace: Any, own_loop: bool = False
+    ) -> tuple[str, dict[str, Any]]:
+        """Sample self.candidates patches concurrently; return the best answer and its metrics.
+
+        own_loop: running under the sync path's asyncio.run(); the shared adapters' async
+        pools are closed before that loop ends, so the next run opens them on its own loop.
+        """
+        allowed = set(file_inventory)
+        try:
+            winner, scored = await speculate(
+                prompt,
+                variants(self.candidates, self.llm_provider, self.use_cache),
+                lambda content: self._resolve_answer(content, allowed),
+                self.scratch,
+            )
+        finally:
+            if own_loop:
+                await aclose_async_pools()
+        if trace:
+            trace.span(
+                name="candidates",
+                metadata={
+                    "requested": self.candidates,
+                    "scored": [c.summary() for c in scored],
+                    "winner": winner.label,
+                },
+            )
+        return winner.content, winner.metrics
+
+    def _span(self, trace: Any, name: str, report: BudgetReport, metrics: dict[str, Any]) -> None:
+        """Record one model call: prompt budget plus latency/TTFT/queue wait/tokens/retries."""
+        if trace:
+            trace.span(
+                name=name,
+                metadata={"model": self.llm.model_name, "budget": report.as_dict(), "llm": metrics},
+            )
+
+    def _plan_prompt(self, issue_id: int) -> tuple[IssueContext, list[str], str, BudgetReport]:
+        """Fetch issue and inventory; return (issue context, inventory, plan prompt, budget)."""
         issue = self.gh.get_issue(self.repo_full_name, issue_id)
         ctx = get_issue_context(issue)
         file_inventory = self.git.list_files()
         if not file_inventory:
             file_inventory = [".gitkeep"]
-        inventory_text = "\n".join(file_inventory[:200])
-        allowed = set(file_inventory)
-
-        prompt_plan = CODE_AGENT_PROMPTS["plan"].format(
-            title=ctx.title,
-            body=ctx.body,
-            file_inventory=inventory_text,
+        relevant = self._relevant_files(ctx, set(file_inventory))
+        # Relevant paths first, so budget truncation drops the least likely ones.
+        ordered = list(dict.fromkeys([*relevant, *file_inventory]))
+        priority = CODE_AGENT_BUDGET["plan"]
+        prompt_plan, report, _ = render_prompt(
+            CODE_AGENT_PROMPTS["plan"],
+            self.token_counter,
+            self.prompt_budget,
+            fixed={"title": ctx.title},
+            sections=[
+                Section("body", [ctx.body], priority["body"], truncate=True),
+                Section(
+                    "relevant_files",
+                    [self.index.outline(f) for f in relevant],
+                    priority["relevant_files"],
+                    empty="(none found)",
+                ),
+                Section("file_inventory", ordered, priority["file_inventory"]),
+            ],
         )
-        if trace:
-            trace.span(name="plan", metadata={"model": self.llm.model_name})
-        plan_result = self.llm.invoke(prompt_plan)
-        plan_str, files_to_touch = _parse_plan_output(plan_result.content)
-        files_to_touch = [f for f in files_to_touch if f in allowed][:20]
+        return ctx, file_inventory, prompt_plan, report
+
+    def _relevant_files(self, ctx: IssueContext, allowed: set[str], limit: int = 15) -> list[str]:
+        """Inventory paths ranked for the issue text: symbol index fused with BM25 over chunks."""
+        text = f"{ctx.title}\n{ctx.body}"
+        rankings = [[path for path, _ in self.index.rank(text, limit=limit)]]
+        if self.retrieval is not None:
+            rankings.append([path for path, _ in self.retrieval.top_files(text, k=limit)])
+        return [path for path in fuse_rankings(*rankings) if path in allowed][:limit]
+
+    def _patch_prompt(
+        self, ctx: IssueContext, plan_output: str, file_inventory: list[str]
+    ) -> tuple[list[str], str, BudgetReport]:
+        """Pick files from the plan output; return (files to touch, patch prompt, budget)."""
+        allowed = set(file_inventory)
+        plan_str, files_to_touch = _parse_plan_output(plan_output)
+        self._plan = plan_str
+        files_to_touch = list(dict.fromkeys(f for f in files_to_touch if f in allowed))
+        if not files_to_touch:
+            files_to_touch = self._relevant_files(ctx, allowed, limit=3)
         if not files_to_touch:
             files_to_touch = [file_inventory[0]] if file_inventory else []
 
-        file_contents = ""
-        for f in files_to_touch:
-            if self.git.file_exists(f):
-                file_contents += f"### {f}\n```\n{self.git.read_file(f)}\n```\n"
-        prompt_patch = CODE_AGENT_PROMPTS["patch"].format(
-            title=ctx.title,
-            body=ctx.body,
-            files_to_modify="\n".join(files_to_touch),
-            file_contents=file_contents or "(new file)",
+        # In a sparse partial clone only what the agent touches is checked out (one fetch).
+        self.git.materialize(files_to_touch)
+        # The index SHAs match the untouched checkout, so all files come in one batched read.
+        shas = {f: e.sha for f in files_to_touch if (e := self.index.files.get(f)) is not None}
+        sources = self.git.read_files(files_to_touch, shas=shas)
+        existing = [f for f in files_to_touch if f in sources]
+        query = f"{ctx.title}\n{plan_str or ctx.body}"
+        self._slices = {f: slice_source(f, sources[f], query, shas.get(f)) for f in existing}
+        blocks = [self._file_block(self._slices[f]) for f in existing]
+        prompt_patch, report, kept = self._render_patch(ctx, files_to_touch, blocks)
+        dropped = set(existing[len(kept["file_contents"]) :])
+        if dropped:
+            # Never ask for changes to a file the model cannot see.
+            files_to_touch = [f for f in files_to_touch if f not in dropped]
+            prompt_patch, _, _ = self._render_patch(ctx, files_to_touch, kept["file_contents"])
+        return files_to_touch, prompt_patch, report
+
+    @staticmethod
+    def _file_block(file_slice: FileSlice) -> str:
+        note = " (excerpt: unrelated bodies elided)" if file_slice.sliced else ""
+        return f"### {file_slice.path}{note}\n```\n{file_slice.text}\n```\n"
+
+    def _render_patch(
+        self, ctx: IssueContext, files_to_touch: list[str], blocks: list[str]
+    ) -> tuple[str, BudgetReport, dict[str, list[str]]]:
+        priority = CODE_AGENT_BUDGET["patch"]
+        return render_prompt(
+            CODE_AGENT_PROMPTS["patch"],
+            self.token_counter,
+            self.prompt_budget,
+            fixed={
+                "title": ctx.title,
+                "files_to_modify": "\n".join(files_to_touch),
+                "full_rewrite_lines": str(FULL_REWRITE_MAX_LINES),
+            },
+            sections=[
+                Section("body", [ctx.body], priority["body"], truncate=True),
+                Section(
+                    "file_contents", blocks, priority["file_contents"], joiner="", empty="(new file)"
+                ),
+            ],
         )
-        if trace:
-            trace.span(name="patch", metadata={"model": self.llm.model_name})
-        patch_result = self.llm.invoke(prompt_patch)
-        patches = _parse_patches(patch_result.content, allowed)
+
+    def _prepare_branch(self, issue_id: int, ctx: IssueContext) -> str:
+        """Create (or reset to HEAD) the agent branch; return its name.
+
+        Resetting in place rather than via `checkout main` also works in a linked
+        worktree, where main may be checked out elsewhere.
+        """
+        branch_name = self.git.branch_name(issue_id, ctx.title)
+        try:
+            self.git.create_branch(branch_name)
+        except Exception:
+            self.git.create_branch(branch_name, reset=True)
+        return branch_name
+
+    def _resolve(self, block: PatchBlock, patches: dict[str, str], current: str | None) -> str:
+        """New content of block.path: applied to earlier blocks for it, else to current."""
+        if block.path in patches:
+            return resolve_block(block, patches[block.path])
+        shown = self._slices.get(block.path)
+        regions = shown.regions if shown and shown.sliced else None
+        return resolve_block(block, current, regions)
+
+    def _resolve_answer(self, content: str, allowed: set[str]) -> dict[str, str]:
+        """{path: new content} for a whole model answer, without writing anything."""
+        parser = FileBlockParser(allowed)
+        patches: dict[str, str] = {}
+        for block in [*parser.feed(content), *parser.close()]:
+            current = self.git.read_file(block.path) if self.git.file_exists(block.path) else None
+            patches[block.path] = self._resolve(block, patches, current)
+        return patches
+
+    def _write_patches(
+        self, patch_chunks: Iterable[str], allowed: set[str], before_first_write: Any
+    ) -> tuple[dict[str, str], str | None]:
+        """Apply each FILE/EDIT block as soon as it is complete; return (patches, error).
+
+        EDIT blocks are applied in memory to the current content (including earlier blocks
+        for the same path). A block for a path outside the inventory, or one that conflicts
+        with the file, stops generation and restores the files already written.
+        """
+        parser = FileBlockParser(allowed)
+        patches: dict[str, str] = {}
+        originals: dict[str, str | None] = {}
+
+        def write(blocks: list[PatchBlock]) -> None:
+            for block in blocks:
+                path = block.path
+                if not patches and not originals:
+                    before_first_write()
+                if path not in originals:
+                    self.git.materialize([path])
+                    originals[path] = (
+                        self.git.read_file(path) if self.git.file_exists(path) else None
+                    )
+                content = self._resolve(block, patches, originals[path])
+                self.git.write_file(path, content)
+                patches[path] = content
+
+        try:
+            for chunk in patch_chunks:
+                write(parser.feed(chunk))
+            write(parser.close())
+        except (DisallowedPathError, PatchConflictError) as e:
+            close = getattr(patch_chunks, "close", None)
+            if close is not None:
+                close()
+            for path, original in originals.items():
+                if original is None:
+                    self.git.remove_file(path)
+                else:
+                    self.git.write_file(path, original)
+            return {}, f"Patch generation aborted: {e}"
+        self._changed = list(dict.fromkeys([*self._changed, *patches]))
+        return patches, None
+
+    def _apply(
+        self,
+        issue_id: int,
+        ctx: IssueContext,
+        patch_chunks: Iterable[str],
+        allowed: set[str],
+        trace: Any = None,
+    ) -> CodeAgentResult:
+        """Write the patch blocks on a new agent branch, pre-flight, commit, push, open the PR."""
+        branch_name = ""
+
+        def prepare() -> None:
+            nonlocal branch_name
+            branch_name = self._prepare_branch(issue_id, ctx)
+
+        patches, error = self._write_patches(patch_chunks, allowed, prepare)
+        if error:
+            return CodeAgentResult(
+                success=False,
+                branch=branch_name,
+                pr_number=None,
+                message=error,
+                iteration=0,
+            )
+
         if not patches:
             return CodeAgentResult(
                 success=False,
@@ -129,19 +433,7 @@ class CodeAgentChain:
                 iteration=0,
             )
 
-        branch_name = self.git.branch_name(issue_id, ctx.title)
-        try:
-            self.git.create_branch(branch_name)
-        except Exception:
-            self.git.checkout("main")
-            try:
-                self.git.repo.delete_head(branch_name, force=True)
-            except Exception:
-                pass
-            self.git.create_branch(branch_name)
-
-        for path, content in patches.items():
-            self.git.write_file(path, content)
+        patches, preflight = self._preflight(ctx, patches, allowed, trace)
         self.git.add(list(patches.keys()))
         self.git.commit(f"Implement issue #{issue_id}\n\n{ctx.title}")
         try:
@@ -163,25 +455,227 @@ class CodeAgentChain:
             head=branch_name,
             base="main",
         )
+        note = "" if preflight is None else f"; {preflight.summary()}"
         return CodeAgentResult(
             success=True,
             branch=branch_name,
             pr_number=pr.number,
-            message=f"PR #{pr.number} created",
+            message=f"PR #{pr.number} created{note}",
             iteration=0,
         )
 
+    def _preflight(
+        self, ctx: IssueContext, patches: dict[str, str], allowed: set[str], trace: Any
+    ) -> tuple[dict[str, str], PreflightReport | None]:
+        """Check the written patches locally; regenerate from the failures before pushing.
+
+        Returns all patched paths (including regeneration changes) and the last report;
+        after preflight_retries failed attempts the patch is pushed anyway and CI decides.
+        """
+        if not self.preflight_tools:
+            return patches, None
+        attempt = 0
+        while True:
+            report = run_preflight(
+                self.repo_path, list(patches), self.preflight_tools, self.preflight_timeouts
+            )
+            if trace:
+                trace.span(
+                    name="preflight",
+                    metadata={
+                        "attempt": attempt,
+                        "ok": report.ok,
+                        "wall_s": round(report.wall_s, 3),
+                        "tools_s": report.timings(),
+                    },
+                )
+            if report.ok or attempt >= self.preflight_retries:
+                return patches, report
+            attempt += 1
+            feedback = Feedback("failure", report.failures(), paths=list(patches))
+            _, prompt_fix, fix_report = self._fix_prompt(ctx, feedback, allowed)
+            fix_stream = StreamCapture(self.llm.stream(prompt_fix))
+            fixed, error = self._write_patches(fix_stream, allowed, lambda: None)
+            self._span(trace, f"preflight-fix-{attempt}", fix_report, fix_stream.metrics())
+            if error or not fixed:
+                return patches, report
+            patches = {**patches, **fixed}
+
+    def _iterate(
+        self,
+        issue_id: int,
+        ctx: IssueContext,
+        file_inventory: list[str],
+        result: CodeAgentResult,
+        trace: Any,
+    ) -> CodeAgentResult:
+        """Fix rounds on the PR branch until IterationPolicy stops them.
+
+        Each round waits for CI and the review of the pushed commit, then asks only for
+        fixes: the plan and inventory from the first pass are reused and only the files
+        changed so far or named by the feedback are resent. max_iterations=1 is one-shot.
+        """
+        if not result.success or result.pr_number is None:
+            return result
+        policy = IterationPolicy(max_iterations=self.max_iterations)
+        allowed = set(file_inventory)
+        passes = 1
+        while True:
+            if not policy.can_retry(passes):
+                return self._stopped(result, passes, StopReason.MAX_ITERATIONS.value)
+            sha = self.git.repo.head.commit.hexsha
+            self.heartbeat()
+            feedback = collect_feedback(
+                self.gh,
+                self.repo_full_name,
+                result.pr_number,
+                sha,
+                self.feedback_timeouts,
+                sleep=self._sleep,
+            )
+            if trace:
+                trace.span(
+                    name="feedback",
+                    metadata={
+                        "iteration": passes,
+                        "ci": feedback.ci_conclusion,
+                        "review": feedback.review_state,
+                    },
+                )
+            stop, reason = policy.should_stop(passes, feedback.ci_passed, feedback.approved)
+            status = f"CI {feedback.ci_conclusion}, review {feedback.review_state or 'none'}"
+            if stop:
+                return self._stopped(result, passes, f"{reason.value}; {status}")
+            if feedback.ci_conclusion == "pending" or (
+                feedback.ci_passed and feedback.review_state is None
+            ):
+                # Nothing actionable arrived in time; leave the PR for a later run.
+                return self._stopped(result, passes, f"no feedback; {status}")
+
+            _, prompt_fix, fix_report = self._fix_prompt(ctx, feedback, allowed)
+            fix_stream = StreamCapture(self.llm.stream(prompt_fix))
+            patches, error = self._write_patches(fix_stream, allowed, lambda: None)
+            self._span(trace, f"fix-{passes}", fix_report, fix_stream.metrics())
+            if error or not patches:
+                return self._stopped(result, passes, error or "fix produced no changes")
+            patches, _ = self._preflight(ctx, patches, allowed, trace)
+            self.git.add(list(patches))
+            self.git.commit(f"Address feedback on #{issue_id} (iteration {passes + 1})")
+            try:
+                self.git.push(branch=result.branch)
+            except Exception as e:
+                return replace(
+                    self._stopped(result, passes + 1, f"push failed: {e}"), success=False
+                )
+            passes += 1
+
+    def _sleep(self, seconds: float) -> None:
+        """Poll interval of collect_feedback: the checkout stays leased, so say we are alive."""
+        self.heartbeat()
+        time.sleep(seconds)
+
+    @staticmethod
+    def _stopped(result: CodeAgentResult, passes: int, reason: str) -> CodeAgentResult:
+        return replace(
+            result,
+            iteration=passes - 1,
+            message=f"PR #{result.pr_number}: stopped after {passes} iteration(s) ({reason})",
+        )
+
+    def _fix_prompt(
+        self, ctx: IssueContext, feedback: Feedback, allowed: set[str]
+    ) -> tuple[list[str], str, BudgetReport]:
+        """Fix prompt with only the files changed so far and those named by CI/review."""
+        mentioned = [p for p in feedback.paths if p in allowed]
+        files = list(dict.fromkeys([*mentioned, *self._changed]))
+        existing = [f for f in files if self.git.file_exists(f)]
+        query = f"{ctx.title}\n{feedback.ci_summary}\n{feedback.review}"
+        # Files may have changed since the index was built: slice the current content.
+        self._slices = {f: slice_source(f, self.git.read_file(f), query) for f in existing}
+        priority = CODE_AGENT_BUDGET["fix"]
+        prompt, report, _ = render_prompt(
+            CODE_AGENT_PROMPTS["fix"],
+            self.token_counter,
+            self.prompt_budget,
+            fixed={"title": ctx.title, "full_rewrite_lines": str(FULL_REWRITE_MAX_LINES)},
+            sections=[
+                Section(
+                    "ci_failures",
+                    [feedback.ci_summary],
+                    priority["ci_failures"],
+                    truncate=True,
+                    empty="(CI passed)",
+                ),
+                Section(
+                    "review_comments",
+                    [feedback.review],
+                    priority["review_comments"],
+                    truncate=True,
+                    empty="(no review comments)",
+                ),
+                Section(
+                    "file_contents",
+                    [self._file_block(self._slices[f]) for f in existing],
+                    priority["file_contents"],
+                    joiner="",
+                    empty="(no files)",
+                ),
+                Section("plan", [self._plan], priority["plan"], truncate=True),
+                Section("body", [ctx.body], priority["body"], truncate=True),
+            ],
+        )
+        return existing, prompt, report
+
 
 def run_code_agent(
     repo_path: str | Path,
     repo_full_name: str,
     issue_id: int,
     max_iterations: int = 5,
+    use_cache: bool | None = None,
+    candidates: int | None = None,
+    heartbeat: Callable[[], object] | None = None,
 ) -> CodeAgentResult:
     """Entrypoint: run Code Agent for one issue."""
     chain = CodeAgentChain(
         repo_path=repo_path,
         repo_full_name=repo_full_name,
         max_iterations=max_iterations,
+        use_cache=use_cache,
+        candidates=candidates,
+        heartbeat=heartbeat,
+    )
+    try:
+        return chain.run(issue_id)
+    finally:
+        chain.close()
+
+
+async def arun_code_agent(
+    repo_path: str | Path,
+    repo_full_name: str,
+    issue_id: int,
+    max_iterations: int = 5,
+    use_cache: bool | None = None,
+    github_client: GitHubClient | None = None,
+    candidates: int | None = None,
+    heartbeat: Callable[[], object] | None = None,
+) -> CodeAgentResult:
+    """Async entrypoint: run Code Agent for one issue without blocking the event loop.
+
+    Concurrent runs need separate checkouts (see coding_agents.core.git.WorktreePool);
+    pass heartbeat=lambda: pool.refresh(checkout) so long CI waits keep the lease fresh.
+    """
+    chain = CodeAgentChain(
+        repo_path=repo_path,
+        repo_full_name=repo_full_name,
+        github_client=github_client,
+        max_iterations=max_iterations,
+        use_cache=use_cache,
+        candidates=candidates,
+        heartbeat=heartbeat,
     )
-    return chain.run(issue_id)
+    try:
+        return await chain.arun(issue_id)
+    finally:
+        chain.close()
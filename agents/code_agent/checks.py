@@ -0,0 +1,243 @@
+"""Local checks on the files a patch touches (no network, seconds not minutes).
+
+Used to rank speculative patch candidates and as the pre-flight stage before a
+push: compile, ruff, mypy and the affected tests run in parallel, each under its
+own timeout. Each check returns a CheckResult; a tool that is not installed, or
+has nothing to check, counts as passed (skipped).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from coding_agents.core.index import ImpactMap
+
+CHECK_TIMEOUT_S = 60.0
+PREFLIGHT_TIMEOUTS = {"compile": 30.0, "ruff": 60.0, "mypy": 300.0, "pytest": 600.0}
+MAX_OUTPUT_CHARS = 6_000
+# The only variables the tools see: they run model-written code (tests, conftest,
+# mypy plugins), which must not be able to read GITHUB_TOKEN or LLM API keys.
+TOOL_ENV_VARS = (
+    "PATH",
+    "HOME",
+    "LANG",
+    "LC_ALL",
+    "LC_CTYPE",
+    "TMPDIR",
+    "VIRTUAL_ENV",
+    "CONDA_PREFIX",
+    "PYTHONPATH",
+    "PYTHONHOME",
+    "PYTHONIOENCODING",
+    "PYTHONUTF8",
+    "PYENV_ROOT",
+    "PYENV_VERSION",
+)
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one tool over the touched files; output holds one problem per line."""
+
+    tool: str
+    ok: bool
+    output: str = ""
+    wall_s: float = 0.0
+    skipped: bool = False
+
+    @property
+    def problems(self) -> int:
+        if self.ok:
+            return 0
+        return max(1, sum(1 for line in self.output.splitlines() if line.strip()))
+
+
+def _python_files(paths: list[str]) -> list[str]:
+    return [p for p in paths if p.endswith(".py")]
+
+
+def _tool_command(module: str) -> list[str] | None:
+    """[python -m module] when importable here, else the executable on PATH, else None."""
+    if importlib.util.find_spec(module) is not None:
+        return [sys.executable, "-m", module]
+    exe = shutil.which(module)
+    return [exe] if exe else None
+
+
+def compile_check(root: Path, paths: list[str], timeout: float = CHECK_TIMEOUT_S) -> CheckResult:
+    """Syntax-compile each touched Python file in-process."""
+    errors = []
+    for path in _python_files(paths):
+        file = root / path
+        if not file.is_file():
+            continue
+        try:
+            compile(file.read_bytes(), path, "exec")
+        except (SyntaxError, ValueError) as e:
+            line = getattr(e, "lineno", None) or 0
+            errors.append(f"{path}:{line}: {type(e).__name__}: {getattr(e, 'msg', e)}")
+    return CheckResult("compile", not errors, "\n".join(errors))
+
+
+def tool_env() -> dict[str, str]:
+    """Scrubbed environment for check subprocesses (TOOL_ENV_VARS only)."""
+    return {k: v for k in TOOL_ENV_VARS if (v := os.environ.get(k)) is not None}
+
+
+def _run_tool(
+    tool: str, args: list[str], root: Path, timeout: float, ok_codes: tuple[int, ...] = (0,)
+) -> CheckResult:
+    command = _tool_command(tool)
+    if command is None:
+        return CheckResult(tool, True, skipped=True)
+    try:
+        proc = subprocess.run(
+            [*command, *args],
+            cwd=root,
+            env=tool_env(),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return CheckResult(tool, False, f"{tool} timed out after {timeout:.0f}s")
+    output = (proc.stdout + proc.stderr).strip()[-MAX_OUTPUT_CHARS:]
+    return CheckResult(tool, proc.returncode in ok_codes, output)
+
+
+def ruff_check(root: Path, paths: list[str], timeout: float = CHECK_TIMEOUT_S) -> CheckResult:
+    """ruff check (repository config) on the touched Python files."""
+    files = [p for p in _python_files(paths) if (root / p).is_file()]
+    if not files:
+        return CheckResult("ruff", True, skipped=True)
+    args = ["check", "--quiet", "--output-format", "concise", "--", *files]
+    return _run_tool("ruff", args, root, timeout)
+
+
+def mypy_check(root: Path, paths: list[str], timeout: float = CHECK_TIMEOUT_S) -> CheckResult:
+    """mypy (repository config) on the touched files; errors elsewhere are not reported."""
+    files = [p for p in _python_files(paths) if (root / p).is_file()]
+    if not files:
+        return CheckResult("mypy", True, skipped=True)
+    args = ["--no-error-summary", "--hide-error-context", "--no-pretty", "--", *files]
+    result = _run_tool("mypy", args, root, timeout)
+    errors = [line for line in result.output.splitlines() if ": error:" in line]
+    if not result.ok and errors:
+        # Followed imports can report errors in untouched modules; only the patch counts.
+        own = [line for line in errors if line.split(":", 1)[0] in files]
+        result.output = "\n".join(own)
+        result.ok = not own
+    return result
+
+
+def affected_tests(root: Path, paths: list[str]) -> list[str]:
+    """pytest node ids that can be affected by paths (import-graph test impact)."""
+    return ImpactMap.open(root).select(paths)
+
+
+def pytest_check(root: Path, paths: list[str], timeout: float = CHECK_TIMEOUT_S) -> CheckResult:
+    """pytest on the tests affected by the touched files (skipped when there are none)."""
+    tests = affected_tests(root, paths)
+    if not tests:
+        return CheckResult("pytest", True, skipped=True)
+    args = ["-q", "--no-header", "-p", "no:cacheprovider", "-x", *tests]
+    # Exit code 5: nothing collected (e.g. all tests deselected), not a failure.
+    return _run_tool("pytest", args, root, timeout, ok_codes=(0, 5))
+
+
+Check = Callable[[Path, list[str], float], CheckResult]
+
+CHECKS: dict[str, Check] = {
+    "compile": compile_check,
+    "ruff": ruff_check,
+    "mypy": mypy_check,
+    "pytest": pytest_check,
+}
+DEFAULT_CHECKS = ("compile", "ruff")
+PREFLIGHT_CHECKS = ("compile", "ruff", "mypy", "pytest")
+
+
+def _timed(check: Check, root: Path, paths: list[str], timeout: float) -> CheckResult:
+    started = time.perf_counter()
+    result = check(root, paths, timeout)
+    result.wall_s = time.perf_counter() - started
+    return result
+
+
+def run_checks(
+    root: Path,
+    paths: list[str],
+    tools: tuple[str, ...] = DEFAULT_CHECKS,
+    timeouts: dict[str, float] | None = None,
+) -> list[CheckResult]:
+    """Run tools in parallel over paths (relative to root); results in tools order."""
+    timeouts = {**PREFLIGHT_TIMEOUTS, **(timeouts or {})}
+    with ThreadPoolExecutor(max_workers=max(1, len(tools))) as pool:
+        futures = [
+            pool.submit(_timed, CHECKS[tool], root, paths, timeouts.get(tool, CHECK_TIMEOUT_S))
+            for tool in tools
+        ]
+        return [f.result() for f in futures]
+
+
+@dataclass
+class PreflightReport:
+    """Results of one pre-flight run plus its wall time (tools run concurrently)."""
+
+    results: list[CheckResult] = field(default_factory=list)
+    wall_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.results)
+
+    def timings(self) -> dict[str, float]:
+        return {r.tool: round(r.wall_s, 3) for r in self.results}
+
+    def summary(self) -> str:
+        parts = [
+            f"{r.tool} {'skipped' if r.skipped else 'ok' if r.ok else 'FAILED'} {r.wall_s:.1f}s"
+            for r in self.results
+        ]
+        return f"pre-flight {self.wall_s:.1f}s: " + ", ".join(parts)
+
+    def failures(self) -> str:
+        """Failing tools' output, formatted like CI failures for the fix prompt."""
+        return "\n\n".join(f"### {r.tool}: failure\n{r.output}" for r in self.results if not r.ok)
+
+
+def preflight_config() -> tuple[tuple[str, ...], dict[str, float]]:
+    """Tools and timeouts from CODING_AGENTS_PREFLIGHT and CODING_AGENTS_PREFLIGHT_TIMEOUTS.
+
+    CODING_AGENTS_PREFLIGHT is a comma-separated tool list ("off" or empty disables);
+    CODING_AGENTS_PREFLIGHT_TIMEOUTS overrides seconds per tool, e.g. "mypy=120,pytest=300".
+    """
+    spec = os.environ.get("CODING_AGENTS_PREFLIGHT", ",".join(PREFLIGHT_CHECKS))
+    tools = tuple(t.strip() for t in spec.split(",") if t.strip() in CHECKS)
+    timeouts: dict[str, float] = {}
+    for item in os.environ.get("CODING_AGENTS_PREFLIGHT_TIMEOUTS", "").split(","):
+        tool, sep, seconds = item.partition("=")
+        if sep:
+            timeouts[tool.strip()] = float(seconds)
+    return tools, timeouts
+
+
+def run_preflight(
+    root: Path,
+    paths: list[str],
+    tools: tuple[str, ...] = PREFLIGHT_CHECKS,
+    timeouts: dict[str, float] | None = None,
+) -> PreflightReport:
+    """All pre-flight tools over the touched paths, concurrently."""
+    started = time.perf_counter()
+    results = run_checks(root, paths, tools, timeouts)
+    return PreflightReport(results, time.perf_counter() - started)
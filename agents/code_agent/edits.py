@@ -0,0 +1,234 @@
+"""Search/replace edit blocks and a fuzzy-anchored in-memory applier.
+
+An `--- EDIT: <path>` block holds one or more pairs of
+
+    <<<<<<< SEARCH
+    lines copied from the current file
+    =======
+    replacement lines
+    >>>>>>> REPLACE
+
+Each SEARCH is located in the current content exactly, then ignoring
+whitespace, then by the most similar window of the same line count; a missing
+or ambiguous anchor is a conflict. Full `--- FILE:` rewrites are accepted only
+for new files and files of at most FULL_REWRITE_MAX_LINES lines.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass, field
+
+from agents.code_agent.file_blocks import PatchBlock
+
+FULL_REWRITE_MAX_LINES = 80
+# Minimum SequenceMatcher ratio for a fuzzy (non-exact) anchor.
+FUZZY_THRESHOLD = 0.85
+
+_SEARCH = re.compile(r"^\s*<{5,}\s*SEARCH\s*$")
+_DIVIDER = re.compile(r"^\s*={5,}\s*$")
+_REPLACE = re.compile(r"^\s*>{5,}\s*REPLACE\s*$")
+
+
+@dataclass
+class SearchReplace:
+    search: str
+    replace: str
+
+
+@dataclass
+class EditConflict:
+    path: str
+    reason: str
+    search: str = ""
+
+    def __str__(self) -> str:
+        anchor = self.search.strip().splitlines()[0] if self.search.strip() else ""
+        return f"{self.path}: {self.reason}" + (f" (near {anchor!r})" if anchor else "")
+
+
+class PatchConflictError(ValueError):
+    """A block could not be applied to the current file content."""
+
+    def __init__(self, conflicts: list[EditConflict]) -> None:
+        super().__init__("Patch conflicts: " + "; ".join(str(c) for c in conflicts))
+        self.conflicts = conflicts
+
+
+@dataclass
+class EditResult:
+    content: str
+    conflicts: list[EditConflict] = field(default_factory=list)
+    fuzzy: int = 0
+
+
+def parse_edits(body: str) -> list[SearchReplace]:
+    """SEARCH/REPLACE pairs of an EDIT block body; text outside pairs is ignored."""
+    edits: list[SearchReplace] = []
+    search: list[str] | None = None
+    replace: list[str] | None = None
+    for line in body.split("\n"):
+        if _SEARCH.match(line):
+            search, replace = [], None
+        elif _DIVIDER.match(line) and search is not None and replace is None:
+            replace = []
+        elif _REPLACE.match(line) and search is not None and replace is not None:
+            edits.append(SearchReplace("\n".join(search), "\n".join(replace)))
+            search, replace = None, None
+        elif replace is not None:
+            replace.append(line)
+        elif search is not None:
+            search.append(line)
+    return edits
+
+
+def _indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _reindent(replace: list[str], search: list[str], matched: list[str]) -> list[str]:
+    """Shift replacement lines by the indentation difference between SEARCH and the match."""
+    want = next((_indent(m) for m in matched if m.strip()), "")
+    have = next((_indent(s) for s in search if s.strip()), "")
+    if want == have:
+        return replace
+    out: list[str] = []
+    for line in replace:
+        if not line.strip():
+            out.append(line)
+        elif line.startswith(have):
+            out.append(want + line[len(have) :])
+        else:
+            out.append(line)
+    return out
+
+
+def _shift(
+    regions: list[tuple[int, int]], first: int, last: int, delta: int
+) -> list[tuple[int, int]]:
+    """Regions after lines first..last were replaced by a block delta lines longer."""
+    out: list[tuple[int, int]] = []
+    for a, b in regions:
+        if a > last:
+            out.append((a + delta, b + delta))
+        elif b >= first:
+            out.append((a, b + delta))
+        else:
+            out.append((a, b))
+    return out
+
+
+def _locate(
+    lines: list[str], search: list[str], regions: list[tuple[int, int]] | None = None
+) -> tuple[int, bool] | str:
+    """(start line, fuzzy?) of the unique anchor for search, or a conflict reason.
+
+    regions (1-based inclusive line ranges the model was shown) break ties between
+    repeated matches and bound the fuzzy search.
+    """
+    n = len(search)
+
+    def visible(i: int) -> bool:
+        return regions is None or any(a <= i + 1 and i + n <= b for a, b in regions)
+
+    def unique(found: list[int]) -> list[int]:
+        shown = [i for i in found if visible(i)]
+        return shown if len(found) > 1 and len(shown) == 1 else found
+
+    windows = range(len(lines) - n + 1)
+    exact = unique([i for i in windows if lines[i : i + n] == search])
+    if len(exact) == 1:
+        return exact[0], False
+    if len(exact) > 1:
+        return f"SEARCH matches {len(exact)} places"
+    stripped = [s.strip() for s in search]
+    loose = unique([i for i in windows if [x.strip() for x in lines[i : i + n]] == stripped])
+    if len(loose) == 1:
+        return loose[0], True
+    if len(loose) > 1:
+        return f"SEARCH matches {len(loose)} places (ignoring whitespace)"
+    # seq2 is analysed once; quick_ratio() is an upper bound that skips most windows.
+    matcher = difflib.SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2("\n".join(stripped))
+    best, best_at, runner_up = 0.0, -1, 0.0
+    for i in windows:
+        if not visible(i):
+            continue
+        matcher.set_seq1("\n".join(x.strip() for x in lines[i : i + n]))
+        if matcher.quick_ratio() <= runner_up:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best:
+            best, best_at, runner_up = ratio, i, best
+        elif ratio > runner_up:
+            runner_up = ratio
+    if best >= FUZZY_THRESHOLD and best - runner_up > 0.02:
+        return best_at, True
+    return "SEARCH not found" if best < FUZZY_THRESHOLD else "SEARCH anchor is ambiguous"
+
+
+def apply_edits(
+    path: str,
+    content: str,
+    edits: list[SearchReplace],
+    regions: list[tuple[int, int]] | None = None,
+) -> EditResult:
+    """Apply edits in order to content; failed edits are reported and left out.
+
+    regions are the line ranges of content shown to the model (see core.index.slices);
+    they are shifted as earlier edits change line counts.
+    """
+    result = EditResult(content=content)
+    regions = list(regions) if regions is not None else None
+    # Empty content (a new or empty file) has no lines, and gets a final newline.
+    trailing_newline = content.endswith("\n") or not content
+    lines = content.split("\n") if content else []
+    if content and trailing_newline:
+        lines.pop()
+    for edit in edits:
+        search = edit.search.split("\n") if edit.search.strip() else []
+        replace = edit.replace.split("\n") if edit.replace else []
+        if not search:
+            lines.extend(replace)  # empty SEARCH appends (e.g. new function at end of file)
+            continue
+        located = _locate(lines, search, regions)
+        if isinstance(located, str):
+            result.conflicts.append(EditConflict(path, located, edit.search))
+            continue
+        start, fuzzy = located
+        matched = lines[start : start + len(search)]
+        if fuzzy:
+            result.fuzzy += 1
+            replace = _reindent(replace, search, matched)
+        lines[start : start + len(search)] = replace
+        if regions is not None:
+            regions = _shift(regions, start + 1, start + len(search), len(replace) - len(search))
+    result.content = "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+    return result
+
+
+def rewrite_allowed(current: str | None) -> bool:
+    """Full-file rewrites only for new files and small files."""
+    return current is None or len(current.splitlines()) <= FULL_REWRITE_MAX_LINES
+
+
+def resolve_block(
+    block: PatchBlock, current: str | None, regions: list[tuple[int, int]] | None = None
+) -> str:
+    """New content of block.path given its current content (None if the file is new).
+
+    Raises PatchConflictError if an edit does not anchor or a large file is rewritten.
+    """
+    if block.kind == "file":
+        if not rewrite_allowed(current):
+            reason = f"full rewrite of a file over {FULL_REWRITE_MAX_LINES} lines; use EDIT"
+            raise PatchConflictError([EditConflict(block.path, reason)])
+        return block.content
+    edits = parse_edits(block.content)
+    if not edits:
+        raise PatchConflictError([EditConflict(block.path, "EDIT block without SEARCH/REPLACE")])
+    result = apply_edits(block.path, current or "", edits, regions)
+    if result.conflicts:
+        raise PatchConflictError(result.conflicts)
+    return result.content
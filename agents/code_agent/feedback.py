@@ -0,0 +1,145 @@
+"""Feedback for a fix iteration: CI check results and the reviewer's verdict on a commit.
+
+Both are read from GitHub, so the Code Agent only sees what the Reviewer Agent
+published (the two sides stay isolated). Polling is bounded by timeouts from
+CODING_AGENTS_CI_TIMEOUT / CODING_AGENTS_REVIEW_TIMEOUT (seconds).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+FAILED_CONCLUSIONS = frozenset(
+    {"failure", "timed_out", "cancelled", "action_required", "startup_failure"}
+)
+# With no check run at all after this long, the repository is assumed to have no CI.
+CHECKS_APPEAR_S = 120.0
+MAX_RUN_CHARS = 4_000
+MAX_ANNOTATIONS = 50
+
+
+@dataclass
+class Feedback:
+    """CI conclusion ("success", "failure", "none" without CI, "pending" on timeout) and review."""
+
+    ci_conclusion: str
+    ci_summary: str = ""
+    review_state: str | None = None
+    review: str = ""
+    paths: list[str] = field(default_factory=list)
+
+    @property
+    def ci_passed(self) -> bool:
+        return self.ci_conclusion in ("success", "none")
+
+    @property
+    def approved(self) -> bool:
+        return self.review_state == "APPROVED"
+
+
+@dataclass
+class FeedbackTimeouts:
+    ci_s: float = 1800.0
+    review_s: float = 600.0
+    poll_s: float = 20.0
+
+    @classmethod
+    def from_env(cls) -> FeedbackTimeouts:
+        return cls(
+            ci_s=float(os.environ.get("CODING_AGENTS_CI_TIMEOUT", cls.ci_s)),
+            review_s=float(os.environ.get("CODING_AGENTS_REVIEW_TIMEOUT", cls.review_s)),
+            poll_s=float(os.environ.get("CODING_AGENTS_POLL_INTERVAL", cls.poll_s)),
+        )
+
+
+def _describe_run(run: Any, paths: list[str]) -> str:
+    output = run.output
+    parts = [f"### {run.name}: {run.conclusion}"]
+    parts.extend(t for t in (output.title, output.summary, output.text) if t)
+    try:
+        annotations = list(run.get_annotations())[:MAX_ANNOTATIONS]
+    except Exception:
+        annotations = []
+    for a in annotations:
+        paths.append(a.path)
+        parts.append(f"- {a.path}:{a.start_line}: {a.message}")
+    return "\n".join(parts)[:MAX_RUN_CHARS]
+
+
+def wait_for_ci(
+    gh: Any,
+    repo: str,
+    sha: str,
+    timeouts: FeedbackTimeouts,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> tuple[str, str, list[str]]:
+    """(conclusion, failure summary, annotated paths) once every check run on sha completes."""
+    started = clock()
+    while True:
+        runs = gh.get_check_runs(repo, sha)
+        waited = clock() - started
+        if not runs and waited >= min(CHECKS_APPEAR_S, timeouts.ci_s):
+            return "none", "No CI checks reported for this commit.", []
+        if runs and all(r.status == "completed" for r in runs):
+            failed = [r for r in runs if r.conclusion in FAILED_CONCLUSIONS]
+            paths: list[str] = []
+            summary = "\n\n".join(_describe_run(r, paths) for r in failed)
+            return ("failure" if failed else "success"), summary, paths
+        if waited >= timeouts.ci_s:
+            pending = ", ".join(r.name for r in runs if r.status != "completed")
+            return "pending", f"CI did not finish within {timeouts.ci_s:.0f}s ({pending}).", []
+        sleep(timeouts.poll_s)
+
+
+def wait_for_review(
+    gh: Any,
+    repo: str,
+    pr_number: int,
+    sha: str,
+    timeouts: FeedbackTimeouts,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> tuple[str | None, str, list[str]]:
+    """(state, text, commented paths) of the latest review of sha; (None, "", []) on timeout."""
+    started = clock()
+    while True:
+        reviews = [r for r in gh.get_reviews(repo, pr_number) if r.commit_id == sha]
+        if reviews:
+            review = reviews[-1]
+            comments = [
+                c
+                for c in gh.get_review_comments(repo, pr_number)
+                if c.pull_request_review_id == review.id
+            ]
+            lines = [review.body or ""]
+            lines.extend(f"- {c.path}:{c.line or c.original_line}: {c.body}" for c in comments)
+            return review.state, "\n".join(lines).strip(), [c.path for c in comments]
+        if clock() - started >= timeouts.review_s:
+            return None, "", []
+        sleep(timeouts.poll_s)
+
+
+def collect_feedback(
+    gh: Any,
+    repo: str,
+    pr_number: int,
+    sha: str,
+    timeouts: FeedbackTimeouts,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Feedback:
+    """CI result for sha, then (unless CI is still pending) the review of sha."""
+    conclusion, summary, ci_paths = wait_for_ci(gh, repo, sha, timeouts, sleep, clock)
+    feedback = Feedback(conclusion, summary, paths=ci_paths)
+    if conclusion == "pending":
+        return feedback
+    state, text, review_paths = wait_for_review(gh, repo, pr_number, sha, timeouts, sleep, clock)
+    feedback.review_state = state
+    feedback.review = text
+    feedback.paths = list(dict.fromkeys([*ci_paths, *review_paths]))
+    return feedback
@@ -0,0 +1,93 @@
+"""Incremental parser for FILE (full content) and EDIT (search/replace) blocks in patch output.
+
+--- FILE: <path>            --- EDIT: <path>
+<full new content>          <SEARCH/REPLACE pairs, see agents.code_agent.edits>
+--- END FILE                --- END EDIT
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+_HEADER = re.compile(r"^\s*---\s*(FILE|EDIT):\s*(.+?)\s*$")
+_END = re.compile(r"^\s*---\s*END (FILE|EDIT)")
+
+
+class DisallowedPathError(ValueError):
+    """Model opened a FILE/EDIT block for a path outside the file inventory."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(f"Disallowed path in patch output: {path}")
+        self.path = path
+
+
+class PatchBlock(NamedTuple):
+    """One closed block: kind is "file" (content is the whole file) or "edit" (raw pairs)."""
+
+    path: str
+    content: str
+    kind: str = "file"
+
+
+class FileBlockParser:
+    """Feed text chunks; get a PatchBlock for every block as soon as it is closed.
+
+    A block closes on `--- END FILE`/`--- END EDIT`, on the next header, or at close().
+    A header naming a path not in allowed_paths raises DisallowedPathError immediately,
+    so the caller can stop generation early.
+    """
+
+    def __init__(self, allowed_paths: set[str]) -> None:
+        self.allowed_paths = allowed_paths
+        self._buffer = ""
+        self._path: str | None = None
+        self._kind = "file"
+        self._lines: list[str] = []
+
+    def feed(self, chunk: str) -> list[PatchBlock]:
+        """Consume a chunk; return blocks completed by it (in order)."""
+        self._buffer += chunk
+        done: list[PatchBlock] = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._line(line, done)
+        return done
+
+    def close(self) -> list[PatchBlock]:
+        """Flush the trailing partial line and any unterminated block."""
+        done: list[PatchBlock] = []
+        if self._buffer:
+            line, self._buffer = self._buffer, ""
+            self._line(line, done)
+        self._finish(done)
+        return done
+
+    def _line(self, line: str, done: list[PatchBlock]) -> None:
+        header = _HEADER.match(line)
+        if header:
+            self._finish(done)
+            path = header.group(2).strip()
+            if path not in self.allowed_paths:
+                raise DisallowedPathError(path)
+            self._path = path
+            self._kind = header.group(1).lower()
+            return
+        if _END.match(line):
+            self._finish(done)
+            return
+        if self._path is not None:
+            self._lines.append(line)
+
+    def _finish(self, done: list[PatchBlock]) -> None:
+        if self._path is not None:
+            done.append(PatchBlock(self._path, "\n".join(self._lines).strip(), self._kind))
+        self._path = None
+        self._lines = []
+
+
+def parse_file_blocks(text: str, allowed_paths: set[str]) -> dict[str, str]:
+    """Parse a complete patch output in one go (non-streaming callers)."""
+    parser = FileBlockParser(allowed_paths)
+    blocks = parser.feed(text) + parser.close()
+    return {block.path: block.content for block in blocks}
@@ -0,0 +1,147 @@
+"""Speculative patch generation: N candidates in parallel, scored locally, best one wins.
+
+Each variant (a temperature and optionally another provider) answers the same
+patch prompt concurrently. As a candidate arrives its blocks are resolved in
+memory, written into a scratch worktree and run through the cheap checks in
+checks.py. The first candidate that passes every check wins and the generations
+still in flight are cancelled; otherwise the best-scored candidate is used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.git import WorktreePool
+from coding_agents.core.llm import get_llm
+from coding_agents.core.llm.base import BaseLLM
+
+from agents.code_agent.checks import DEFAULT_CHECKS, CheckResult, run_checks
+
+BASE_TEMPERATURE = 0.2
+TEMPERATURE_STEP = 0.3
+MAX_TEMPERATURE = 1.0
+
+
+@dataclass
+class Variant:
+    """One way to sample the patch: an LLM and the temperature to call it with."""
+
+    label: str
+    llm: BaseLLM
+    temperature: float
+
+
+@dataclass
+class Candidate:
+    label: str
+    content: str = ""
+    files: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    checks: list[CheckResult] = field(default_factory=list)
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def usable(self) -> bool:
+        return self.error is None and bool(self.files)
+
+    @property
+    def passed(self) -> bool:
+        return self.usable and all(c.ok for c in self.checks)
+
+    def score(self) -> tuple[int, int, int]:
+        """Lower is better: (unusable, failed checks, reported problems)."""
+        failed = [c for c in self.checks if not c.ok]
+        return (0 if self.usable else 1, len(failed), sum(c.problems for c in failed))
+
+    def summary(self) -> str:
+        if not self.usable:
+            return f"{self.label}: {self.error or 'no changes'}"
+        checks = ", ".join(f"{c.tool} {'ok' if c.ok else c.problems}" for c in self.checks)
+        return f"{self.label}: {len(self.files)} file(s); {checks}"
+
+
+def variants(
+    count: int,
+    provider: str | None = None,
+    use_cache: bool | None = None,
+    providers: str | None = None,
+) -> list[Variant]:
+    """count variants with rising temperature, cycling through providers.
+
+    providers is a comma-separated provider[:model] list (default
+    CODING_AGENTS_CANDIDATE_PROVIDERS, else just provider).
+    """
+    spec = (
+        providers
+        if providers is not None
+        else os.environ.get("CODING_AGENTS_CANDIDATE_PROVIDERS", "")
+    )
+    choices = [item.strip().partition(":") for item in spec.split(",") if item.strip()]
+    if not choices:
+        choices = [(provider or "", "", "")]
+    out = []
+    for i in range(max(1, count)):
+        name, _, model = choices[i % len(choices)]
+        temperature = round(min(MAX_TEMPERATURE, BASE_TEMPERATURE + TEMPERATURE_STEP * i), 2)
+        llm = get_llm(
+            provider=name or None, model=model or None, temperature=temperature, cache=use_cache
+        )
+        out.append(Variant(f"{llm.model_name}@{temperature}", llm, temperature))
+    return out
+
+
+def _write_files(root: Path, files: dict[str, str]) -> None:
+    for path, content in files.items():
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+
+
+async def speculate(
+    prompt: str,
+    candidates: list[Variant],
+    resolve: Callable[[str], dict[str, str]],
+    scratch: WorktreePool,
+    tools: tuple[str, ...] = DEFAULT_CHECKS,
+) -> tuple[Candidate, list[Candidate]]:
+    """Return (winner, candidates scored so far); stops early on the first clean candidate.
+
+    resolve maps a model answer to {path: new content}; it raises (conflict, disallowed
+    path) to reject the candidate.
+    """
+
+    async def one(variant: Variant) -> Candidate:
+        candidate = Candidate(variant.label)
+        try:
+            result = await variant.llm.ainvoke(prompt, temperature=variant.temperature)
+            candidate.content, candidate.metrics = result.content, result.metrics()
+            candidate.files = await asyncio.to_thread(resolve, result.content)
+            if candidate.files:
+                async with scratch.alease() as root:
+                    await asyncio.to_thread(_write_files, root, candidate.files)
+                    candidate.checks = await asyncio.to_thread(
+                        run_checks, root, list(candidate.files), tools
+                    )
+        except Exception as e:  # a failed sample or check only loses its own candidate
+            candidate.error = f"{type(e).__name__}: {e}"
+        return candidate
+
+    tasks = [asyncio.ensure_future(one(v)) for v in candidates]
+    scored: list[Candidate] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            candidate = await next_done
+            scored.append(candidate)
+            if candidate.passed:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let cancelled candidates give their scratch worktree back before returning.
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return min(scored, key=Candidate.score), scored
@@ -2,17 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
+import re
 from typing import Any
 
 from coding_agents.core.github import GitHubClient, get_pr_context, publish_review
 from coding_agents.core.github.pr import PRContext
 from coding_agents.core.llm import get_llm
 from coding_agents.core.observability.langfuse import trace_agent
-from coding_agents.core.prompts.reviewer_agent import REVIEWER_AGENT_PROMPTS
+from coding_agents.core.prompts import (
+    REVIEWER_AGENT_BUDGET,
+    REVIEWER_AGENT_PROMPTS,
+    BudgetReport,
+    Section,
+    get_token_counter,
+    prompt_token_budget,
+    render_prompt,
+)
 
 from agents.reviewer_agent.review_output import ReviewOutput
 
 
+def _split_diff(diff: str) -> list[str]:
+    """Split a unified diff into per-file chunks so the budget drops whole files first."""
+    return [chunk for chunk in re.split(r"(?m)^(?=diff --git )", diff) if chunk]
+
+
 class ReviewerAgentChain:
     """Independent Reviewer: Issue + diff + CI → verdict; separate prompts and policy."""
 
@@ -22,10 +37,13 @@ class ReviewerAgentChain:
         github_client: GitHubClient | None = None,
         llm_provider: str | None = None,
         temperature: float = 0.1,
+        use_cache: bool | None = None,
     ) -> None:
         self.repo_full_name = repo_full_name
         self.gh = github_client or GitHubClient()
-        self.llm = get_llm(provider=llm_provider, temperature=temperature)
+        self.llm = get_llm(provider=llm_provider, temperature=temperature, cache=use_cache)
+        self.token_counter = get_token_counter(self.llm.model_name)
+        self.prompt_budget = prompt_token_budget(self.llm.model_name)
 
     def run(
         self,
@@ -42,37 +60,89 @@ class ReviewerAgentChain:
                 pr_number, issue_title, issue_body, ci_conclusion, ci_summary, trace
             )
 
-    def _run_impl(
+    async def arun(
         self,
         pr_number: int,
         issue_title: str,
         issue_body: str,
-        ci_conclusion: str,
-        ci_summary: str,
-        trace: Any,
+        ci_conclusion: str = "unknown",
+        ci_summary: str = "",
     ) -> ReviewOutput:
+        """Async run(): awaits the model instead of holding a worker thread for the call."""
+        metadata = {"pr_number": pr_number, "repo": self.repo_full_name, "agent": "reviewer_agent"}
+        with trace_agent("reviewer_agent_run", metadata=metadata) as trace:
+            pr_ctx = await asyncio.to_thread(
+                self._fetch_context, pr_number, ci_conclusion, ci_summary
+            )
+            prompt, report = self._verdict_prompt(pr_ctx, issue_title, issue_body)
+            result = await self.llm.ainvoke(prompt)
+            self._span(trace, report, result.metrics())
+            return self._to_output(result.content, pr_ctx)
+
+    def _fetch_context(self, pr_number: int, ci_conclusion: str, ci_summary: str) -> PRContext:
         pull = self.gh.get_pull(self.repo_full_name, pr_number)
-        pr_ctx = get_pr_context(pull, ci_conclusion=ci_conclusion, ci_summary=ci_summary)
-        diff_excerpt = pr_ctx.diff[:8000] if len(pr_ctx.diff) > 8000 else pr_ctx.diff
-        prompt = REVIEWER_AGENT_PROMPTS["verdict"].format(
-            issue_title=issue_title,
-            issue_body=issue_body,
-            pr_title=pr_ctx.title,
-            pr_body=pr_ctx.body,
-            changed_files="\n".join(pr_ctx.changed_files),
-            diff_excerpt=diff_excerpt,
-            ci_conclusion=pr_ctx.ci_conclusion or "unknown",
-            ci_summary=pr_ctx.ci_summary,
+        return get_pr_context(pull, ci_conclusion=ci_conclusion, ci_summary=ci_summary)
+
+    def _verdict_prompt(
+        self, pr_ctx: PRContext, issue_title: str, issue_body: str
+    ) -> tuple[str, BudgetReport]:
+        priority = REVIEWER_AGENT_BUDGET["verdict"]
+        prompt, report, _ = render_prompt(
+            REVIEWER_AGENT_PROMPTS["verdict"],
+            self.token_counter,
+            self.prompt_budget,
+            fixed={
+                "issue_title": issue_title,
+                "pr_title": pr_ctx.title,
+                "ci_conclusion": pr_ctx.ci_conclusion or "unknown",
+            },
+            sections=[
+                Section("issue_body", [issue_body], priority["issue_body"], truncate=True),
+                Section("ci_summary", [pr_ctx.ci_summary], priority["ci_summary"], truncate=True),
+                Section("changed_files", pr_ctx.changed_files, priority["changed_files"]),
+                Section(
+                    "diff_excerpt",
+                    _split_diff(pr_ctx.diff),
+                    priority["diff_excerpt"],
+                    joiner="",
+                    truncate=True,
+                ),
+                Section("pr_body", [pr_ctx.body], priority["pr_body"], truncate=True),
+            ],
         )
+        return prompt, report
+
+    def _span(self, trace: Any, report: BudgetReport, metrics: dict[str, Any]) -> None:
+        """Record the verdict call: prompt budget plus latency/queue wait/tokens/retries."""
         if trace:
-            trace.span(name="verdict", metadata={"model": self.llm.model_name})
-        result = self.llm.invoke(prompt)
+            trace.span(
+                name="verdict",
+                metadata={"model": self.llm.model_name, "budget": report.as_dict(), "llm": metrics},
+            )
+
+    @staticmethod
+    def _to_output(content: str, pr_ctx: PRContext) -> ReviewOutput:
         return ReviewOutput.from_llm_output(
-            result.content,
+            content,
             ci_conclusion=pr_ctx.ci_conclusion or "unknown",
             changed_files=pr_ctx.changed_files,
         )
 
+    def _run_impl(
+        self,
+        pr_number: int,
+        issue_title: str,
+        issue_body: str,
+        ci_conclusion: str,
+        ci_summary: str,
+        trace: Any,
+    ) -> ReviewOutput:
+        pr_ctx = self._fetch_context(pr_number, ci_conclusion, ci_summary)
+        prompt, report = self._verdict_prompt(pr_ctx, issue_title, issue_body)
+        result = self.llm.invoke(prompt)
+        self._span(trace, report, result.metrics())
+        return self._to_output(result.content, pr_ctx)
+
     def run_and_publish(
         self,
         pr_number: int,
@@ -85,6 +155,34 @@ class ReviewerAgentChain:
     ) -> tuple[ReviewOutput, str]:
         """Run review and publish: PR comment, GitHub Review, return (output, job_summary)."""
         out = self.run(pr_number, issue_title, issue_body, ci_conclusion, ci_summary)
+        job_summary = self._publish(out, pr_number, ci_conclusion, post_comment, post_review)
+        return out, job_summary
+
+    async def arun_and_publish(
+        self,
+        pr_number: int,
+        issue_title: str,
+        issue_body: str,
+        ci_conclusion: str = "unknown",
+        ci_summary: str = "",
+        post_comment: bool = True,
+        post_review: bool = True,
+    ) -> tuple[ReviewOutput, str]:
+        """Async run_and_publish(); GitHub calls run in a worker thread."""
+        out = await self.arun(pr_number, issue_title, issue_body, ci_conclusion, ci_summary)
+        job_summary = await asyncio.to_thread(
+            self._publish, out, pr_number, ci_conclusion, post_comment, post_review
+        )
+        return out, job_summary
+
+    def _publish(
+        self,
+        out: ReviewOutput,
+        pr_number: int,
+        ci_conclusion: str,
+        post_comment: bool,
+        post_review: bool,
+    ) -> str:
         pull = self.gh.get_pull(self.repo_full_name, pr_number)
         job_summary = f"## Reviewer Agent\n\n**Verdict:** {out.verdict}\n**Reason:** {out.reason}\n**CI:** {ci_conclusion}"
         if post_comment:
@@ -92,4 +190,4 @@ class ReviewerAgentChain:
         if post_review:
             comments = [{"path": c["path"], "line": c["line"], "body": c["body"]} for c in out.inline_comments]
             publish_review(pull, out.event, out.summary, comments=comments)
-        return out, job_summary
+        return job_summary
@@ -0,0 +1,98 @@
+"""Cold-start benchmark for the CLI: wall time of fresh `--help` processes plus import profile.
+
+Each sample is a new interpreter, so the numbers include interpreter start-up and
+every module imported before typer prints help. Results are appended to a JSONL
+history file so regressions show up as a delta against the previous run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+DEFAULT_COMMANDS: list[list[str]] = [["--help"], ["code", "--help"], ["review", "--help"]]
+
+_IMPORTTIME = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+@dataclass
+class StartupSample:
+    """Wall-clock milliseconds of repeated cold runs of one CLI argv."""
+
+    argv: list[str]
+    runs_ms: list[float] = field(default_factory=list)
+
+    @property
+    def min_ms(self) -> float:
+        return min(self.runs_ms)
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.runs_ms)
+
+
+def default_history_path() -> Path:
+    """CODING_AGENTS_BENCH_HISTORY, or startup.jsonl next to the LLM cache."""
+    explicit = os.environ.get("CODING_AGENTS_BENCH_HISTORY")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "coding-agents" / "bench" / "startup.jsonl"
+
+
+def _cli(argv: list[str], extra: list[str] | None = None) -> list[str]:
+    return [sys.executable, *(extra or []), "-m", "coding_agents.cli.main", *argv]
+
+
+def measure(argv: list[str], runs: int = 5) -> StartupSample:
+    """Run the CLI `runs` times in fresh interpreters and record wall time."""
+    sample = StartupSample(argv=argv)
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(_cli(argv), capture_output=True, check=True)
+        sample.runs_ms.append((time.perf_counter() - started) * 1000)
+    return sample
+
+
+def import_offenders(argv: list[str], top: int = 10) -> list[tuple[str, float]]:
+    """Top-level modules by cumulative import time (ms), from `python -X importtime`."""
+    proc = subprocess.run(_cli(argv, ["-X", "importtime"]), capture_output=True, text=True)
+    totals: dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        # Depth-0 entries only: their cumulative time already includes their children.
+        if m and len(m.group(3)) <= 1:
+            totals[m.group(4)] = totals.get(m.group(4), 0.0) + int(m.group(2)) / 1000
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def last_entry(history: Path) -> dict[str, float] | None:
+    """Median ms per command from the most recent history line, if any."""
+    if not history.exists():
+        return None
+    lines = [line for line in history.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not lines:
+        return None
+    try:
+        return dict(json.loads(lines[-1])["median_ms"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def record(history: Path, samples: list[StartupSample]) -> None:
+    history.parent.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "median_ms": {" ".join(s.argv): round(s.median_ms, 1) for s in samples},
+        "samples": [asdict(s) for s in samples],
+    }
+    with history.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,179 @@
+"""Bulk mode: run an agent over many issues/PRs on a bounded pool of concurrent workers.
+
+Runs share one GitHub client and the process-wide LLM rate limiters, so a bulk
+run stays inside the same budgets as one-at-a-time runs. Results are yielded as
+each item finishes; BulkReport aggregates throughput and latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class BulkItem:
+    """Outcome of one item: success flag, one-line message and wall time."""
+
+    number: int
+    ok: bool
+    message: str
+    latency_s: float
+
+
+@dataclass
+class BulkReport:
+    items: list[BulkItem] = field(default_factory=list)
+    wall_s: float = 0.0
+    concurrency: int = 1
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for i in self.items if i.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.items) - self.succeeded
+
+    @property
+    def throughput_per_min(self) -> float:
+        return 60.0 * len(self.items) / self.wall_s if self.wall_s else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of item latencies (0 when empty)."""
+        latencies = sorted(i.latency_s for i in self.items)
+        if not latencies:
+            return 0.0
+        return latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)]
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.items)} items ({self.succeeded} ok, {self.failed} failed) "
+            f"in {self.wall_s:.1f}s with {self.concurrency} workers: "
+            f"{self.throughput_per_min:.1f}/min, latency p50 {self.percentile(50):.1f}s "
+            f"p95 {self.percentile(95):.1f}s max {self.percentile(100):.1f}s"
+        )
+
+    def markdown(self, title: str) -> str:
+        """Job summary: aggregate line plus one table row per item."""
+        rows = [
+            f"| #{i.number} | {'ok' if i.ok else 'failed'} | {i.latency_s:.1f}s | {i.message} |"
+            for i in sorted(self.items, key=lambda i: i.number)
+        ]
+        table = "| Item | Result | Time | Message |\n|---|---|---|---|\n" + "\n".join(rows)
+        return f"## {title}\n\n{self.summary()}\n\n{table}\n"
+
+
+def parse_numbers(spec: str) -> list[int]:
+    """ "3,10-12" → [3, 10, 11, 12] (order kept, duplicates dropped)."""
+    numbers: list[int] = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        lo, sep, hi = part.partition("-")
+        try:
+            first, last = int(lo), int(hi if sep else lo)
+        except ValueError as err:
+            raise ValueError(f"Invalid number or range: {part!r}") from err
+        if last < first:
+            raise ValueError(f"Empty range: {part!r}")
+        numbers.extend(range(first, last + 1))
+    return list(dict.fromkeys(numbers))
+
+
+async def run_bulk(
+    numbers: Iterable[int],
+    worker: Callable[[int], Awaitable[tuple[bool, str]]],
+    concurrency: int,
+    report: BulkReport | None = None,
+) -> AsyncIterator[BulkItem]:
+    """Run worker(number) with at most concurrency in flight; yield items as they finish.
+
+    A worker exception fails only its item. Finished items are also appended to report.
+    """
+    report = report if report is not None else BulkReport()
+    report.concurrency = concurrency
+    gate = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+
+    async def one(number: int) -> BulkItem:
+        async with gate:
+            t0 = time.perf_counter()
+            try:
+                ok, message = await worker(number)
+            except Exception as e:  # one bad item must not stop the batch
+                ok, message = False, f"{type(e).__name__}: {e}"
+            return BulkItem(number, ok, message, time.perf_counter() - t0)
+
+    tasks = [asyncio.ensure_future(one(n)) for n in numbers]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            report.items.append(item)
+            report.wall_s = time.perf_counter() - started
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        report.wall_s = time.perf_counter() - started
+
+
+def code_worker(
+    repo_path: Path,
+    repo_name: str,
+    max_iterations: int,
+    use_cache: bool | None,
+    gh: Any,
+    concurrency: int,
+    candidates: int | None = None,
+) -> Callable[[int], Awaitable[tuple[bool, str]]]:
+    """Code Agent per issue, each in its own leased worktree of repo_path."""
+    from agents.code_agent import arun_code_agent
+
+    from coding_agents.core.git import WorktreePool
+
+    pool = WorktreePool.from_env(repo_path, size=concurrency)
+
+    async def run(issue: int) -> tuple[bool, str]:
+        async with pool.alease() as checkout:
+            result = await arun_code_agent(
+                checkout,
+                repo_name,
+                issue,
+                max_iterations=max_iterations,
+                use_cache=use_cache,
+                github_client=gh,
+                candidates=candidates,
+                heartbeat=lambda: pool.refresh(checkout),
+            )
+        return result.success, result.message
+
+    return run
+
+
+def review_worker(
+    repo_name: str,
+    ci_conclusion: str,
+    ci_summary: str,
+    publish: bool,
+    use_cache: bool | None,
+    gh: Any,
+) -> Callable[[int], Awaitable[tuple[bool, str]]]:
+    """Reviewer Agent per PR; the verdict is the item message."""
+    from agents.reviewer_agent.chain import ReviewerAgentChain
+
+    reviewer = ReviewerAgentChain(repo_full_name=repo_name, github_client=gh, use_cache=use_cache)
+
+    async def run(pr: int) -> tuple[bool, str]:
+        pull = await asyncio.to_thread(gh.get_pull, repo_name, pr)
+        args = (pr, pull.title or "", pull.body or "", ci_conclusion, ci_summary)
+        if publish:
+            out, _ = await reviewer.arun_and_publish(*args)
+        else:
+            out = await reviewer.arun(*args)
+        return True, f"{out.verdict}: {out.reason}"
+
+    return run
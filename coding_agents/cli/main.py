@@ -3,18 +3,89 @@
 from __future__ import annotations
 
 import os
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import Annotated, Any, Optional
 
 import typer
 
-from agents.code_agent import run_code_agent
-from agents.reviewer_agent.chain import ReviewerAgentChain
-from coding_agents.core.github import GitHubClient
+# Agent, GitHub and LLM modules are imported inside the commands that use them:
+# they pull in PyGithub, GitPython, httpx and pydantic, which would otherwise be
+# paid on every invocation, including `--help`.
 
 app = typer.Typer(help="Coding Agents: Code Agent and Reviewer Agent for GitHub SDLC")
 
 
+def _echo_llm_stats() -> None:
+    from coding_agents.core.github.cache import github_stats
+    from coding_agents.core.llm import get_llm_cache, limiter_stats
+
+    gh = github_stats()
+    if gh.requests or gh.hits:
+        typer.echo(f"GitHub API: {gh.summary()}")
+
+    stats = get_llm_cache().stats
+    if stats.hits or stats.misses:
+        typer.echo(f"LLM cache: {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions")
+    for provider, lim in limiter_stats().items():
+        if lim.acquired:
+            typer.echo(
+                f"LLM rate limit [{provider}]: {lim.acquired} calls, {lim.throttled} throttled, "
+                f"wait mean {lim.mean_wait:.2f}s max {lim.max_wait:.2f}s, max queue {lim.max_queue_depth}"
+            )
+
+
+def _cassette(record: Optional[str], replay: Optional[str], latency: float) -> Any:
+    """use_cassette() for --record/--replay (or CODING_AGENTS_CASSETTE*); no-op otherwise."""
+    if record and replay:
+        raise typer.BadParameter("Use either --record or --replay, not both")
+    from coding_agents.core.cassette import cassette_from_env, use_cassette
+
+    path = record or replay
+    mode = "record" if record else "replay"
+    if not path:
+        env = cassette_from_env()
+        if env is None:
+            return nullcontext()
+        path, mode, latency = env
+
+    typer.echo(f"Cassette: {mode} {path}")
+    return use_cassette(path, mode, latency_scale=latency)
+
+
+def _write_step_summary(text: str) -> None:
+    step_summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+    if step_summary_path:
+        with open(step_summary_path, "a", encoding="utf-8") as f:
+            f.write("\n" + text)
+
+
+def _run_bulk(title: str, numbers: list[int], make_worker: Any, concurrency: int) -> None:
+    """Run make_worker()'s coroutine per number on a bounded pool; print items and a report."""
+    import asyncio
+
+    from coding_agents.cli import bulk
+    from coding_agents.core.llm import aclose_llms
+
+    report = bulk.BulkReport()
+    typer.echo(f"{title}: {len(numbers)} items, {concurrency} workers")
+
+    async def drive() -> None:
+        try:
+            async for item in bulk.run_bulk(numbers, make_worker(), concurrency, report):
+                status = "ok" if item.ok else "FAILED"
+                typer.echo(f"#{item.number} {status} ({item.latency_s:.1f}s): {item.message}")
+        finally:
+            await aclose_llms()
+
+    asyncio.run(drive())
+    typer.echo(report.summary())
+    _echo_llm_stats()
+    _write_step_summary(report.markdown(title))
+    if report.failed:
+        raise typer.Exit(1)
+
+
 def _get_repo() -> str:
     repo = os.environ.get("GITHUB_REPOSITORY")
     if not repo:
@@ -24,14 +95,43 @@ def _get_repo() -> str:
 
 @app.command()
 def code(
-    issue: int = typer.Option(..., "--issue", "-i", help="Issue number"),
+    issue: Optional[int] = typer.Option(None, "--issue", "-i", help="Issue number"),
+    issues: Optional[str] = typer.Option(None, "--issues", help="Bulk: issue numbers/ranges, e.g. 3,10-20"),
+    label: Optional[str] = typer.Option(None, "--label", help="Bulk: all open issues with this label"),
+    concurrency: int = typer.Option(4, "--concurrency", "-j", help="Bulk: issues processed concurrently"),
     repo: Optional[str] = typer.Option(None, "--repo", "-r", help="Owner/repo (or GITHUB_REPOSITORY)"),
     max_iters: int = typer.Option(5, "--max-iters", help="Max iterations for fix cycle"),
+    candidates: Optional[int] = typer.Option(None, "--candidates", "-n", help="Patch candidates sampled in parallel; best one by local checks is used (default: CODING_AGENTS_CANDIDATES or 1)"),
     cwd: Optional[str] = typer.Option(None, "--cwd", help="Repo path (default: GITHUB_WORKSPACE or .)"),
+    clone: bool = typer.Option(False, "--clone", help="Work in a sparse partial clone from the cached mirror of --repo (CODING_AGENTS_MIRRORS) instead of --cwd"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="On-disk LLM response cache (default: CODING_AGENTS_LLM_CACHE)"),
+    record: Optional[str] = typer.Option(None, "--record", help="Record LLM and GitHub I/O of this run to a cassette file"),
+    replay: Optional[str] = typer.Option(None, "--replay", help="Replay LLM and GitHub I/O from a cassette file (no network; git push is skipped)"),
+    replay_latency: float = typer.Option(0.0, "--replay-latency", help="Sleep recorded latency x this factor on replay"),
 ) -> None:
-    """Run Code Agent: read Issue, create branch, apply changes, open PR."""
+    """Run Code Agent: read Issue, create branch, apply changes, open PR.
+
+    With --issues or --label, runs over many issues concurrently (bulk mode).
+    """
+    if sum(x is not None for x in (issue, issues, label)) != 1:
+        raise typer.BadParameter("Use exactly one of --issue, --issues or --label")
+    if clone and issue is None:
+        raise typer.BadParameter("--clone works with --issue only")
+    if clone and replay:
+        raise typer.BadParameter("--clone fetches from the network: not with --replay")
     repo_name = repo or _get_repo()
 
+    if clone and issue is not None:
+        from coding_agents.core.git.mirrors import RepoMirrors
+
+        mirrors = RepoMirrors()
+        checkout = mirrors.checkout(repo_name)
+        try:
+            _run_code(checkout, repo_name, issue, max_iters, cache, candidates, record, replay, replay_latency)
+        finally:
+            mirrors.remove(checkout)
+        return
+
     cwd_str = cwd or os.environ.get("GITHUB_WORKSPACE", ".")
     path: Path = Path(cwd_str).resolve()
 
@@ -39,11 +139,52 @@ def code(
         typer.echo(f"Path does not exist: {path}", err=True)
         raise typer.Exit(1)
 
+    if issue is None:
+        from coding_agents.cli import bulk
+        from coding_agents.core.github import GitHubClient
+
+        with _cassette(record, replay, replay_latency):
+            gh = GitHubClient()
+            try:
+                numbers = bulk.parse_numbers(issues) if issues else []
+            except ValueError as e:
+                raise typer.BadParameter(str(e)) from e
+            if label:
+                numbers = gh.list_issue_numbers(repo_name, label=label)
+            _run_bulk(
+                f"Code Agent on {repo_name}",
+                numbers,
+                lambda: bulk.code_worker(path, repo_name, max_iters, cache, gh, concurrency, candidates),
+                concurrency,
+            )
+        return
+
+    _run_code(path, repo_name, issue, max_iters, cache, candidates, record, replay, replay_latency)
+
+
+def _run_code(
+    path: Path,
+    repo_name: str,
+    issue: int,
+    max_iters: int,
+    cache: Optional[bool],
+    candidates: Optional[int],
+    record: Optional[str],
+    replay: Optional[str],
+    replay_latency: float,
+) -> None:
+    from agents.code_agent import run_code_agent
+
     typer.echo(f"Running Code Agent for issue #{issue} in {repo_name} at {path}")
-    result = run_code_agent(path, repo_name, issue, max_iterations=max_iters)
+    with _cassette(record, replay, replay_latency):
+        result = run_code_agent(
+            path, repo_name, issue, max_iterations=max_iters, use_cache=cache, candidates=candidates
+        )
+    _echo_llm_stats()
 
     if result.success:
         typer.echo(f"Success: PR #{result.pr_number} created on branch {result.branch}")
+        typer.echo(result.message)
     else:
         typer.echo(f"Failed: {result.message}", err=True)
         raise typer.Exit(1)
@@ -51,39 +192,73 @@ def code(
 
 @app.command()
 def review(
-    pr: int = typer.Option(..., "--pr", "-p", help="Pull request number"),
+    pr: Optional[int] = typer.Option(None, "--pr", "-p", help="Pull request number"),
+    all_open: bool = typer.Option(False, "--all-open", help="Bulk: review all open PRs from agent branches"),
+    head_prefix: str = typer.Option("agent/", "--head-prefix", help="Bulk: head branch prefix for --all-open ('' for every PR)"),
+    concurrency: int = typer.Option(4, "--concurrency", "-j", help="Bulk: PRs reviewed concurrently"),
     repo: Optional[str] = typer.Option(None, "--repo", "-r", help="Owner/repo (or GITHUB_REPOSITORY)"),
     ci_conclusion: str = typer.Option("success", "--ci-conclusion", help="CI conclusion for context"),
     ci_summary: str = typer.Option("", "--ci-summary", help="CI summary text"),
     no_publish: bool = typer.Option(False, "--no-publish", help="Only output verdict, do not post"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="On-disk LLM response cache (default: CODING_AGENTS_LLM_CACHE)"),
+    record: Optional[str] = typer.Option(None, "--record", help="Record LLM and GitHub I/O of this run to a cassette file"),
+    replay: Optional[str] = typer.Option(None, "--replay", help="Replay LLM and GitHub I/O from a cassette file (no network)"),
+    replay_latency: float = typer.Option(0.0, "--replay-latency", help="Sleep recorded latency x this factor on replay"),
 ) -> None:
-    """Run Reviewer Agent: analyze PR, post comment + summary + GitHub Review."""
-    repo_name = repo or _get_repo()
-    typer.echo(f"Running Reviewer Agent for PR #{pr} in {repo_name}")
+    """Run Reviewer Agent: analyze PR, post comment + summary + GitHub Review.
 
-    gh = GitHubClient()
-    pull = gh.get_pull(repo_name, pr)
+    With --all-open, reviews every open agent PR concurrently (bulk mode).
+    """
+    from coding_agents.core.github import GitHubClient
 
-    issue_title = pull.title or ""
-    issue_body = pull.body or ""
+    if (pr is None) == (not all_open):
+        raise typer.BadParameter("Use exactly one of --pr or --all-open")
+    repo_name = repo or _get_repo()
 
-    reviewer = ReviewerAgentChain(repo_full_name=repo_name)
+    if pr is None:
+        from coding_agents.cli import bulk
 
-    if no_publish:
-        out = reviewer.run(pr, issue_title, issue_body, ci_conclusion, ci_summary)
-        typer.echo(out.summary)
+        with _cassette(record, replay, replay_latency):
+            gh = GitHubClient()
+            _run_bulk(
+                f"Reviewer Agent on {repo_name}",
+                gh.list_pull_numbers(repo_name, head_prefix=head_prefix),
+                lambda: bulk.review_worker(
+                    repo_name, ci_conclusion, ci_summary, not no_publish, cache, gh
+                ),
+                concurrency,
+            )
         return
 
-    out, job_summary = reviewer.run_and_publish(pr, issue_title, issue_body, ci_conclusion, ci_summary)
+    from agents.reviewer_agent.chain import ReviewerAgentChain
+
+    typer.echo(f"Running Reviewer Agent for PR #{pr} in {repo_name}")
 
-    typer.echo(job_summary)
+    with _cassette(record, replay, replay_latency):
+        gh = GitHubClient()
+        pull = gh.get_pull(repo_name, pr)
 
-    step_summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
-    if step_summary_path:
-        with open(step_summary_path, "a", encoding="utf-8") as f:
-            f.write("\n" + job_summary)
+        issue_title = pull.title or ""
+        issue_body = pull.body or ""
+
+        # One client for the run: the pull fetched here is reused from its cache below.
+        reviewer = ReviewerAgentChain(repo_full_name=repo_name, github_client=gh, use_cache=cache)
+
+        if no_publish:
+            out = reviewer.run(pr, issue_title, issue_body, ci_conclusion, ci_summary)
+            typer.echo(out.summary)
+            _echo_llm_stats()
+            return
+
+        out, job_summary = reviewer.run_and_publish(
+            pr, issue_title, issue_body, ci_conclusion, ci_summary
+        )
 
-    typer.echo(f"Verdict: {out.verdict}")
+        typer.echo(job_summary)
+        _write_step_summary(job_summary)
+
+        typer.echo(f"Verdict: {out.verdict}")
+        _echo_llm_stats()
 
 
 @app.command()
@@ -101,5 +276,62 @@ def serve(
         raise typer.Exit(1)
 
 
+@app.command("affected-tests")
+def affected_tests(
+    paths: Annotated[
+        Optional[list[str]],
+        typer.Argument(help="Changed paths (default: changes since --base, plus untracked files)"),
+    ] = None,
+    base: str = typer.Option("HEAD", "--base", help="Ref to diff the working tree against when no paths are given"),
+    coverage: Optional[str] = typer.Option(None, "--coverage", help="Coverage data file recorded with per-test contexts (--cov-context=test)"),
+    cwd: Optional[str] = typer.Option(None, "--cwd", help="Repo path (default: GITHUB_WORKSPACE or .)"),
+) -> None:
+    """Print the pytest node ids affected by changed files (import graph, optional coverage)."""
+    from coding_agents.core.git import GitRepo
+    from coding_agents.core.index import ImpactMap
+
+    path = Path(cwd or os.environ.get("GITHUB_WORKSPACE", ".")).resolve()
+    git = GitRepo(path)
+    changed = paths or git.changed_files(base)
+    try:
+        impact = ImpactMap.open(path, git, coverage_file=coverage)
+    except ImportError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from e
+    for node in impact.select(changed):
+        typer.echo(node)
+
+
+@app.command("bench-startup")
+def bench_startup(
+    runs: int = typer.Option(5, "--runs", "-n", help="Cold runs per command"),
+    top: int = typer.Option(10, "--top", help="Show N slowest top-level imports (0 to skip)"),
+    history: Optional[str] = typer.Option(None, "--history", help="JSONL history file (default: CODING_AGENTS_BENCH_HISTORY or ~/.cache/coding-agents/bench/startup.jsonl)"),
+    no_record: bool = typer.Option(False, "--no-record", help="Do not append results to the history file"),
+) -> None:
+    """Measure CLI cold-start time (`--help` in fresh interpreters) and compare with the last run."""
+    from coding_agents.cli import bench
+
+    history_path = Path(history) if history else bench.default_history_path()
+    previous = bench.last_entry(history_path) or {}
+    samples = [bench.measure(argv, runs=runs) for argv in bench.DEFAULT_COMMANDS]
+
+    for sample in samples:
+        key = " ".join(sample.argv)
+        line = f"{key:<16} median {sample.median_ms:7.1f} ms  min {sample.min_ms:7.1f} ms"
+        if key in previous:
+            line += f"  ({sample.median_ms - previous[key]:+.1f} ms vs last)"
+        typer.echo(line)
+
+    if top:
+        typer.echo("Slowest imports for --help (cumulative ms):")
+        for module, ms in bench.import_offenders(["--help"], top=top):
+            typer.echo(f"  {ms:8.1f}  {module}")
+
+    if not no_record:
+        bench.record(history_path, samples)
+        typer.echo(f"Recorded to {history_path}")
+
+
 if __name__ == "__main__":
     app()
@@ -2,18 +2,48 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
+from git import Repo
 from pydantic import BaseModel
 
-from agents.code_agent import run_code_agent
+from agents.code_agent import arun_code_agent
+from agents.code_agent.chain import CodeAgentResult
 from agents.reviewer_agent.chain import ReviewerAgentChain
+from coding_agents.core.git import WorktreePool
+from coding_agents.core.git.mirrors import RepoMirrors
 from coding_agents.core.github import GitHubClient
+from coding_agents.core.llm import aclose_llms
 
-app = FastAPI(title="Coding Agents API", version="0.1.0")
+_pools: dict[Path, WorktreePool] = {}
+
+
+def _worktrees(path: Path) -> WorktreePool:
+    """Worktrees of the repository containing path, one pool per repository root.
+
+    Concurrent /code runs on the same repository each get their own tree.
+    """
+    top = Repo(path, search_parent_directories=True).working_tree_dir
+    root = Path(top or path).resolve()
+    if root not in _pools:
+        _pools[root] = WorktreePool.from_env(root)
+    return _pools[root]
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Keep pooled LLM clients warm across requests; close them on shutdown."""
+    yield
+    await aclose_llms()
+
+
+app = FastAPI(title="Coding Agents API", version="0.1.0", lifespan=lifespan)
 
 
 class CodeRequest(BaseModel):
@@ -30,13 +60,39 @@ class ReviewRequest(BaseModel):
 
 
 @app.post("/code")
-def api_code(req: CodeRequest) -> dict[str, Any]:
-    """Run Code Agent for an issue."""
+async def api_code(req: CodeRequest) -> dict[str, Any]:
+    """Run Code Agent for an issue.
+
+    With CODING_AGENTS_MIRRORS set, each run gets a sparse partial clone of req.repo
+    from the cached mirror; otherwise a worktree of the GITHUB_WORKSPACE checkout.
+    """
+    if os.environ.get("CODING_AGENTS_MIRRORS"):
+        mirrors = RepoMirrors()
+        checkout = await asyncio.to_thread(mirrors.checkout, req.repo)
+        try:
+            result = await arun_code_agent(
+                checkout, req.repo, req.issue, max_iterations=req.max_iters
+            )
+        finally:
+            await asyncio.to_thread(mirrors.remove, checkout)
+        return _code_response(result)
     cwd = os.environ.get("GITHUB_WORKSPACE", ".")
     path = Path(cwd).resolve()
     if not path.exists():
         raise HTTPException(status_code=400, detail="GITHUB_WORKSPACE or cwd missing")
-    result = run_code_agent(path, req.repo, req.issue, max_iterations=req.max_iters)
+    pool = _worktrees(path)
+    async with pool.alease() as checkout:
+        result = await arun_code_agent(
+            checkout,
+            req.repo,
+            req.issue,
+            max_iterations=req.max_iters,
+            heartbeat=lambda: pool.refresh(checkout),
+        )
+    return _code_response(result)
+
+
+def _code_response(result: CodeAgentResult) -> dict[str, Any]:
     return {
         "success": result.success,
         "branch": result.branch,
@@ -46,13 +102,13 @@ def api_code(req: CodeRequest) -> dict[str, Any]:
 
 
 @app.post("/review")
-def api_review(req: ReviewRequest) -> dict[str, Any]:
+async def api_review(req: ReviewRequest) -> dict[str, Any]:
     """Run Reviewer Agent for a PR."""
-    reviewer = ReviewerAgentChain(repo_full_name=req.repo)
     gh = GitHubClient()
-    pull = gh.get_pull(req.repo, req.pr)
+    reviewer = ReviewerAgentChain(repo_full_name=req.repo, github_client=gh)
+    pull = await asyncio.to_thread(gh.get_pull, req.repo, req.pr)
 
-    out, _ = reviewer.run_and_publish(
+    out, _ = await reviewer.arun_and_publish(
         req.pr,
         pull.title or "",
         pull.body or "",
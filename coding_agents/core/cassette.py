@@ -0,0 +1,321 @@
+"""Record/replay cassettes for LLM and GitHub API I/O.
+
+Inside ``use_cassette(path, "record")`` every model call made through get_llm()
+and every GitHub REST request made by PyGithub is captured and written to path
+on exit (gzip-compressed JSON when the name ends in .gz). ``"replay"`` serves the
+same interactions from disk with no network and no credentials, optionally
+sleeping for the recorded latency times latency_scale.
+
+Requests are matched by content (model, temperature and prompt for LLM calls;
+verb, URL and body for HTTP) and identical requests replay in recorded order.
+Local git operations (branch, commit) are not part of a cassette; GitRepo.push()
+does nothing while replaying, so a replayed run never reaches the real remote.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, cast
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream
+
+CASSETTE_VERSION = 1
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(LookupError):
+    """Replay found no recorded interaction for a request."""
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """Recorded interactions, grouped by kind ("llm", "http") and request key."""
+
+    def __init__(self, path: str | Path, mode: str, latency_scale: float = 0.0) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode!r} (expected record or replay)")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries: dict[str, dict[str, list[dict[str, Any]]]] = {"llm": {}, "http": {}}
+        self._cursor: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._connections: dict[tuple[str, str, int | None], Any] = {}
+        if mode == REPLAY:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _open(self, mode: str) -> Any:
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return self.path.open(mode, encoding="utf-8")
+
+    def _load(self) -> None:
+        with self._open("r") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+        for kind in self._entries:
+            self._entries[kind] = data.get(kind, {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, **self._entries}
+        with (
+            gzip.open(tmp, "wt", encoding="utf-8")
+            if self.path.suffix == ".gz"
+            else tmp.open("w", encoding="utf-8")
+        ) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def record(self, kind: str, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[kind].setdefault(key, []).append(entry)
+
+    def replay(self, kind: str, key: str) -> dict[str, Any]:
+        """Next recorded entry for key; the last one repeats once the sequence is exhausted."""
+        with self._lock:
+            entries = self._entries[kind].get(key)
+            if not entries:
+                raise CassetteMissError(f"No recorded {kind} interaction for key {key}")
+            idx = self._cursor.get((kind, key), 0)
+            self._cursor[(kind, key)] = idx + 1
+            return entries[min(idx, len(entries) - 1)]
+
+    def delay(self, seconds: float | None) -> float:
+        return max(0.0, (seconds or 0.0) * self.latency_scale)
+
+    def close(self) -> None:
+        for cnx in self._connections.values():
+            cnx.close()
+        self._connections.clear()
+
+
+_ACTIVE: Cassette | None = None
+
+
+def active_cassette() -> Cassette | None:
+    """The cassette of the enclosing use_cassette() block, if any."""
+    return _ACTIVE
+
+
+@contextmanager
+def use_cassette(
+    path: str | Path, mode: str = RECORD, latency_scale: float = 0.0
+) -> Iterator[Cassette]:
+    """Record or replay all LLM and GitHub I/O of the block (process-wide)."""
+    global _ACTIVE
+    if _ACTIVE is not None:
+        raise RuntimeError("A cassette is already active")
+    from github.Requester import Requester
+
+    cassette = Cassette(path, mode, latency_scale)
+    _ACTIVE = cassette
+    # Duck-typed stand-ins for PyGithub's requests-based connection classes.
+    Requester.injectConnectionClasses(
+        cast(Any, _HTTPCassetteConnection), cast(Any, _HTTPSCassetteConnection)
+    )
+    try:
+        yield cassette
+    finally:
+        Requester.resetConnectionClasses()
+        _ACTIVE = None
+        cassette.close()
+        if mode == RECORD:
+            cassette.save()
+
+
+def cassette_from_env() -> tuple[str, str, float] | None:
+    """(path, mode, latency_scale) from CODING_AGENTS_CASSETTE / _MODE / _LATENCY, if set."""
+    path = os.environ.get("CODING_AGENTS_CASSETTE")
+    if not path:
+        return None
+    mode = os.environ.get("CODING_AGENTS_CASSETTE_MODE", REPLAY if Path(path).exists() else RECORD)
+    return path, mode, float(os.environ.get("CODING_AGENTS_CASSETTE_LATENCY", "0"))
+
+
+class CassetteLLM(BaseLLM):
+    """Records calls to inner, or (replay, inner=None) answers them from the cassette."""
+
+    def __init__(self, inner: BaseLLM | None, cassette: Cassette, model: str) -> None:
+        self.inner = inner
+        self.cassette = cassette
+        self._model = model
+
+    @property
+    def model_name(self) -> str:
+        return self._model
+
+    def _key(self, prompt: str, kwargs: dict[str, Any]) -> str:
+        return _digest(self._model, kwargs.get("temperature"), prompt)
+
+    def _require_inner(self) -> BaseLLM:
+        if self.inner is None:
+            raise RuntimeError("CassetteLLM in record mode needs an inner LLM")
+        return self.inner
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        key = self._key(prompt, kwargs)
+        if self.cassette.replaying:
+            entry = self.cassette.replay("llm", key)
+            result = LLMResult(**entry["result"])
+            time.sleep(self.cassette.delay(result.latency_s))
+            return result
+        result = self._require_inner().invoke(prompt, **kwargs)
+        self.cassette.record("llm", key, {"result": asdict(result)})
+        return result
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        key = self._key(prompt, kwargs)
+        if self.cassette.replaying:
+            entry = self.cassette.replay("llm", key)
+            result = LLMResult(**entry["result"])
+            await asyncio.sleep(self.cassette.delay(result.latency_s))
+            return result
+        result = await self._require_inner().ainvoke(prompt, **kwargs)
+        self.cassette.record("llm", key, {"result": asdict(result)})
+        return result
+
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        """Chunks are stored with their arrival offsets so replay keeps the TTFT profile."""
+        key = self._key(prompt, kwargs)
+        if self.cassette.replaying:
+            entry = self.cassette.replay("llm", key)
+            chunks: list[str] = entry.get("chunks") or [entry["result"]["content"]]
+            offsets: list[float] = entry.get("offsets") or [0.0] * len(chunks)
+            previous = 0.0
+            for chunk, offset in zip(chunks, offsets, strict=False):
+                time.sleep(self.cassette.delay(offset - previous))
+                previous = offset
+                yield chunk
+            return LLMResult(**entry["result"])
+        started = time.monotonic()
+        chunks, offsets = [], []
+        stream = self._require_inner().stream(prompt, **kwargs)
+        while True:
+            try:
+                delta = next(stream)
+            except StopIteration as stop:
+                result = stop.value or LLMResult(content="".join(chunks), model=self._model)
+                break
+            chunks.append(delta)
+            offsets.append(round(time.monotonic() - started, 4))
+            yield delta
+        self.cassette.record(
+            "llm", key, {"result": asdict(result), "chunks": chunks, "offsets": offsets}
+        )
+        return result
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+class _RecordedResponse:
+    """Mimics the httplib-style response PyGithub's Requester reads."""
+
+    def __init__(self, status: int, headers: dict[str, str], body: str) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def getheaders(self) -> Any:
+        return self.headers.items()
+
+    def read(self) -> str:
+        return self.body
+
+
+class _CassetteConnection:
+    """PyGithub connection class that records through a real connection or replays."""
+
+    protocol = "https"
+
+    def __init__(self, host: str, port: int | None = None, **kwargs: Any) -> None:
+        self.host = host
+        self.port = port
+        self._kwargs = kwargs
+        self._request: tuple[str, str, Any, dict[str, str]] | None = None
+
+    def request(
+        self, verb: str, url: str, input: Any, headers: dict[str, str], stream: bool = False
+    ) -> None:
+        self._request = (verb, url, input, headers)
+
+    def _real(self, cassette: Cassette) -> Any:
+        from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+
+        key = (self.protocol, self.host, self.port)
+        with cassette._lock:
+            cnx = cassette._connections.get(key)
+            if cnx is None:
+                cls: Any = HTTPSRequestsConnectionClass
+                if self.protocol == "http":
+                    cls = HTTPRequestsConnectionClass
+                cnx = cls(self.host, self.port, **self._kwargs)
+                cassette._connections[key] = cnx
+        return cnx
+
+    def getresponse(self) -> _RecordedResponse:
+        cassette = _ACTIVE
+        if cassette is None or self._request is None:
+            raise RuntimeError("Cassette connection used outside use_cassette()")
+        verb, url, body, headers = self._request
+        key = _digest(verb, self.host, url, body if isinstance(body, str) else None)
+        if cassette.replaying:
+            entry = cassette.replay("http", key)
+            time.sleep(cassette.delay(entry.get("elapsed")))
+            return _RecordedResponse(entry["status"], entry["headers"], entry["body"])
+        started = time.monotonic()
+        cnx = self._real(cassette)
+        cnx.request(verb, url, body, headers)
+        response = cnx.getresponse()
+        recorded = _RecordedResponse(response.status, dict(response.getheaders()), response.read())
+        cassette.record(
+            "http",
+            key,
+            {
+                "verb": verb,
+                "url": url,
+                "status": recorded.status,
+                "headers": recorded.headers,
+                "body": recorded.body,
+                "elapsed": round(time.monotonic() - started, 4),
+            },
+        )
+        return recorded
+
+    def close(self) -> None:
+        return None
+
+
+class _HTTPSCassetteConnection(_CassetteConnection):
+    protocol = "https"
+
+
+class _HTTPCassetteConnection(_CassetteConnection):
+    protocol = "http"
@@ -1,5 +1,6 @@
 """Git operations via GitPython: branches, commits, patches."""
 
 from coding_agents.core.git.repo import GitRepo
+from coding_agents.core.git.worktrees import WorktreePool
 
-__all__ = ["GitRepo"]
+__all__ = ["GitRepo", "WorktreePool"]
@@ -0,0 +1,183 @@
+"""Batched blob reads through persistent `git cat-file` processes.
+
+One `git cat-file --batch` process stays open for the life of the reader and
+streams contents for object names (a blob SHA or "<ref>:<path>", so any commit
+can be read without checking it out); it resolves each name itself and reports
+missing ones inline, so a batch of N files costs one pipe round trip instead of
+N reads or N subprocesses. Contents are cached by blob SHA (LRU, bounded in
+bytes): names that are SHAs already cached are not requested at all. Blobs of
+at least ZERO_COPY_BYTES come back as read-only memoryviews of the cached
+buffer instead of copies.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import IO, cast
+
+CACHE_BYTES = 64 * 1024 * 1024
+ZERO_COPY_BYTES = 64 * 1024
+# Names per round trip: keeps the request well below the pipe buffer, so the
+# writes cannot block while git waits for us to drain its output.
+BATCH_NAMES = 256
+
+_SHA = re.compile(r"^[0-9a-f]{40}$")
+Blob = bytes | memoryview
+
+
+class BlobReader:
+    """Read blobs of one repository by SHA or "<ref>:<path>", many per round trip."""
+
+    def __init__(self, repo_path: str | Path, cache_bytes: int = CACHE_BYTES) -> None:
+        self.repo_path = Path(repo_path)
+        self.cache_bytes = cache_bytes
+        self.round_trips = 0
+        self.hits = 0
+        self._cache: OrderedDict[str, bytes | bytearray] = OrderedDict()
+        self._cached_bytes = 0
+        self._check: subprocess.Popen[bytes] | None = None
+        self._batch: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def _process(self, mode: str) -> subprocess.Popen[bytes]:
+        attr = "_check" if mode == "--batch-check" else "_batch"
+        proc: subprocess.Popen[bytes] | None = getattr(self, attr)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                ["git", "cat-file", mode],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            setattr(self, attr, proc)
+        return proc
+
+    @staticmethod
+    def _request(proc: subprocess.Popen[bytes], names: list[str]) -> IO[bytes]:
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write("".join(f"{name}\n" for name in names).encode())
+        proc.stdin.flush()
+        return proc.stdout
+
+    def resolve(self, names: Iterable[str]) -> dict[str, str | None]:
+        """Blob SHA for each name (None if missing or not a blob)."""
+        names = list(dict.fromkeys(names))
+        out: dict[str, str | None] = {n: n for n in names if _SHA.match(n)}
+        pending = [n for n in names if n not in out]
+        with self._lock:
+            for start in range(0, len(pending), BATCH_NAMES):
+                chunk = pending[start : start + BATCH_NAMES]
+                stdout = self._request(self._process("--batch-check"), chunk)
+                self.round_trips += 1
+                for name in chunk:
+                    header = stdout.readline().decode().split()
+                    ok = len(header) == 3 and header[1] == "blob"
+                    out[name] = header[0] if ok else None
+        return out
+
+    def read_many(self, names: Iterable[str]) -> dict[str, Blob | None]:
+        """Contents for each name (None if missing or not a blob); one round trip per batch.
+
+        Names that are SHAs already in the cache are not requested again.
+        """
+        names = list(dict.fromkeys(names))
+        with self._lock:
+            # Hits are held here too, so storing new blobs cannot evict them mid-call.
+            loaded: dict[str, bytes | bytearray] = {
+                n: self._cache[n] for n in names if n in self._cache
+            }
+            shas: dict[str, str | None] = {n: n for n in loaded}
+            self.hits += len(shas)
+            wanted = [n for n in names if n not in shas]
+            fresh: dict[str, bytes | bytearray] = {}
+            for start in range(0, len(wanted), BATCH_NAMES):
+                chunk = wanted[start : start + BATCH_NAMES]
+                stdout = self._request(self._process("--batch"), chunk)
+                self.round_trips += 1
+                for name in chunk:
+                    sha, data = self._read_object(stdout)
+                    shas[name] = sha if data is not None else None
+                    if sha is not None and data is not None and sha not in loaded:
+                        loaded[sha] = fresh[sha] = data
+            for sha, data in fresh.items():
+                self._store(sha, data)
+            out: dict[str, Blob | None] = {}
+            for name in names:
+                sha = shas[name]
+                out[name] = None if sha is None else self._view(sha, loaded.get(sha))
+            return out
+
+    def read(self, name: str) -> Blob | None:
+        return self.read_many([name])[name]
+
+    def read_text(self, names: Iterable[str]) -> dict[str, str | None]:
+        """read_many() decoded as UTF-8 (None for missing or undecodable blobs)."""
+        out: dict[str, str | None] = {}
+        for name, data in self.read_many(names).items():
+            try:
+                out[name] = None if data is None else bytes(data).decode("utf-8")
+            except UnicodeDecodeError:
+                out[name] = None
+        return out
+
+    @staticmethod
+    def _read_object(stdout: IO[bytes]) -> tuple[str | None, bytes | bytearray | None]:
+        """(SHA, contents) of the next --batch reply; contents None unless it is a blob."""
+        header = stdout.readline().split()
+        if not header or header[-1] in (b"missing", b"ambiguous"):
+            return None, None  # "<name> missing": the name itself may contain spaces
+        sha, kind, size = header[0].decode(), header[1], int(header[2])
+        buf = bytearray(size)
+        view = memoryview(buf)
+        got = 0
+        while got < size:
+            n = cast(io.BufferedReader, stdout).readinto(view[got:])
+            if not n:
+                raise EOFError("git cat-file --batch closed mid-object")
+            got += n
+        stdout.read(1)  # trailing newline
+        if kind != b"blob":
+            return sha, None  # e.g. "<ref>:<dir>" names a tree
+        # Large blobs keep their buffer: callers get a memoryview of it, not a copy.
+        return sha, bytes(buf) if size < ZERO_COPY_BYTES else buf
+
+    def _store(self, sha: str, data: bytes | bytearray) -> None:
+        if len(data) > self.cache_bytes:
+            return
+        self._cache[sha] = data
+        self._cached_bytes += len(data)
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def _view(self, sha: str, fresh: bytes | bytearray | None) -> Blob | None:
+        data = self._cache.get(sha, fresh)
+        if data is None:
+            return None
+        if sha in self._cache:
+            self._cache.move_to_end(sha)
+        if len(data) >= ZERO_COPY_BYTES:
+            return memoryview(data).toreadonly()
+        return bytes(data)
+
+    def close(self) -> None:
+        with self._lock:
+            for proc in (self._check, self._batch):
+                if proc is not None and proc.poll() is None:
+                    assert proc.stdin is not None
+                    proc.stdin.close()
+                    proc.wait(timeout=5)
+            self._check = self._batch = None
+
+    def __enter__(self) -> BlobReader:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
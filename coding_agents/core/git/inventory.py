@@ -0,0 +1,296 @@
+"""File inventory from the git index instead of walking the working tree.
+
+Tracked paths and their blob SHAs come from `git ls-files -s` (one process,
+no directory walk), optionally plus untracked files that are not ignored.
+Each entry records its size and whether it looks binary (a NUL byte in the
+first 8 KiB, as git decides). Entries are cached in memory and under
+<repo>/.coding-agents/inventory.json: while the index file's stat data is
+unchanged the cached list is returned as is, and after a change only entries
+whose blob SHA (or, for untracked files, size/mtime) changed are re-examined.
+Files outside a sparse checkout (skip-worktree) are not on disk: their size and
+binary flag are read from the object store (`git cat-file`). A partial clone may
+not have those blobs yet, and nothing is fetched to learn about them: such
+entries get size -1 (unknown) and a conservative binary guess from the file
+suffix, until they are checked out and examined like any other file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from git import Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+from coding_agents.core.git.blobs import BlobReader
+from coding_agents.core.index.symbols import INDEX_DIR
+
+INVENTORY_VERSION = 3
+MAX_FILE_BYTES = 1_000_000
+BINARY_PEEK_BYTES = 8000
+_GITLINK = "160000"
+# Treated as binary when the blob is not available to look at.
+BINARY_SUFFIXES = re.compile(
+    r"\.(7z|a|bin|bmp|class|db|dll|dylib|exe|gif|gz|ico|jar|jpe?g|mo|mp[34]|npy|npz|o|otf"
+    r"|parquet|pdf|pickle|pkl|png|pyc|so|sqlite|tar|tgz|ttf|wasm|webp|whl|woff2?|xz|zip|zst)$",
+    re.IGNORECASE,
+)
+
+# repo path -> (index stat, tracked and untracked entries), shared by all instances.
+_MEMORY: dict[str, tuple[tuple[int, int], dict[str, InventoryEntry]]] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass
+class InventoryEntry:
+    """One file: blob SHA from the index (None when untracked), size, binary flag.
+
+    sparse marks a tracked file that is not checked out; size is -1 when its blob is
+    not in the object store either (binary is then guessed from the suffix).
+    """
+
+    path: str
+    sha: str | None
+    size: int
+    binary: bool
+    mtime_ns: int = 0
+    sparse: bool = False
+
+    def oversized(self, max_bytes: int = MAX_FILE_BYTES) -> bool:
+        return self.size > max_bytes
+
+
+def _guess_binary(path: str) -> bool:
+    return BINARY_SUFFIXES.search(path) is not None
+
+
+def _examine(root: Path, path: str, sha: str | None) -> InventoryEntry | None:
+    """Size and binary flag of the working-tree file; None if it is missing."""
+    full = root / path
+    try:
+        st = full.stat()
+        with open(full, "rb") as f:
+            head = f.read(BINARY_PEEK_BYTES)
+    except OSError:
+        return None
+    return InventoryEntry(path, sha, st.st_size, b"\0" in head, st.st_mtime_ns)
+
+
+class FileInventory:
+    """Files of one repository checkout, refreshed incrementally from the git index."""
+
+    def __init__(self, repo_path: str | Path, include_untracked: bool = False) -> None:
+        self.repo_path = Path(repo_path)
+        self.include_untracked = include_untracked
+        self.entries: dict[str, InventoryEntry] = {}
+        self.examined = 0
+        self._repo: Repo | None = None
+
+    @property
+    def cache_path(self) -> Path:
+        return self.repo_path / INDEX_DIR / "inventory.json"
+
+    @property
+    def repo(self) -> Repo:
+        if self._repo is None:
+            self._repo = Repo(self.repo_path)
+        return self._repo
+
+    def _index_stat(self) -> tuple[int, int]:
+        try:
+            st = os.stat(Path(self.repo.git_dir) / "index")
+        except OSError:
+            return (0, 0)  # no commits/index yet
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> tuple[int, int]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return (0, 0)
+        if data.get("version") != INVENTORY_VERSION:
+            return (0, 0)
+        self.entries = {
+            path: InventoryEntry(path, sha, size, bool(binary), mtime_ns, bool(sparse))
+            for path, (sha, size, binary, mtime_ns, sparse) in data.get("entries", {}).items()
+        }
+        stat = data.get("index", [0, 0])
+        return (int(stat[0]), int(stat[1]))
+
+    def _save(self, index_stat: tuple[int, int], entries: dict[str, InventoryEntry]) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INVENTORY_VERSION,
+            "index": list(index_stat),
+            "entries": {
+                e.path: [e.sha, e.size, int(e.binary), e.mtime_ns, int(e.sparse)]
+                for e in entries.values()
+            },
+        }
+        tmp = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self) -> bool:
+        """Bring entries up to date with the index (and untracked files); True if changed.
+
+        Tracked entries are re-read only when the index file changed; untracked files
+        (if included) are listed every time, re-examining those whose size or mtime moved.
+        """
+        key = str(self.repo_path.resolve())
+        index_stat = self._index_stat()
+        with _LOCK:
+            cached = _MEMORY.get(key)
+        if cached is not None:
+            cached_stat, self.entries = cached
+        else:
+            cached_stat = self._load()
+        previous = self.entries
+        self.examined = 0
+        if cached_stat == index_stat and index_stat != (0, 0):
+            tracked = {p: e for p, e in previous.items() if e.sha is not None}
+        else:
+            tracked = self._tracked(previous)
+        untracked = {p: e for p, e in previous.items() if e.sha is None and p not in tracked}
+        if self.include_untracked:
+            untracked = self._untracked(tracked, untracked)
+        everything = {**untracked, **tracked}
+        changed = everything != previous
+        with _LOCK:
+            _MEMORY[key] = (index_stat, everything)
+        if changed or cached_stat != index_stat:
+            self._save(index_stat, everything)
+        self.entries = everything if self.include_untracked else tracked
+        return changed
+
+    def _tracked(self, previous: dict[str, InventoryEntry]) -> dict[str, InventoryEntry]:
+        out: dict[str, InventoryEntry] = {}
+        sparse_shas: dict[str, str] = {}
+        for record in self.repo.git.ls_files("-s", "-t", "-z").split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            tag, mode, sha, _stage = meta.split()
+            if mode == _GITLINK:
+                continue  # submodule: not a file of this repository
+            sparse = tag == "S"
+            known = previous.get(path)
+            if known is not None and known.sha == sha and known.sparse == sparse:
+                out[path] = known
+                continue
+            if sparse:
+                sparse_shas[path] = sha
+                continue
+            entry = _examine(self.repo_path, path, sha)
+            self.examined += 1
+            if entry is not None:  # deleted in the working tree but still in the index
+                out[path] = entry
+        details = self._blob_details(set(sparse_shas.values()))
+        for path, sha in sparse_shas.items():
+            size, binary = details.get(sha, (-1, _guess_binary(path)))
+            out[path] = InventoryEntry(path, sha, size, binary, sparse=True)
+        self.examined += len(sparse_shas)
+        return out
+
+    def _git_stdin(self, args: list[str], data: str) -> str:
+        """git with data on stdin; never lazily fetches missing objects of a partial clone."""
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=self.repo_path,
+            input=data,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "GIT_NO_LAZY_FETCH": "1"},
+        )
+        if proc.returncode != 0:
+            raise GitCommandError(["git", *args], proc.returncode, proc.stderr.strip())
+        return proc.stdout
+
+    def _blob_details(self, shas: set[str]) -> dict[str, tuple[int, bool]]:
+        """(size, binary) of the blobs among shas that are in the object store.
+
+        Only blobs of HEAD's tree are looked up (files outside the sparse checkout are
+        unchanged from HEAD). Those a partial clone has not fetched are left out:
+        `rev-list --missing=print` tells them apart without fetching, and only
+        present blobs go to cat-file.
+        """
+        if not shas:
+            return {}
+        try:
+            listed = self._git_stdin(
+                [
+                    "rev-list",
+                    "--objects",
+                    "--no-object-names",
+                    "--missing=print",
+                    "--no-walk",
+                    "HEAD",
+                ],
+                "",
+            )
+            present = sorted(shas & set(listed.split()))  # missing ones are printed as ?<sha>
+            if not present:
+                return {}
+            checked = self._git_stdin(["cat-file", "--batch-check"], "\n".join(present) + "\n")
+        except GitCommandError:
+            return {}
+        sizes = {}
+        for line in checked.splitlines():
+            sha, kind, size = line.split()
+            if kind == "blob":
+                sizes[sha] = int(size)
+        small = [sha for sha, size in sizes.items() if size <= MAX_FILE_BYTES]
+        with BlobReader(self.repo_path) as reader:
+            heads = reader.read_many(small)
+        return {
+            sha: (size, b"\0" in bytes((heads.get(sha) or b"")[:BINARY_PEEK_BYTES]))
+            for sha, size in sizes.items()
+        }
+
+    def _untracked(
+        self, tracked: dict[str, InventoryEntry], previous: dict[str, InventoryEntry]
+    ) -> dict[str, InventoryEntry]:
+        out: dict[str, InventoryEntry] = {}
+        # The inventory's own cache changes on every save: never list it as untracked.
+        listing = self.repo.git.ls_files(
+            "--others", "--exclude-standard", f"--exclude=/{INDEX_DIR}/", "-z"
+        )
+        for path in filter(None, listing.split("\0")):
+            if path in tracked:
+                continue
+            known = previous.get(path)
+            try:
+                st = (self.repo_path / path).stat()
+            except OSError:
+                continue
+            if known is not None and (known.size, known.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                out[path] = known
+                continue
+            entry = _examine(self.repo_path, path, None)
+            self.examined += 1
+            if entry is not None:
+                out[path] = entry
+        return out
+
+    def paths(self, text_only: bool = True, max_bytes: int | None = MAX_FILE_BYTES) -> list[str]:
+        """Sorted paths, by default without binary files and files over max_bytes."""
+        return sorted(
+            e.path
+            for e in self.entries.values()
+            if not (text_only and e.binary) and not (max_bytes is not None and e.size > max_bytes)
+        )
+
+
+def inventory(repo_path: str | Path, include_untracked: bool = False) -> FileInventory | None:
+    """Refreshed inventory of repo_path; None if it is not a git checkout."""
+    inv = FileInventory(repo_path, include_untracked)
+    try:
+        inv.refresh()
+    except (InvalidGitRepositoryError, NoSuchPathError, GitCommandError):
+        return None
+    return inv
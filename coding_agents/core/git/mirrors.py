@@ -0,0 +1,195 @@
+"""Cached bare mirrors per owner/repo and cheap sparse checkouts made from them.
+
+The first use of a repository makes a blobless bare mirror
+(`git clone --bare --filter=blob:none`: commits and trees only) under
+CODING_AGENTS_MIRRORS; later uses only `git fetch` what changed, at most once
+per CODING_AGENTS_MIRROR_TTL seconds. A checkout is a `git clone --shared` of
+the mirror (objects are borrowed through alternates, nothing is copied) with
+sparse checkout enabled, so only the paths asked for are written. The clone's
+origin is the upstream repository marked as a promisor remote: blobs outside
+the mirror are fetched on demand, in one batch per `git sparse-checkout add`
+(see GitRepo.materialize), and pushes go straight upstream.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from urllib.parse import urlparse
+
+from git.exc import GitCommandError
+
+DEFAULT_URL = "https://github.com/{repo}.git"
+DEFAULT_TTL_S = 60.0
+FILTER = "blob:none"
+# Top-level files only (README, pyproject.toml, CI config): the default sparse set.
+ROOT_FILES = ["/*", "!/*/"]
+
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def default_root() -> Path:
+    """CODING_AGENTS_MIRRORS, or mirrors/ next to the LLM cache."""
+    explicit = os.environ.get("CODING_AGENTS_MIRRORS")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "coding-agents" / "mirrors"
+
+
+def sparse_pattern(path: str) -> str:
+    """Non-cone sparse-checkout pattern matching exactly one repository path."""
+    escaped = "".join(f"\\{c}" if c in "\\*?[!#" else c for c in path.strip("/"))
+    return f"/{escaped}"
+
+
+def _git(*args: str, cwd: str | Path | None = None, env: dict[str, str] | None = None) -> str:
+    proc = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, env={**os.environ, **(env or {})}
+    )
+    if proc.returncode != 0:
+        raise GitCommandError(["git", *args], proc.returncode, proc.stderr.strip())
+    return proc.stdout.strip()
+
+
+def auth_env(token: str | None, url: str = DEFAULT_URL) -> dict[str, str]:
+    """Environment that authenticates one git command's HTTPS requests to url's host.
+
+    The header goes through GIT_CONFIG_COUNT/KEY/VALUE, scoped to the host: it is not
+    on the command line (visible in `ps`) and never written to any config file.
+    """
+    parsed = urlparse(url)
+    if not token or parsed.scheme != "https":
+        return {}
+    basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    n = int(os.environ.get("GIT_CONFIG_COUNT", "0") or 0)
+    return {
+        "GIT_CONFIG_COUNT": str(n + 1),
+        f"GIT_CONFIG_KEY_{n}": f"http.https://{parsed.netloc}/.extraheader",
+        f"GIT_CONFIG_VALUE_{n}": f"AUTHORIZATION: basic {basic}",
+    }
+
+
+class RepoMirrors:
+    """Bare mirrors under root, one per owner/repo, and sparse partial checkouts of them."""
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        url: str = DEFAULT_URL,
+        ttl_s: float | None = None,
+        token: str | None = None,
+    ) -> None:
+        self.root = Path(root) if root else default_root()
+        self.url = url
+        self.ttl_s = (
+            ttl_s
+            if ttl_s is not None
+            else float(os.environ.get("CODING_AGENTS_MIRROR_TTL", DEFAULT_TTL_S))
+        )
+        self.token = token if token is not None else os.environ.get("GITHUB_TOKEN")
+        self.fetches = 0
+
+    def upstream(self, repo: str) -> str:
+        return self.url.format(repo=repo)
+
+    def mirror_path(self, repo: str) -> Path:
+        return self.root / f"{repo}.git"
+
+    @staticmethod
+    def _lock(path: Path) -> threading.Lock:
+        with _LOCKS_GUARD:
+            return _LOCKS.setdefault(str(path), threading.Lock())
+
+    def mirror(self, repo: str, refresh: bool | None = None) -> Path:
+        """Path of the bare mirror of owner/repo, cloned on first use.
+
+        An existing mirror is fetched when refresh is True, or (refresh=None) when its
+        last fetch is older than ttl_s.
+        """
+        path = self.mirror_path(repo)
+        with self._lock(path):
+            if not (path / "HEAD").exists():
+                self._clone(repo, path)
+                return path
+            stamp = path / "FETCH_HEAD"
+            age = time.time() - stamp.stat().st_mtime if stamp.exists() else float("inf")
+            if refresh or (refresh is None and age >= self.ttl_s):
+                env = auth_env(self.token, self.upstream(repo))
+                _git("fetch", "--quiet", "--prune", "origin", cwd=path, env=env)
+                self.fetches += 1
+        return path
+
+    def _clone(self, repo: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+        try:
+            _git(
+                "clone",
+                "--quiet",
+                "--bare",
+                f"--filter={FILTER}",
+                self.upstream(repo),
+                str(tmp),
+                env=auth_env(self.token, self.upstream(repo)),
+            )
+            # Branches and tags only (no refs/pull/*); fetch them into place, not origin/*.
+            _git("config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*", cwd=tmp)
+            _git("config", "--add", "remote.origin.fetch", "+refs/tags/*:refs/tags/*", cwd=tmp)
+            # Checkouts borrow these objects through alternates: never prune them away.
+            _git("config", "gc.pruneExpire", "never", cwd=tmp)
+            (tmp / "FETCH_HEAD").touch()
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.fetches += 1
+
+    def checkout(
+        self,
+        repo: str,
+        dest: str | Path | None = None,
+        ref: str | None = None,
+        paths: Iterable[str] = (),
+    ) -> Path:
+        """Sparse checkout of owner/repo at ref (default branch if None); returns its path.
+
+        Only top-level files and paths are written; the full file list is still in the
+        index, and GitRepo.materialize() checks out more files later. The token is never
+        stored in the checkout: commands that fetch blobs get it through auth_env().
+        """
+        mirror = self.mirror(repo)
+        if dest is None:
+            parent = self.root / "checkouts" / repo
+            parent.mkdir(parents=True, exist_ok=True)
+            dest = tempfile.mkdtemp(prefix="co-", dir=parent)
+            os.rmdir(dest)
+        dest = Path(dest)
+        _git("clone", "--quiet", "--shared", "--no-checkout", str(mirror), str(dest))
+        for key, value in [
+            ("remote.origin.url", self.upstream(repo)),
+            ("remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"),
+            ("core.repositoryformatversion", "1"),
+            ("extensions.partialClone", "origin"),
+            ("remote.origin.promisor", "true"),
+            ("remote.origin.partialclonefilter", FILTER),
+        ]:
+            _git("config", key, value, cwd=dest)
+        env = auth_env(self.token, self.upstream(repo))
+        patterns = [*ROOT_FILES, *(sparse_pattern(p) for p in paths)]
+        _git("sparse-checkout", "set", "--no-cone", *patterns, cwd=dest, env=env)
+        target = ref or _git("symbolic-ref", "--short", "HEAD", cwd=dest)
+        _git("checkout", "--quiet", target, cwd=dest, env=env)
+        return dest
+
+    def remove(self, checkout: str | Path) -> None:
+        """Delete a checkout made by checkout() (the mirror stays)."""
+        shutil.rmtree(checkout, ignore_errors=True)
@@ -0,0 +1,130 @@
+"""Commits without a working tree: blobs, tree and commit built with git plumbing.
+
+CommitBuilder writes patched files as loose blobs straight into the object
+store, applies them to the base commit's tree in a private temporary index
+(`read-tree` + `update-index --index-info` + `write-tree`), and creates the
+commit with `commit-tree`. Nothing touches a checkout or the shared index, so
+any number of builders can commit concurrently against one (bare) repository;
+the result is published with update_ref() and/or GitRepo.push(source=sha).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from git import Repo
+from git.exc import GitCommandError
+from gitdb.base import IStream
+
+REGULAR = "100644"
+EXECUTABLE = "100755"
+SYMLINK = "120000"
+_BLOB_MODES = {REGULAR, EXECUTABLE, SYMLINK}
+_NULL_SHA = "0" * 40
+
+
+class CommitBuilder:
+    """Accumulate file writes/removals on top of base, then commit them in one go."""
+
+    def __init__(self, repo_path: str | Path, base: str | None = "HEAD") -> None:
+        self.repo = Repo(repo_path)
+        self.git_dir = Path(self.repo.git_dir)
+        self.base = self._git("rev-parse", "--verify", f"{base}^{{commit}}") if base else None
+        # path -> (mode, blob SHA), mode None = keep base's; None = remove the path.
+        self.edits: dict[str, tuple[str | None, str] | None] = {}
+
+    def _git(self, *args: str, stdin: str | None = None, env: dict[str, str] | None = None) -> str:
+        proc = subprocess.run(
+            ["git", "--git-dir", str(self.git_dir), *args],
+            input=stdin,
+            capture_output=True,
+            text=True,
+            env={**os.environ, **(env or {})},
+        )
+        if proc.returncode != 0:
+            raise GitCommandError(["git", *args], proc.returncode, proc.stderr.strip())
+        return proc.stdout.strip()
+
+    def write(self, path: str, content: str | bytes, executable: bool | None = None) -> str:
+        """Store content as a blob for path; returns the blob SHA.
+
+        With executable=None a path already in base keeps its mode (100755, 120000);
+        a new path is a regular file.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        sha = str(self.repo.odb.store(IStream(b"blob", len(data), BytesIO(data))).binsha.hex())
+        mode = None if executable is None else EXECUTABLE if executable else REGULAR
+        self.edits[path] = (mode, sha)
+        return sha
+
+    def remove(self, path: str) -> None:
+        self.edits[path] = None
+
+    def _base_modes(self, paths: list[str]) -> dict[str, str]:
+        """Blob modes of paths in base's tree (one ls-tree call); absent paths are left out."""
+        if not self.base or not paths:
+            return {}
+        out = self._git("ls-tree", "-z", "--full-tree", self.base, "--", *paths)
+        modes = {}
+        for entry in out.split("\0"):
+            if entry:
+                meta, path = entry.split("\t", 1)
+                mode = meta.split(" ", 1)[0]
+                if mode in _BLOB_MODES:
+                    modes[path] = mode
+        return modes
+
+    def tree(self) -> str:
+        """SHA of base's tree with the edits applied (a private index file, not the repo's)."""
+        fd, index_file = tempfile.mkstemp(prefix="coding-agents-index-")
+        os.close(fd)
+        os.unlink(index_file)  # git wants to create it itself
+        env = {"GIT_INDEX_FILE": index_file}
+        try:
+            if self.base:
+                self._git("read-tree", self.base, env=env)
+            else:
+                self._git("read-tree", "--empty", env=env)
+            unknown = [p for p, edit in self.edits.items() if edit is not None and edit[0] is None]
+            modes = self._base_modes(unknown)
+            lines = [
+                (
+                    f"0 {_NULL_SHA}\t{path}"
+                    if edit is None
+                    else f"{edit[0] or modes.get(path, REGULAR)} {edit[1]}\t{path}"
+                )
+                for path, edit in self.edits.items()
+            ]
+            if lines:
+                # NUL-terminated records: paths may contain tabs or newlines.
+                stdin = "\0".join(lines) + "\0"
+                self._git("update-index", "-z", "--index-info", stdin=stdin, env=env)
+            return self._git("write-tree", env=env)
+        finally:
+            Path(index_file).unlink(missing_ok=True)
+
+    def commit(self, message: str) -> str:
+        """Create the commit (parent: base) and return its SHA; no ref is moved."""
+        parents = ["-p", self.base] if self.base else []
+        return self._git("commit-tree", self.tree(), *parents, stdin=message)
+
+    def update_ref(self, branch: str, sha: str, force: bool = False) -> None:
+        """Point refs/heads/branch at sha.
+
+        Unless force, this only succeeds while the branch is still at base (or does not
+        exist yet), so two builders racing for one branch cannot overwrite each other.
+        """
+        ref = f"refs/heads/{branch}"
+        if force:
+            self._git("update-ref", ref, sha)
+            return
+        exists = subprocess.run(
+            ["git", "--git-dir", str(self.git_dir), "rev-parse", "--verify", "-q", ref],
+            capture_output=True,
+        )
+        expected = self.base if exists.returncode == 0 and self.base else _NULL_SHA
+        self._git("update-ref", ref, sha, expected)
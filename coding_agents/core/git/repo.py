@@ -2,17 +2,37 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
 import re
 from pathlib import Path
-from typing import Any, List, Optional, cast
+from typing import List, Optional
 
 from git import Repo
 from git.exc import GitCommandError
 
+from coding_agents.core.cassette import active_cassette
+from coding_agents.core.git.blobs import BlobReader
+from coding_agents.core.git.plumbing import CommitBuilder
+
 import time
 from typing import Optional
 
+def hash_blob(data: bytes) -> str:
+    """Git blob SHA-1 of data (same as `git hash-object --stdin`)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def blob_sha(path: str | Path) -> str:
+    """Git blob SHA-1 of a file's current content (same as `git hash-object`)."""
+    return hash_blob(Path(path).read_bytes())
+
+
+def _visible(files: List[str]) -> List[str]:
+    """files without dot-prefixed paths (.git, .github, .coding-agents, ...)."""
+    return [f for f in files if not any(part.startswith(".") for part in f.split("/"))]
+
+
 def _slug(s: str, max_len: int = 30) -> str:
     """Safe branch slug from title."""
     s = re.sub(r"[^\w\s-]", "", s)
@@ -26,6 +46,8 @@ class GitRepo:
     def __init__(self, path: str | Path) -> None:
         self.path = Path(path)
         self._repo: Optional[Repo] = None
+        self._blobs: Optional[BlobReader] = None
+        self._sparse: Optional[bool] = None
 
     @property
     def repo(self) -> Repo:
@@ -33,14 +55,27 @@ class GitRepo:
             self._repo = Repo(self.path)
         return self._repo
 
+    @property
+    def blobs(self) -> BlobReader:
+        """Persistent `git cat-file` reader for this repository (started on first use)."""
+        if self._blobs is None:
+            self._blobs = BlobReader(self.path)
+        return self._blobs
+
+    def close(self) -> None:
+        """Stop the blob reader's git process (a later read starts a new one)."""
+        if self._blobs is not None:
+            self._blobs.close()
+            self._blobs = None
+
     def branch_name(self, issue_id: int, title: str) -> str:
         """Generate branch name: agent/issue-<id>-<slug>."""
         slug = _slug(title)
         return f"agent/issue-{issue_id}-{slug}"
 
-    def create_branch(self, name: str, start: str = "HEAD") -> None:
-        """Create and checkout branch."""
-        self.repo.git.checkout("-b", name, start)
+    def create_branch(self, name: str, start: str = "HEAD", reset: bool = False) -> None:
+        """Create and checkout branch (reset=True moves an existing branch to start)."""
+        self.repo.git.checkout("-B" if reset else "-b", name, start)
 
     def checkout(self, ref: str) -> None:
         """Checkout ref."""
@@ -58,14 +93,8 @@ class GitRepo:
                 self.repo.index.add(safe)
             return
 
-        self.repo.git.add("-A")
-
-        try:
-            self.repo.git.reset("HEAD", "--", ".git")
-        except Exception:
-            pass
-
-        for p in [
+        # One `git add` with exclude pathspecs instead of `add -A` plus a reset per path.
+        excluded = [
             ".venv",
             "venv",
             "__pycache__",
@@ -73,12 +102,9 @@ class GitRepo:
             ".mypy_cache",
             ".ruff_cache",
             ".DS_Store",
-        ]:
-            try:
-                self.repo.git.reset("HEAD", "--", p)
-            except Exception:
-                pass
-
+            ".coding-agents",
+        ]
+        self.repo.git.add("-A", "--", ".", *(f":(exclude){p}" for p in excluded))
 
     def commit(self, message: str, paths: Optional[List[str]] = None) -> str:
         """Commit with message; returns commit sha."""
@@ -86,9 +112,44 @@ class GitRepo:
         commit_obj = self.repo.index.commit(message)
         return commit_obj.hexsha
 
-    def push(self, remote: str = "origin", branch: Optional[str] = None) -> None:
-        """Push branch to remote with retries (more reliable in GitHub Actions)."""
+    def commit_files(
+        self,
+        files: dict[str, Optional[str]],
+        message: str,
+        base: str = "HEAD",
+        branch: Optional[str] = None,
+    ) -> str:
+        """Commit files (None deletes) on top of base without a working tree; returns the SHA.
+
+        Works on bare repositories and leaves the checkout and index alone; with branch,
+        refs/heads/<branch> is moved to the new commit (see CommitBuilder.update_ref).
+        """
+        builder = CommitBuilder(self.path, base)
+        for path, content in files.items():
+            if content is None:
+                builder.remove(path)
+            else:
+                builder.write(path, content)
+        sha = builder.commit(message)
+        if branch:
+            builder.update_ref(branch, sha)
+        return sha
+
+    def push(
+        self, remote: str = "origin", branch: Optional[str] = None, source: Optional[str] = None
+    ) -> None:
+        """Push branch to remote with retries (more reliable in GitHub Actions).
+
+        source (a commit SHA or ref) is pushed as refs/heads/<branch> without needing it
+        checked out, e.g. a commit made with commit_files(). Nothing is pushed while a
+        cassette is replaying: a replayed run must not reach the real remote.
+        """
+        cassette = active_cassette()
+        if cassette is not None and cassette.replaying:
+            return
         ref = branch or self.repo.active_branch.name
+        if source:
+            ref = f"{source}:refs/heads/{ref}"
 
         token = os.environ.get("GITHUB_TOKEN")
         repo_full = os.environ.get("GITHUB_REPOSITORY")  # owner/repo
@@ -123,52 +184,125 @@ class GitRepo:
 
 
     def file_inventory(self, relative_to: str | Path | None = None) -> List[str]:
-        """List tracked files (paths relative to repo root).
+        """List tracked files (paths relative to repo root), from the git index."""
+        _ = relative_to  # intentionally unused for now
+        from coding_agents.core.git.inventory import inventory
 
-        Note: GitPython typing stubs for tree traversal are messy; we cast to Any
-        when reading .type and .path.
-        """
-        out: List[str] = []
+        inv = inventory(self.path)
+        return inv.paths(text_only=False, max_bytes=None) if inv else []
 
-        # If relative_to is provided, we still return paths relative to repo root.
-        # (You can later post-process if you want relative_to paths.)
-        _ = relative_to  # intentionally unused for now
+    def list_files(self, include_untracked: bool = True) -> List[str]:
+        """Text files of the checkout that git does not ignore (tracked, plus untracked).
 
-        for item in self.repo.tree().traverse():
-            it = cast(Any, item)
-            if getattr(it, "type", None) == "blob":
-                p = Path(getattr(it, "path", ""))
-                if p and not str(p).startswith(".git"):
-                    out.append(str(p))
+        Served from the cached index-backed inventory; binary files, files over
+        MAX_FILE_BYTES and dot-prefixed paths are left out. Outside a git checkout
+        the tree is walked instead.
+        """
+        from coding_agents.core.git.inventory import inventory
 
-        return sorted(out)
+        inv = inventory(self.path, include_untracked)
+        return _visible(inv.paths() if inv is not None else self._walk_files())
 
-    def list_files(self) -> List[str]:
-        """List all files in working tree (non-ignored)."""
+    def _walk_files(self) -> List[str]:
         out: List[str] = []
-        for root, _dirs, files in os.walk(self.path):
-            if ".git" in root:
-                continue
+        for root, dirs, files in os.walk(self.path):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
             for f in files:
                 p = Path(root) / f
                 try:
-                    r = p.relative_to(self.path)
-                    if not any(part.startswith(".") for part in r.parts):
-                        out.append(str(r))
+                    out.append(p.relative_to(self.path).as_posix())
                 except ValueError:
                     pass
         return sorted(out)
 
+    def blob_shas(self) -> dict[str, str]:
+        """Blob SHA of every checked-out file in list_files().
+
+        Files unchanged since the last `git add` take the SHA from the index; only
+        modified and untracked files are read and hashed. Files outside a sparse
+        checkout are left out, so indexes built on this cover what is on disk.
+        """
+        from coding_agents.core.git.inventory import inventory
+
+        inv = inventory(self.path, include_untracked=True)
+        staged: dict[str, str] = {}
+        dirty: set[str] = set()
+        if inv is None:
+            files = _visible(self._walk_files())
+        else:
+            sparse = {e.path for e in inv.entries.values() if e.sparse}
+            files = [f for f in _visible(inv.paths()) if f not in sparse]
+            staged = {e.path: e.sha for e in inv.entries.values() if e.sha is not None}
+            try:
+                dirty = set(filter(None, self.repo.git.diff("--name-only", "-z").split("\0")))
+            except GitCommandError:
+                staged = {}
+        out: dict[str, str] = {}
+        for f in files:
+            sha = staged.get(f)
+            out[f] = sha if sha is not None and f not in dirty else blob_sha(self.path / f)
+        return out
+
+    def changed_files(self, base: str = "HEAD") -> List[str]:
+        """Paths changed in the working tree since base, plus untracked non-ignored files."""
+        diff = self.repo.git.diff("--name-only", "-z", base).split("\0")
+        untracked = self.repo.git.ls_files("--others", "--exclude-standard", "-z").split("\0")
+        return sorted(set(filter(None, [*diff, *untracked])))
+
     def write_file(self, path: str, content: str) -> None:
         """Write file under repo root."""
         full = self.path / path
         full.parent.mkdir(parents=True, exist_ok=True)
         full.write_text(content, encoding="utf-8")
 
+    def remove_file(self, path: str) -> None:
+        """Delete file under repo root if present."""
+        (self.path / path).unlink(missing_ok=True)
+
     def read_file(self, path: str) -> str:
         """Read file from repo root."""
         return (self.path / path).read_text(encoding="utf-8")
 
+    def read_files(
+        self, paths: List[str], ref: Optional[str] = None, shas: Optional[dict[str, str]] = None
+    ) -> dict[str, str]:
+        """Text of many files in one batched read; unreadable or missing paths are left out.
+
+        With ref, files come from that commit (no checkout needed). Otherwise files with a
+        known blob SHA are read from the object store and the rest from the working tree.
+        """
+        names = {p: f"{ref}:{p}" if ref else (shas or {}).get(p) for p in paths}
+        found = self.blobs.read_text([n for n in names.values() if n])
+        out: dict[str, str] = {}
+        for path, name in names.items():
+            text = found.get(name) if name else None
+            if text is None and ref is None and self.file_exists(path):
+                text = self.read_file(path)
+            if text is not None:
+                out[path] = text
+        return out
+
+    def materialize(self, paths: List[str]) -> None:
+        """Check out paths in a sparse checkout (no-op otherwise).
+
+        Adds them to the sparse-checkout patterns in one `git sparse-checkout add`, which
+        also fetches their missing blobs in one batch in a partial clone (see RepoMirrors).
+        """
+        from coding_agents.core.git.mirrors import auth_env, sparse_pattern
+
+        if self._sparse is None:
+            # `git config`, not GitPython's reader: the flag lives in config.worktree.
+            try:
+                self._sparse = self.repo.git.config("--bool", "core.sparseCheckout") == "true"
+            except GitCommandError:
+                self._sparse = False
+        missing = [p for p in paths if not self.file_exists(p)]
+        if self._sparse and missing:
+            # Blobs come from the promisor remote (upstream): authenticate this command only.
+            url = self.repo.remote("origin").url if self.repo.remotes else ""
+            env = auth_env(os.environ.get("GITHUB_TOKEN"), url)
+            self.repo.git.sparse_checkout("add", *(sparse_pattern(p) for p in missing), env=env)
+
     def file_exists(self, path: str) -> bool:
         """Check if path exists in repo."""
         return (self.path / path).exists()
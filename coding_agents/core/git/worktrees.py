@@ -0,0 +1,244 @@
+"""Pool of `git worktree` checkouts leased to concurrent agent runs.
+
+All worktrees share the main repository's object store. A lease hands out one
+worktree detached at the base ref; on release it is reset (`checkout --detach
+--force` plus `git clean`) so the next lease starts clean without a new clone.
+The pool never grows past `size`. A lease whose Lease object was dropped without
+release is reclaimed; a held lease is never taken away, even when its holder has
+not called refresh() for `max_lease_s` (a slow run and a hung one look the same
+from here): it is only logged as overdue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import itertools
+import logging
+import os
+import shutil
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from git import Repo
+from git.exc import GitCommandError
+
+from coding_agents.core.index.symbols import INDEX_DIR
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_LEASE_S = 3600.0
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhaustedError(TimeoutError):
+    """No worktree became free within the acquire timeout."""
+
+
+@dataclass
+class Lease:
+    """One leased worktree: run the agent with path as its repo_path."""
+
+    path: Path
+    base_sha: str
+    token: int
+    acquired_at: float = field(default_factory=time.monotonic)
+    _refresh: Callable[[], object] = field(default=lambda: None, repr=False, compare=False)
+
+    def refresh(self) -> None:
+        """Tell the pool the holder is alive (long waits, e.g. CI polling, call this)."""
+        self._refresh()
+
+
+class WorktreePool:
+    """Up to size worktrees of repo_path under root, leased one run at a time."""
+
+    def __init__(
+        self,
+        repo_path: str | Path,
+        size: int = DEFAULT_POOL_SIZE,
+        base_ref: str = "HEAD",
+        root: str | Path | None = None,
+        max_lease_s: float = DEFAULT_MAX_LEASE_S,
+    ) -> None:
+        self.repo = Repo(repo_path)
+        self.size = max(1, size)
+        self.base_ref = base_ref
+        self.root = Path(root) if root else Path(repo_path) / INDEX_DIR / "worktrees"
+        self.max_lease_s = max_lease_s
+        self.overdue = 0
+        self._cond = threading.Condition()
+        self._free: list[Path] = []
+        # path -> (lease token, last refresh); not the Lease itself, so a dropped Lease is collected.
+        self._leased: dict[Path, tuple[int, float]] = {}
+        self._warned: set[int] = set()
+        self._tokens = itertools.count()
+        self._created = 0
+        self._adopt()
+
+    @classmethod
+    def from_env(cls, repo_path: str | Path, size: int | None = None) -> WorktreePool:
+        """Pool of size (default CODING_AGENTS_WORKTREES or 4) on CODING_AGENTS_BASE_REF."""
+        return cls(
+            repo_path,
+            size=size or int(os.environ.get("CODING_AGENTS_WORKTREES", DEFAULT_POOL_SIZE)),
+            base_ref=os.environ.get("CODING_AGENTS_BASE_REF", "HEAD"),
+        )
+
+    def _adopt(self) -> None:
+        """Reuse worktrees left under root by an earlier process; forget vanished ones."""
+        self.repo.git.worktree("prune")
+        registered = {
+            Path(line[len("worktree ") :]).resolve()
+            for line in self.repo.git.worktree("list", "--porcelain").splitlines()
+            if line.startswith("worktree ")
+        }
+        if not self.root.is_dir():
+            return
+        for path in sorted(self.root.iterdir()):
+            if path.resolve() in registered and self._created < self.size:
+                self._free.append(path)
+                self._created += 1
+
+    def _base_sha(self) -> str:
+        return str(self.repo.git.rev_parse(f"{self.base_ref}^{{commit}}"))
+
+    def _reset(self, path: Path, sha: str) -> None:
+        wt = Repo(path).git
+        wt.checkout("--detach", "--force", sha)
+        # Keep the per-checkout index cache; everything else untracked goes.
+        wt.clean("-fdxq", "-e", INDEX_DIR)
+
+    def _slot(self) -> Path:
+        """Path for a new worktree (called under the lock)."""
+        taken = {*self._free, *self._leased}
+        n = 0
+        while self.root / f"wt-{n}" in taken:
+            n += 1
+        return self.root / f"wt-{n}"
+
+    def _create(self, path: Path, sha: str) -> None:
+        if path.exists():  # left behind but no longer registered with git
+            shutil.rmtree(path)
+            self.repo.git.worktree("prune")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.repo.git.worktree("add", "--detach", str(path), sha)
+
+    def _warn_overdue(self) -> None:
+        """Log leases not refreshed for max_lease_s (called under the lock); never frees them."""
+        now = time.monotonic()
+        for path, (token, seen_at) in self._leased.items():
+            if now - seen_at > self.max_lease_s and token not in self._warned:
+                self._warned.add(token)
+                self.overdue += 1
+                logger.warning(
+                    "worktree %s leased for over %.0fs without refresh; still held",
+                    path,
+                    now - seen_at,
+                )
+
+    def refresh(self, path: str | Path, token: int | None = None) -> bool:
+        """Mark the lease on path (with token, if given) as alive; False if it is not held."""
+        path = Path(path)
+        with self._cond:
+            current = self._leased.get(path)
+            if current is None or (token is not None and current[0] != token):
+                return False
+            self._leased[path] = (current[0], time.monotonic())
+            self._warned.discard(current[0])
+            return True
+
+    def acquire(self, timeout: float | None = None) -> Lease:
+        """Lease a worktree reset to the current base ref; blocks while all are leased."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sha = self._base_sha()
+        with self._cond:
+            while True:
+                self._warn_overdue()
+                if self._free or self._created < self.size:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolExhaustedError(f"all {self.size} worktrees are leased")
+                # Wake periodically to report overdue leases; dropped ones notify on collection.
+                self._cond.wait(min(remaining or 30.0, 30.0))
+            fresh = not self._free
+            if fresh:
+                path = self._slot()
+                self._created += 1
+            else:
+                path = self._free.pop()
+            token = next(self._tokens)
+            lease = Lease(path, sha, token, _refresh=functools.partial(self.refresh, path, token))
+            self._leased[path] = (lease.token, lease.acquired_at)
+        # Slow git work happens outside the lock; the slot is already reserved.
+        try:
+            if fresh:
+                self._create(path, lease.base_sha)
+            else:
+                self._reset(path, lease.base_sha)
+        except GitCommandError:
+            with self._cond:
+                del self._leased[path]
+                if fresh:
+                    self._created -= 1
+                else:
+                    self._free.append(path)
+                self._cond.notify()
+            raise
+        # A lease that is garbage-collected without release() goes back to the pool.
+        weakref.finalize(lease, self._release_path, path, lease.token)
+        return lease
+
+    def release(self, lease: Lease, reset: bool = True) -> None:
+        if reset:
+            with contextlib.suppress(GitCommandError):  # reset again on the next acquire
+                self._reset(lease.path, lease.base_sha)
+        self._release_path(lease.path, lease.token)
+
+    def _release_path(self, path: Path, token: int) -> None:
+        with self._cond:
+            current = self._leased.get(path)
+            if current is None or current[0] != token:
+                return  # already released (and maybe leased again)
+            del self._leased[path]
+            self._warned.discard(token)
+            self._free.append(path)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[Path]:
+        """with pool.lease() as path: ... (path is a clean checkout of the base ref)."""
+        held = self.acquire(timeout)
+        try:
+            yield held.path
+        finally:
+            self.release(held)
+
+    @asynccontextmanager
+    async def alease(self, timeout: float | None = None) -> AsyncIterator[Path]:
+        """Async lease(): waiting and git resets run in a worker thread."""
+        held = await asyncio.to_thread(self.acquire, timeout)
+        try:
+            yield held.path
+        finally:
+            await asyncio.to_thread(self.release, held)
+
+    @property
+    def leased(self) -> int:
+        with self._cond:
+            return len(self._leased)
+
+    def close(self) -> None:
+        """Remove all worktrees not currently leased."""
+        with self._cond:
+            for path in self._free:
+                self.repo.git.worktree("remove", "--force", str(path))
+            self._created -= len(self._free)
+            self._free.clear()
@@ -1,7 +1,14 @@
 """GitHub API client (PyGithub): Issues, PR, Checks, Reviews."""
 
+from coding_agents.core.github.cache import github_stats
 from coding_agents.core.github.client import GitHubClient
 from coding_agents.core.github.issues import get_issue_context
 from coding_agents.core.github.pr import get_pr_context, publish_review
 
-__all__ = ["GitHubClient", "get_issue_context", "get_pr_context", "publish_review"]
+__all__ = [
+    "GitHubClient",
+    "get_issue_context",
+    "get_pr_context",
+    "github_stats",
+    "publish_review",
+]
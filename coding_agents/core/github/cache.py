@@ -0,0 +1,138 @@
+"""In-process cache of GitHub objects (repos, issues, PRs) keyed by API URL.
+
+An object fetched within the last ttl_s seconds is returned as is. An older
+one is revalidated with a conditional request (If-None-Match / If-Modified-
+Since from its ETag / Last-Modified): a 304 keeps the cached object and does
+not count against GitHub's rate limit. RequestStats counts every API request
+of the process, so a run can report how many it made: count_requests() hooks
+PyGithub's Requester, so pages of listings, lazy completions and calls made
+directly on PyGithub objects (reviews, PR files) are counted too.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+DEFAULT_TTL_S = 60.0
+
+
+@dataclass
+class RequestStats:
+    """GitHub API requests made by this process, plus object cache outcomes."""
+
+    requests: int = 0
+    hits: int = 0
+    not_modified: int = 0
+    by_kind: Counter[str] = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        kinds = ", ".join(f"{k} {n}" for k, n in self.by_kind.most_common())
+        return (
+            f"{self.requests} requests ({kinds or 'none'}); cache: {self.hits} hits, "
+            f"{self.not_modified} revalidated (304)"
+        )
+
+
+_STATS = RequestStats()
+_STATS_LOCK = threading.Lock()
+
+
+def count_request(kind: str) -> None:
+    with _STATS_LOCK:
+        _STATS.requests += 1
+        _STATS.by_kind[kind] += 1
+
+
+def request_kind(url: str) -> str:
+    """Short label for an API URL: the last named segment, singular before an id.
+
+    /repos/o/r -> repo, /repos/o/r/pulls/5 -> pull, /repos/o/r/pulls/5/files -> files.
+    """
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    if len(parts) == 3 and parts[0] == "repos":
+        return "repo"
+    for i in range(len(parts) - 1, -1, -1):
+        if not re.fullmatch(r"\d+|[0-9a-f]{40}", parts[i]):
+            named = i < len(parts) - 1
+            return parts[i][:-1] if named and parts[i].endswith("s") else parts[i]
+    return "other"
+
+
+# Requester methods that each send exactly one HTTP request.
+_SENDERS = ("requestJson", "requestBlob", "requestMultipart", "requestMemoryBlobAndCheck")
+_HOOK_LOCK = threading.Lock()
+
+
+def count_requests() -> None:
+    """Count every request PyGithub sends in this process (idempotent)."""
+    from github.Requester import Requester
+
+    with _HOOK_LOCK:
+        for name in _SENDERS:
+            send = getattr(Requester, name)
+            if getattr(send, "_counted", False):
+                continue
+
+            def counted(
+                self: Any, verb: str, url: str, *args: Any, _send: Any = send, **kw: Any
+            ) -> Any:
+                count_request(request_kind(url))
+                return _send(self, verb, url, *args, **kw)
+
+            functools.update_wrapper(counted, send)
+            counted._counted = True  # type: ignore[attr-defined]
+            setattr(Requester, name, counted)
+
+
+def github_stats() -> RequestStats:
+    """Process-wide GitHub request counters (one CLI run = one process)."""
+    return _STATS
+
+
+class ObjectCache:
+    """PyGithub objects by URL: fresh for ttl_s, then revalidated with a conditional GET."""
+
+    def __init__(self, ttl_s: float | None = None) -> None:
+        self.ttl_s = (
+            ttl_s
+            if ttl_s is not None
+            else float(os.environ.get("CODING_AGENTS_GH_CACHE_TTL", DEFAULT_TTL_S))
+        )
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, load: Callable[[], Any], revalidate: Callable[[Any], bool]) -> Any:
+        """Cached object for url; load() on a miss, revalidate(obj) (True if changed) when stale."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None:
+            fetched_at, obj = entry
+            if time.monotonic() - fetched_at < self.ttl_s:
+                with _STATS_LOCK:
+                    _STATS.hits += 1
+                return obj
+            if not revalidate(obj):
+                with _STATS_LOCK:
+                    _STATS.not_modified += 1
+        else:
+            obj = load()
+        with self._lock:
+            self._entries[url] = (time.monotonic(), obj)
+        return obj
+
+    def invalidate(self, url: str) -> None:
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,23 +1,26 @@
-"""GitHub API client with retries on rate limit."""
+"""GitHub API client with retries on rate limit and a cache of repo/issue/PR objects."""
 
 from __future__ import annotations
 
 import os
 import time
 from collections.abc import Callable
-from typing import TYPE_CHECKING, Any, Optional, TypeVar, cast
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 from urllib.parse import urlparse
 
 import github
 from github import GithubException
 
+from coding_agents.core.cassette import active_cassette
+from coding_agents.core.github.cache import ObjectCache, count_requests
+
 if TYPE_CHECKING:
     from github.Repository import Repository
 
 T = TypeVar("T")
 
 
-def ensure_http_url(url: Optional[str]) -> str:
+def ensure_http_url(url: str | None) -> str:
     u = (url or "").strip()
     if not u:
         return "https://api.github.com"
@@ -29,18 +32,30 @@ def ensure_http_url(url: Optional[str]) -> str:
 
 def _get_token() -> str:
     token = os.environ.get("GITHUB_TOKEN")
+    cassette = active_cassette()
+    if not token and cassette is not None and cassette.replaying:
+        return "cassette-replay"  # replayed responses never reach GitHub
     if not token:
         raise ValueError("GITHUB_TOKEN environment variable is required")
     return token
 
 
 class GitHubClient:
-    """Wrapper around PyGithub with retries on rate limit and error handling."""
+    """Wrapper around PyGithub with retries on rate limit and error handling.
+
+    Repo, issue and PR objects are cached per client (see ObjectCache), so share one
+    client across a run. Calls that only need an object's URL (listings, comments)
+    build it lazily and make no request for the parent object.
+    """
 
     def __init__(self, token: str | None = None, base_url: str | None = None) -> None:
+        count_requests()
         self._token = token or _get_token()
-        resolved_base_url = ensure_http_url(base_url)
-        self._client = github.Github(self._token, base_url=resolved_base_url)
+        self._base_url = ensure_http_url(base_url)
+        self._client = github.Github(self._token, base_url=self._base_url)
+        # Objects built from a URL without a request; completed on first attribute access.
+        self._lazy = github.Github(self._token, base_url=self._base_url, lazy=True)
+        self.cache = ObjectCache()
 
     def _with_retry(self, fn: Callable[[], T], max_retries: int = 3) -> T:
         for attempt in range(max_retries):
@@ -55,24 +70,88 @@ class GitHubClient:
                 raise
         raise RuntimeError("Unreachable")
 
+    def _cached(self, path: str, make: Callable[[], Any]) -> Any:
+        """Object at API path: cached, or make() (lazy, no request) completed with one GET."""
+
+        def load() -> Any:
+            obj = make()
+            self._with_retry(obj.update)
+            return obj
+
+        def revalidate(obj: Any) -> bool:
+            return bool(self._with_retry(obj.update))
+
+        return self.cache.get(f"{self._base_url}{path}", load, revalidate)
+
+    def _repo_ref(self, full_name: str) -> Repository:
+        """Repository by owner/name without fetching it (for calls that only need its URL)."""
+        return self._lazy.get_repo(full_name)
+
     def get_repo(self, full_name: str) -> Repository:
         """Get repository by owner/name."""
-        return self._with_retry(lambda: self._client.get_repo(full_name))
+        return cast(
+            "Repository",
+            self._cached(f"/repos/{full_name}", lambda: self._repo_ref(full_name)),
+        )
 
     def get_issue(self, full_name: str, issue_number: int) -> Any:
         """Get issue by repo and number."""
-        repo = self.get_repo(full_name)
-        return self._with_retry(lambda: repo.get_issue(issue_number))
+        return self._cached(
+            f"/repos/{full_name}/issues/{issue_number}",
+            lambda: self._repo_ref(full_name).get_issue(issue_number),
+        )
 
     def get_pull(self, full_name: str, pr_number: int) -> Any:
         """Get pull request by repo and number."""
-        repo = self.get_repo(full_name)
-        return self._with_retry(lambda: repo.get_pull(pr_number))
+        return self._cached(
+            f"/repos/{full_name}/pulls/{pr_number}",
+            lambda: self._repo_ref(full_name).get_pull(pr_number),
+        )
+
+    def list_issue_numbers(
+        self, full_name: str, label: str | None = None, state: str = "open"
+    ) -> list[int]:
+        """Numbers of issues (not PRs) in repo, optionally with label, oldest first."""
+        repo = self._repo_ref(full_name)
+
+        def _fetch() -> list[int]:
+            kwargs: dict[str, Any] = {"state": state, "direction": "asc"}
+            if label:
+                kwargs["labels"] = [label]
+            return [i.number for i in repo.get_issues(**kwargs) if i.pull_request is None]
+
+        return self._with_retry(_fetch)
+
+    def list_pull_numbers(
+        self, full_name: str, head_prefix: str = "", state: str = "open"
+    ) -> list[int]:
+        """Numbers of PRs in repo whose head branch starts with head_prefix, oldest first."""
+        repo = self._repo_ref(full_name)
+
+        def _fetch() -> list[int]:
+            pulls = repo.get_pulls(state=state, direction="asc")
+            return [p.number for p in pulls if p.head.ref.startswith(head_prefix)]
+
+        return self._with_retry(_fetch)
+
+    def get_check_runs(self, full_name: str, sha: str) -> list[Any]:
+        """Check runs reported for a commit."""
+        commit = self._repo_ref(full_name).get_commit(sha)
+        return self._with_retry(lambda: list(commit.get_check_runs()))
+
+    def get_reviews(self, full_name: str, pr_number: int) -> list[Any]:
+        """Submitted reviews of a pull request, oldest first."""
+        pull = self._repo_ref(full_name).get_pull(pr_number)
+        return self._with_retry(lambda: list(pull.get_reviews()))
+
+    def get_review_comments(self, full_name: str, pr_number: int) -> list[Any]:
+        """Inline review comments of a pull request."""
+        pull = self._repo_ref(full_name).get_pull(pr_number)
+        return self._with_retry(lambda: list(pull.get_review_comments()))
 
     def create_comment(self, full_name: str, issue_or_pr_number: int, body: str) -> Any:
         """Create comment on issue or PR."""
-        repo = self.get_repo(full_name)
-        issue = self._with_retry(lambda: repo.get_issue(issue_or_pr_number))
+        issue = self._repo_ref(full_name).get_issue(issue_or_pr_number)
         return self._with_retry(lambda: issue.create_comment(body))
 
     def list_workflow_runs(self, full_name: str, branch: str | None = None, per_page: int = 10) -> Any:
@@ -83,7 +162,7 @@ class GitHubClient:
         - We cast repo to Any to avoid mypy false-positives.
         - Some versions do not accept per_page; we limit results in Python.
         """
-        repo = self.get_repo(full_name)
+        repo = self._repo_ref(full_name)
         repo_any = cast(Any, repo)
 
         def _fetch() -> Any:
@@ -0,0 +1,17 @@
+"""Repository indexes used to pick context for the agents."""
+
+from coding_agents.core.index.bm25 import BM25Index, ChunkHit, bm25_available, fuse_rankings
+from coding_agents.core.index.impact import ImpactMap
+from coding_agents.core.index.slices import FileSlice, slice_source
+from coding_agents.core.index.symbols import SymbolIndex
+
+__all__ = [
+    "BM25Index",
+    "ChunkHit",
+    "FileSlice",
+    "ImpactMap",
+    "SymbolIndex",
+    "bm25_available",
+    "fuse_rankings",
+    "slice_source",
+]
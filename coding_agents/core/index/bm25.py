@@ -0,0 +1,268 @@
+"""BM25 retrieval over fixed-size line chunks of repository files (NumPy, memory-mapped).
+
+Files are split into CHUNK_LINES-line chunks and tokenized with the symbol index's
+tokenizer. Terms are feature-hashed into N_BUCKETS, so the on-disk index needs no
+vocabulary: a CSR posting matrix (indptr/docs/tfs) plus per-chunk length, file
+and line arrays, saved as .npy under <repo>/.coding-agents/bm25/ and opened with
+mmap_mode="r". Scoring a query touches only the posting slices of its terms.
+
+The index is rebuilt when any file's blob SHA changes. Requires numpy (the
+`retrieval` extra).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.git import GitRepo
+from coding_agents.core.index.symbols import INDEX_DIR, MAX_PARSE_BYTES, PARALLEL_THRESHOLD, tokens
+
+BM25_VERSION = 1
+CHUNK_LINES = 40
+N_BUCKETS = 1 << 20
+K1 = 1.2
+B = 0.75
+
+_ARRAYS = ("indptr", "docs", "tfs", "doc_len", "chunk_file", "chunk_start", "chunk_end")
+
+
+def _np() -> Any:
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError(
+            "numpy required for BM25 retrieval: pip install coding-agents[retrieval]"
+        ) from err
+    return numpy
+
+
+def bm25_available() -> bool:
+    try:
+        _np()
+    except ImportError:
+        return False
+    return True
+
+
+def _bucket(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) & (N_BUCKETS - 1)
+
+
+def _chunk_file(root: str, path: str) -> list[tuple[int, int, dict[int, int]]]:
+    """Worker: [(start_line, end_line, {bucket: tf})] for one text file (empty if binary/huge)."""
+    full = os.path.join(root, path)
+    try:
+        if os.path.getsize(full) > MAX_PARSE_BYTES:
+            return []
+        with open(full, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+    path_terms = tokens(path)
+    chunks: list[tuple[int, int, dict[int, int]]] = []
+    for start in range(0, max(len(lines), 1), CHUNK_LINES):
+        window = lines[start : start + CHUNK_LINES]
+        # Path terms count once per chunk so file names match even in long files.
+        counts = Counter(_bucket(t) for t in [*path_terms, *tokens("\n".join(window))])
+        if counts:
+            chunks.append((start + 1, start + len(window), dict(counts)))
+    return chunks
+
+
+def fuse_rankings(*rankings: list[str], k: int = 60) -> list[str]:
+    """Reciprocal rank fusion of several best-first path lists."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, path in enumerate(ranking):
+            scores[path] = scores.get(path, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda p: (-scores[p], p))
+
+
+@dataclass
+class ChunkHit:
+    path: str
+    start_line: int
+    end_line: int
+    score: float
+
+
+class BM25Index:
+    """Read-only BM25 index over one repository's chunks (arrays may be memory-mapped)."""
+
+    def __init__(self, paths: list[str], arrays: dict[str, Any], avgdl: float) -> None:
+        self.paths = paths
+        self.arrays = arrays
+        self.avgdl = avgdl
+
+    @property
+    def n_chunks(self) -> int:
+        return int(self.arrays["doc_len"].shape[0])
+
+    @staticmethod
+    def directory(repo_path: str | Path) -> Path:
+        return Path(repo_path) / INDEX_DIR / "bm25"
+
+    @staticmethod
+    def _manifest(shas: dict[str, str]) -> str:
+        digest = hashlib.sha256()
+        for path, sha in sorted(shas.items()):
+            digest.update(f"{path}\0{sha}\n".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def open(cls, repo_path: str | Path, git: GitRepo | None = None) -> BM25Index:
+        """Memory-map the saved index if it matches the working tree; rebuild otherwise."""
+        shas = (git or GitRepo(repo_path)).blob_shas()
+        manifest = cls._manifest(shas)
+        loaded = cls.load(repo_path, manifest)
+        if loaded is not None:
+            return loaded
+        index = cls.build(repo_path, sorted(shas))
+        index.save(repo_path, manifest)
+        return index
+
+    @classmethod
+    def load(cls, repo_path: str | Path, manifest: str | None = None) -> BM25Index | None:
+        np = _np()
+        directory = cls.directory(repo_path)
+        try:
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != BM25_VERSION or (manifest and meta.get("manifest") != manifest):
+            return None
+        try:
+            arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        except (OSError, ValueError):
+            return None
+        return cls(meta["paths"], arrays, float(meta["avgdl"]))
+
+    @classmethod
+    def build(cls, repo_path: str | Path, paths: list[str]) -> BM25Index:
+        np = _np()
+        root = str(repo_path)
+        if len(paths) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 8)) as pool:
+                per_file = list(pool.map(_chunk_file, [root] * len(paths), paths, chunksize=64))
+        else:
+            per_file = [_chunk_file(root, p) for p in paths]
+
+        buckets: list[int] = []
+        docs: list[int] = []
+        tfs: list[int] = []
+        doc_len: list[int] = []
+        chunk_file: list[int] = []
+        chunk_start: list[int] = []
+        chunk_end: list[int] = []
+        for file_id, chunks in enumerate(per_file):
+            for start, end, counts in chunks:
+                doc = len(doc_len)
+                doc_len.append(sum(counts.values()))
+                chunk_file.append(file_id)
+                chunk_start.append(start)
+                chunk_end.append(end)
+                buckets.extend(counts.keys())
+                docs.extend([doc] * len(counts))
+                tfs.extend(counts.values())
+
+        bucket_arr = np.asarray(buckets, dtype=np.int64)
+        order = np.argsort(bucket_arr, kind="stable")
+        indptr = np.zeros(N_BUCKETS + 1, dtype=np.int64)
+        np.cumsum(np.bincount(bucket_arr, minlength=N_BUCKETS), out=indptr[1:])
+        lengths = np.asarray(doc_len, dtype=np.float32)
+        arrays = {
+            "indptr": indptr,
+            "docs": np.asarray(docs, dtype=np.int32)[order],
+            "tfs": np.asarray(tfs, dtype=np.float32)[order],
+            "doc_len": lengths,
+            "chunk_file": np.asarray(chunk_file, dtype=np.int32),
+            "chunk_start": np.asarray(chunk_start, dtype=np.int32),
+            "chunk_end": np.asarray(chunk_end, dtype=np.int32),
+        }
+        avgdl = float(lengths.mean()) if len(lengths) else 1.0
+        return cls(list(paths), arrays, avgdl)
+
+    def save(self, repo_path: str | Path, manifest: str) -> None:
+        np = _np()
+        directory = self.directory(repo_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Drop meta.json first and write it last, so a reader never pairs it with other arrays.
+        (directory / "meta.json").unlink(missing_ok=True)
+        for name in _ARRAYS:
+            tmp = directory / f"{name}.{os.getpid()}.tmp.npy"
+            np.save(tmp, self.arrays[name])
+            os.replace(tmp, directory / f"{name}.npy")
+        meta = {
+            "version": BM25_VERSION,
+            "manifest": manifest,
+            "avgdl": self.avgdl,
+            "paths": self.paths,
+        }
+        tmp_meta = directory / f"meta.{os.getpid()}.tmp"
+        tmp_meta.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_meta, directory / "meta.json")
+
+    def scores(self, text: str) -> Any:
+        """BM25 score of every chunk for the query text (float32 vector)."""
+        np = _np()
+        a = self.arrays
+        n = self.n_chunks
+        scores = np.zeros(n, dtype=np.float32)
+        if not n:
+            return scores
+        norm = K1 * (1 - B + B * a["doc_len"] / self.avgdl)
+        for bucket in {_bucket(t) for t in tokens(text)}:
+            lo, hi = int(a["indptr"][bucket]), int(a["indptr"][bucket + 1])
+            if lo == hi:
+                continue
+            docs = a["docs"][lo:hi]
+            tf = a["tfs"][lo:hi]
+            df = hi - lo
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            scores += np.bincount(
+                docs, weights=idf * tf * (K1 + 1) / (tf + norm[docs]), minlength=n
+            ).astype(np.float32)
+        return scores
+
+    def top_chunks(self, text: str, k: int = 20) -> list[ChunkHit]:
+        np = _np()
+        scores = self.scores(text)
+        positive = int((scores > 0).sum())
+        k = min(k, positive)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        a = self.arrays
+        return [
+            ChunkHit(
+                path=self.paths[int(a["chunk_file"][i])],
+                start_line=int(a["chunk_start"][i]),
+                end_line=int(a["chunk_end"][i]),
+                score=float(scores[i]),
+            )
+            for i in top
+        ]
+
+    def top_files(self, text: str, k: int = 20) -> list[tuple[str, float]]:
+        """Files ranked by their best chunk score."""
+        np = _np()
+        scores = self.scores(text)
+        if not self.n_chunks:
+            return []
+        best = np.zeros(len(self.paths), dtype=np.float32)
+        np.maximum.at(best, self.arrays["chunk_file"], scores)
+        k = min(k, int((best > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-best, k - 1)[:k]
+        top = top[np.argsort(-best[top], kind="stable")]
+        return [(self.paths[int(i)], float(best[i])) for i in top]
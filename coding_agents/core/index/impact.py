@@ -0,0 +1,178 @@
+"""Test-impact selection: which tests can a change break, from the import graph.
+
+Each test file depends on the transitive closure of repo files it imports
+(SymbolIndex import graph). A change selects every test whose closure contains
+a changed file. Closures are cached in <repo>/.coding-agents/impact.json with
+the blob SHA of every file in them, so a refresh only recomputes tests whose
+closure changed. Recorded coverage (pytest-cov with --cov-context=test) can add
+test node ids for code reached without a static import.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.git import GitRepo
+from coding_agents.core.index.symbols import INDEX_DIR, SymbolIndex, module_name
+
+IMPACT_VERSION = 1
+_TEST_FILE = re.compile(r"(?:^|/)(?:test_[^/]*|[^/]*_test)\.py$")
+# Changing any of these can affect every test.
+GLOBAL_FILES = frozenset(
+    {"pyproject.toml", "setup.cfg", "setup.py", "tox.ini", "pytest.ini", "noxfile.py"}
+)
+
+
+def is_test_file(path: str) -> bool:
+    return bool(_TEST_FILE.search(path))
+
+
+def _is_global(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return path in GLOBAL_FILES or (name.startswith("requirements") and name.endswith(".txt"))
+
+
+class ImpactMap:
+    """Test file → import closure (with blob SHAs), plus optional coverage by source file."""
+
+    def __init__(self, index: SymbolIndex) -> None:
+        self.index = index
+        self.deps: dict[str, dict[str, str]] = {}
+        self.coverage: dict[str, set[str]] = {}
+        self.recomputed = 0
+        self._modules_digest = ""
+
+    @property
+    def index_path(self) -> Path:
+        return self.index.repo_path / INDEX_DIR / "impact.json"
+
+    @classmethod
+    def open(
+        cls,
+        repo_path: str | Path,
+        git: GitRepo | None = None,
+        coverage_file: str | Path | None = None,
+    ) -> ImpactMap:
+        """Load the cached map, refresh it against the working tree and persist changes."""
+        impact = cls(SymbolIndex.open(repo_path, git))
+        impact._load()
+        if impact.refresh():
+            impact.save()
+        if coverage_file is not None:
+            impact.load_coverage(coverage_file)
+        return impact
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == IMPACT_VERSION:
+            self._modules_digest = data.get("modules", "")
+            self.deps = {test: dict(shas) for test, shas in data.get("tests", {}).items()}
+
+    def save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        data: dict[str, Any] = {
+            "version": IMPACT_VERSION,
+            "modules": self._modules_digest,
+            "tests": dict(sorted(self.deps.items())),
+        }
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def _closure(self, test: str) -> set[str]:
+        seen = {test}
+        stack = [test]
+        while stack:
+            for dep in self.index.imports_of(stack.pop()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def refresh(self) -> bool:
+        """Recompute closures whose files changed SHA; True if anything changed.
+
+        Adding or removing a module can re-resolve imports anywhere, so it recomputes all.
+        """
+        files = self.index.files
+        modules = sorted(p for p in files if module_name(p))
+        digest = hashlib.sha1("\n".join(modules).encode()).hexdigest()
+        if digest != self._modules_digest:
+            self.deps.clear()
+            self._modules_digest = digest
+        tests = {p for p in files if is_test_file(p)}
+        removed = [t for t in self.deps if t not in tests]
+        for test in removed:
+            del self.deps[test]
+        self.recomputed = 0
+        for test in sorted(tests):
+            cached = self.deps.get(test)
+            if cached is not None and all(
+                p in files and files[p].sha == sha for p, sha in cached.items()
+            ):
+                continue
+            self.deps[test] = {p: files[p].sha for p in sorted(self._closure(test))}
+            self.recomputed += 1
+        return bool(self.recomputed or removed)
+
+    def load_coverage(self, data_file: str | Path) -> int:
+        """Add test node ids per source file from a coverage data file; returns files mapped.
+
+        Needs the optional coverage package and data recorded with per-test contexts.
+        """
+        try:
+            from coverage import CoverageData
+        except ImportError as e:
+            raise ImportError("coverage-based selection needs: pip install coverage") from e
+        data = CoverageData(basename=str(data_file))
+        data.read()
+        root = self.index.repo_path.resolve()
+        for measured in data.measured_files():
+            try:
+                path = Path(measured).resolve().relative_to(root).as_posix()
+            except ValueError:
+                continue
+            nodes: set[str] = set()
+            for contexts in (data.contexts_by_lineno(measured) or {}).values():
+                nodes.update(c.split("|", 1)[0] for c in contexts if "::" in c)
+            if nodes:
+                self.coverage.setdefault(path, set()).update(nodes)
+        return len(self.coverage)
+
+    def select(self, changed: Iterable[str]) -> list[str]:
+        """pytest node ids to run for the changed paths: test files, then coverage node ids."""
+        changed = set(changed)
+        if any(_is_global(p) for p in changed):
+            return sorted(self.deps)
+        selected = {test for test, deps in self.deps.items() if not changed.isdisjoint(deps)}
+        for path in changed:
+            if path.rsplit("/", 1)[-1] == "conftest.py":
+                prefix = path.rsplit("/", 1)[0] + "/" if "/" in path else ""
+                selected.update(t for t in self.deps if t.startswith(prefix))
+            elif path not in self.index.files and module_name(path):
+                selected.update(self._importers_of_removed(module_name(path) or ""))
+        nodes = {
+            node
+            for path in changed
+            for node in self.coverage.get(path, ())
+            if node.split("::", 1)[0] not in selected
+        }
+        return sorted(selected) + sorted(nodes)
+
+    def _importers_of_removed(self, module: str) -> set[str]:
+        """Tests whose closure still imports a module that no longer exists."""
+        importers = {
+            path
+            for path, entry in self.index.files.items()
+            if any(name == module or name.startswith(module + ".") for name in entry.imports)
+        }
+        return {test for test, deps in self.deps.items() if not importers.isdisjoint(deps)}
@@ -0,0 +1,147 @@
+"""AST-sliced views of Python files for prompts.
+
+A large module is shown as a skeleton: module-level code and every class and
+function signature stay, bodies of definitions unrelated to the query collapse
+to one `...  # lines a-b elided` line, and definitions whose names match the
+query are shown in full. Shown lines are verbatim file lines, and FileSlice.regions
+records which ones, so search/replace edits made against the slice can be anchored
+to exact positions in the real file.
+
+Parsed outlines and rendered slices are cached in memory per blob SHA.
+"""
+
+from __future__ import annotations
+
+import ast
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from coding_agents.core.git.repo import hash_blob
+from coding_agents.core.index.symbols import terms
+
+# Files up to this many lines are always sent whole.
+SLICE_MIN_LINES = 120
+# Module-level statements longer than this (data tables, long literals) keep their first line.
+MAX_STATEMENT_LINES = 15
+CACHE_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class Definition:
+    """A class, function or method: lines start (decorators included) .. end, body from body."""
+
+    kind: str
+    name: str
+    start: int
+    body: int
+    end: int
+
+
+@dataclass
+class FileSlice:
+    path: str
+    sha: str
+    text: str
+    regions: list[tuple[int, int]]
+    sliced: bool
+    selected: tuple[str, ...] = ()
+
+
+_cache: OrderedDict[Any, Any] = OrderedDict()
+
+
+def _cached(key: Any, build: Any) -> Any:
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    value = build()
+    _cache[key] = value
+    if len(_cache) > CACHE_ENTRIES:
+        _cache.popitem(last=False)
+    return value
+
+
+def _definition(node: ast.AST, kind: str, name: str) -> Definition:
+    assert isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+    start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+    return Definition(kind, name, start, node.body[0].lineno, node.end_lineno or node.lineno)
+
+
+def outline(source: str) -> list[Definition] | None:
+    """Top-level classes/functions and methods, in file order; None if source does not parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    defs: list[Definition] = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            defs.append(_definition(node, "class", node.name))
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    defs.append(_definition(item, "method", f"{node.name}.{item.name}"))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            defs.append(_definition(node, "function", node.name))
+        elif (node.end_lineno or node.lineno) - node.lineno >= MAX_STATEMENT_LINES:
+            defs.append(
+                Definition("statement", "", node.lineno, node.lineno + 1, node.end_lineno or 0)
+            )
+    return defs
+
+
+def _select(defs: list[Definition], query: set[str]) -> tuple[str, ...]:
+    """Names of definitions matching the query (a matched small class brings its methods)."""
+    selected: list[str] = []
+    for d in defs:
+        if d.kind == "statement" or not terms(d.name.rsplit(".", 1)[-1]) & query:
+            continue
+        selected.append(d.name)
+        if d.kind == "class" and d.end - d.start < SLICE_MIN_LINES:
+            selected.extend(m.name for m in defs if m.name.startswith(f"{d.name}."))
+    return tuple(dict.fromkeys(selected))
+
+
+def _render(lines: list[str], defs: list[Definition], selected: tuple[str, ...]) -> FileSlice:
+    shown = [True] * (len(lines) + 1)  # 1-based
+    chosen = set(selected)
+    for d in defs:
+        # Classes are never hidden wholesale: their methods are sliced individually.
+        # Bodies of one or two lines cost about as much as the elision marker.
+        if d.kind == "class" or d.name in chosen or d.end - d.body < 2:
+            continue
+        for line in range(max(d.body, d.start + 1), d.end + 1):
+            shown[line] = False
+
+    out: list[str] = []
+    regions: list[tuple[int, int]] = []
+    line = 1
+    while line <= len(lines):
+        run_start = line
+        if shown[line]:
+            while line <= len(lines) and shown[line]:
+                line += 1
+            out.extend(lines[run_start - 1 : line - 1])
+            regions.append((run_start, line - 1))
+        else:
+            while line <= len(lines) and not shown[line]:
+                line += 1
+            first = lines[run_start - 1]
+            indent = first[: len(first) - len(first.lstrip())]
+            out.append(f"{indent}...  # lines {run_start}-{line - 1} elided")
+    return FileSlice("", "", "\n".join(out), regions, sliced=True, selected=selected)
+
+
+def slice_source(path: str, source: str, query: str, sha: str | None = None) -> FileSlice:
+    """Whole file if small or unparsable, otherwise a skeleton with query-relevant bodies."""
+    sha = sha or hash_blob(source.encode("utf-8"))
+    lines = source.split("\n")
+    whole = FileSlice(path, sha, source, [(1, len(lines))], sliced=False)
+    if len(lines) <= SLICE_MIN_LINES or not path.endswith(".py"):
+        return whole
+    defs = _cached(("outline", sha), lambda: outline(source))
+    if not defs:
+        return whole
+    selected = _select(defs, terms(query))
+    rendered: FileSlice = _cached(("slice", sha, selected), lambda: _render(lines, defs, selected))
+    return FileSlice(path, sha, rendered.text, rendered.regions, True, rendered.selected)
@@ -0,0 +1,258 @@
+"""Persistent symbol and import-graph index of a repository.
+
+Python files are parsed with ast for top-level classes/functions (and methods)
+and imports; every inventory path is indexed so path matches work for any file.
+The index lives under <repo>/.coding-agents/ and is keyed by git blob SHA, so a
+refresh re-parses only files whose content changed. Large first builds are
+parsed in a process pool.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.git import GitRepo
+
+INDEX_DIR = ".coding-agents"
+INDEX_VERSION = 1
+# Below this many files to parse, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 64
+MAX_PARSE_BYTES = 1_000_000
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+_CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOPWORDS = frozenset(
+    {"and", "are", "for", "from", "that", "the", "this", "with", "add", "fix", "use", "should"}
+    | {"when", "not", "new", "please", "into", "can", "will", "all"}
+)
+
+
+def tokens(text: str) -> list[str]:
+    """Lower-cased words of text in order (with repeats); identifiers also yield their parts.
+
+    "RateLimiter" → ["ratelimiter", "rate", "limiter"]; short words and stopwords are dropped.
+    """
+    out: list[str] = []
+    for word in _WORD.findall(text):
+        parts = _CAMEL.findall(word)
+        candidates = [word.lower()] + ([p.lower() for p in parts] if len(parts) > 1 else [])
+        out.extend(t for t in candidates if len(t) > 2 and t not in _STOPWORDS)
+    return out
+
+
+def terms(text: str) -> set[str]:
+    """Distinct tokens() of text."""
+    return set(tokens(text))
+
+
+def module_name(path: str) -> str | None:
+    """Dotted module for a .py path ("pkg/mod/__init__.py" → "pkg.mod"); None otherwise."""
+    if not path.endswith(".py"):
+        return None
+    parts = path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts) if parts else None
+
+
+@dataclass
+class FileEntry:
+    """Index record for one file: content SHA, symbols (kind, name, line) and imports."""
+
+    sha: str
+    symbols: list[tuple[str, str, int]] = field(default_factory=list)
+    imports: list[str] = field(default_factory=list)
+
+
+def parse_source(path: str, source: str) -> tuple[list[tuple[str, str, int]], list[str]]:
+    """Top-level classes/functions (plus methods) and absolute imported module names."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return [], []
+    symbols: list[tuple[str, str, int]] = []
+    imports: list[str] = []
+    package = (module_name(path) or "").split(".")
+    if not path.endswith("__init__.py"):
+        package = package[:-1]
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            symbols.append(("class", node.name, node.lineno))
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    symbols.append(("method", f"{node.name}.{item.name}", item.lineno))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append(("function", node.name, node.lineno))
+    for sub in ast.walk(tree):
+        if isinstance(sub, ast.Import):
+            imports.extend(alias.name for alias in sub.names)
+        elif isinstance(sub, ast.ImportFrom):
+            base = sub.module or ""
+            if sub.level:
+                prefix = package[: len(package) - sub.level + 1]
+                base = ".".join([*prefix, base] if base else prefix)
+            imports.append(base)
+            imports.extend(f"{base}.{alias.name}" for alias in sub.names if alias.name != "*")
+    return symbols, sorted(set(filter(None, imports)))
+
+
+def _parse_file(root: str, path: str, sha: str) -> tuple[str, FileEntry]:
+    """Worker: parse one file (runs in a process pool on large builds)."""
+    entry = FileEntry(sha=sha)
+    full = os.path.join(root, path)
+    if path.endswith(".py") and os.path.getsize(full) <= MAX_PARSE_BYTES:
+        with open(full, encoding="utf-8", errors="replace") as f:
+            entry.symbols, entry.imports = parse_source(path, f.read())
+    return path, entry
+
+
+class SymbolIndex:
+    """Symbols and import graph for one repository, refreshed incrementally."""
+
+    def __init__(self, repo_path: str | Path) -> None:
+        self.repo_path = Path(repo_path)
+        self.files: dict[str, FileEntry] = {}
+        self.reparsed = 0
+        self._modules: dict[str, str] = {}
+        self._imports: dict[str, set[str]] = {}
+        self._importers: dict[str, set[str]] = {}
+
+    @property
+    def index_path(self) -> Path:
+        return self.repo_path / INDEX_DIR / "symbols.json"
+
+    @classmethod
+    def load(cls, repo_path: str | Path) -> SymbolIndex:
+        """Index from disk (empty if missing or from another version); call refresh() next."""
+        index = cls(repo_path)
+        try:
+            data = json.loads(index.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        for path, raw in data.get("files", {}).items():
+            index.files[path] = FileEntry(
+                sha=raw["sha"],
+                symbols=[(k, n, int(line)) for k, n, line in raw.get("symbols", [])],
+                imports=list(raw.get("imports", [])),
+            )
+        index._link()
+        return index
+
+    @classmethod
+    def open(cls, repo_path: str | Path, git: GitRepo | None = None) -> SymbolIndex:
+        """Load, refresh against the working tree and persist if anything changed."""
+        index = cls.load(repo_path)
+        if index.refresh(git or GitRepo(repo_path)):
+            index.save()
+        return index
+
+    def save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        data: dict[str, Any] = {
+            "version": INDEX_VERSION,
+            "files": {
+                path: {"sha": e.sha, "symbols": e.symbols, "imports": e.imports}
+                for path, e in sorted(self.files.items())
+            },
+        }
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def refresh(self, git: GitRepo) -> bool:
+        """Re-parse files whose blob SHA changed and drop deleted ones; True if changed."""
+        shas = git.blob_shas()
+        stale = [p for p, sha in shas.items() if self.files.get(p, FileEntry("")).sha != sha]
+        removed = [p for p in self.files if p not in shas]
+        for path in removed:
+            del self.files[path]
+        root = str(self.repo_path)
+        if len(stale) >= PARALLEL_THRESHOLD:
+            workers = min(os.cpu_count() or 1, 8)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(
+                        _parse_file,
+                        [root] * len(stale),
+                        stale,
+                        [shas[p] for p in stale],
+                        chunksize=32,
+                    )
+                )
+        else:
+            results = [_parse_file(root, p, shas[p]) for p in stale]
+        self.files.update(results)
+        self.reparsed = len(stale)
+        if stale or removed:
+            self._link()
+        return bool(stale or removed)
+
+    def _link(self) -> None:
+        """Resolve imported module names to repo files (the import graph)."""
+        self._modules = {}
+        for path in self.files:
+            mod = module_name(path)
+            if mod:
+                self._modules[mod] = path
+                # src/ layout: also resolve "pkg.mod" for "src/pkg/mod.py".
+                if mod.startswith("src."):
+                    self._modules.setdefault(mod[4:], path)
+        self._imports = defaultdict(set)
+        self._importers = defaultdict(set)
+        for path, entry in self.files.items():
+            for name in entry.imports:
+                target = self._modules.get(name)
+                if target and target != path:
+                    self._imports[path].add(target)
+                    self._importers[target].add(path)
+
+    def imports_of(self, path: str) -> set[str]:
+        """Repo files that path imports."""
+        return set(self._imports.get(path, ()))
+
+    def importers_of(self, path: str) -> set[str]:
+        """Repo files that import path."""
+        return set(self._importers.get(path, ()))
+
+    def symbols_of(self, path: str) -> list[tuple[str, str, int]]:
+        entry = self.files.get(path)
+        return list(entry.symbols) if entry else []
+
+    def rank(self, text: str, limit: int = 20) -> list[tuple[str, float]]:
+        """Files most relevant to text: symbol and path term matches, plus graph neighbours."""
+        query = terms(text)
+        if not query:
+            return []
+        scores: dict[str, float] = {}
+        for path, entry in self.files.items():
+            score = 2.0 * len(query & terms(path))
+            for _kind, name, _line in entry.symbols:
+                hits = len(query & terms(name))
+                if hits:
+                    score += 3.0 * hits if name.lower() in query else 1.0 * hits
+            if score:
+                scores[path] = score
+        # A file next to strong matches in the import graph is a likely co-change.
+        for path, score in list(scores.items()):
+            for neighbour in self._imports.get(path, set()) | self._importers.get(path, set()):
+                scores[neighbour] = scores.get(neighbour, 0.0) + 0.25 * score
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:limit]
+
+    def outline(self, path: str, max_symbols: int = 8) -> str:
+        """ "path: Class, func, ..." one-liner for prompts."""
+        names = [name for kind, name, _ in self.symbols_of(path) if kind != "method"]
+        if not names:
+            return path
+        more = f", +{len(names) - max_symbols}" if len(names) > max_symbols else ""
+        return f"{path}: {', '.join(names[:max_symbols])}{more}"
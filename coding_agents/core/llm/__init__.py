@@ -1,7 +1,77 @@
-"""LLM adapters: OpenAI (default), YandexGPT; unified interface."""
+"""LLM adapters: OpenAI (default), YandexGPT; unified interface.
 
-from coding_agents.core.llm.base import BaseLLM, LLMResult
-from coding_agents.core.llm.openai_adapter import OpenAILLM
-from coding_agents.core.llm.registry import get_llm
+Exports are resolved lazily (PEP 562) so importing this package does not pull
+in httpx, pydantic or langchain until an adapter is actually used.
+"""
 
-__all__ = ["BaseLLM", "LLMResult", "OpenAILLM", "get_llm"]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from coding_agents.core.llm.base import BaseLLM, LLMResult
+    from coding_agents.core.llm.cache import CachedLLM, DiskCache
+    from coding_agents.core.llm.failover import HedgedLLM
+    from coding_agents.core.llm.openai_adapter import OpenAILLM
+    from coding_agents.core.llm.ratelimit import (
+        RateLimitedLLM,
+        RateLimiter,
+        ThrottledError,
+        get_rate_limiter,
+        limiter_stats,
+    )
+    from coding_agents.core.llm.registry import (
+        aclose_async_pools,
+        aclose_llms,
+        close_llms,
+        get_llm,
+        get_llm_cache,
+    )
+
+_EXPORTS = {
+    "BaseLLM": "base",
+    "LLMResult": "base",
+    "CachedLLM": "cache",
+    "DiskCache": "cache",
+    "HedgedLLM": "failover",
+    "OpenAILLM": "openai_adapter",
+    "RateLimitedLLM": "ratelimit",
+    "RateLimiter": "ratelimit",
+    "ThrottledError": "ratelimit",
+    "get_rate_limiter": "ratelimit",
+    "limiter_stats": "ratelimit",
+    "aclose_async_pools": "registry",
+    "aclose_llms": "registry",
+    "close_llms": "registry",
+    "get_llm": "registry",
+    "get_llm_cache": "registry",
+}
+
+__all__ = [
+    "BaseLLM",
+    "CachedLLM",
+    "DiskCache",
+    "HedgedLLM",
+    "LLMResult",
+    "OpenAILLM",
+    "RateLimitedLLM",
+    "RateLimiter",
+    "ThrottledError",
+    "aclose_async_pools",
+    "aclose_llms",
+    "close_llms",
+    "get_llm",
+    "get_llm_cache",
+    "get_rate_limiter",
+    "limiter_stats",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -2,17 +2,122 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Generator, Iterator
 from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+
+
+def make_usage(
+    prompt_tokens: int | None, completion_tokens: int | None, total_tokens: int | None = None
+) -> dict[str, int] | None:
+    """Provider token counts in the common {prompt,completion,total}_tokens shape."""
+    if prompt_tokens is None and completion_tokens is None and total_tokens is None:
+        return None
+    usage: dict[str, int] = {}
+    if prompt_tokens is not None:
+        usage["prompt_tokens"] = int(prompt_tokens)
+    if completion_tokens is not None:
+        usage["completion_tokens"] = int(completion_tokens)
+    if total_tokens is None and prompt_tokens is not None and completion_tokens is not None:
+        total_tokens = int(prompt_tokens) + int(completion_tokens)
+    if total_tokens is not None:
+        usage["total_tokens"] = int(total_tokens)
+    return usage
 
 
 @dataclass
 class LLMResult:
-    """Result of LLM invocation."""
+    """Result of LLM invocation.
+
+    latency_s: wall time of the provider call; ttft_s: time to the first streamed
+    chunk (None for non-streaming calls); queue_wait_s and retries are filled in
+    by RateLimitedLLM; cached marks a response served from the disk cache.
+    """
 
     content: str
     model: str
     usage: dict[str, int] | None = None
+    latency_s: float | None = None
+    ttft_s: float | None = None
+    queue_wait_s: float = 0.0
+    retries: int = 0
+    cached: bool = False
+
+    @property
+    def prompt_tokens(self) -> int | None:
+        return (self.usage or {}).get("prompt_tokens")
+
+    @property
+    def completion_tokens(self) -> int | None:
+        return (self.usage or {}).get("completion_tokens")
+
+    @property
+    def total_tokens(self) -> int | None:
+        return (self.usage or {}).get("total_tokens")
+
+    def metrics(self) -> dict[str, Any]:
+        """Timing and token counts for span metadata."""
+        return {
+            "model": self.model,
+            "latency_s": self.latency_s,
+            "ttft_s": self.ttft_s,
+            "queue_wait_s": self.queue_wait_s,
+            "retries": self.retries,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+
+# stream() yields text deltas and returns the final LLMResult (content, usage, timings).
+LLMStream = Generator[str, None, LLMResult | None]
+
+
+class StreamCapture:
+    """Iterate an LLMStream, keeping its returned LLMResult and timing it on the consumer side.
+
+    Timings are kept even when the consumer stops early, in which case result stays None.
+    """
+
+    def __init__(self, stream: Iterator[str]) -> None:
+        self._stream = stream
+        self.result: LLMResult | None = None
+        self.chunks = 0
+        self.ttft_s: float | None = None
+        self.latency_s: float | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.monotonic()
+        try:
+            while True:
+                try:
+                    delta = next(self._stream)
+                except StopIteration as stop:
+                    self.result = stop.value
+                    return
+                if self.chunks == 0:
+                    self.ttft_s = time.monotonic() - started
+                self.chunks += 1
+                yield delta
+        finally:
+            self.latency_s = time.monotonic() - started
+            self.close()
+
+    def close(self) -> None:
+        """Abort the underlying stream (e.g. when the consumer stops early)."""
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+
+    def metrics(self) -> dict[str, Any]:
+        if self.result is not None:
+            return self.result.metrics()
+        return {"latency_s": self.latency_s, "ttft_s": self.ttft_s, "completed": False}
 
 
 class BaseLLM(ABC):
@@ -23,8 +128,60 @@ class BaseLLM(ABC):
         """Invoke model with prompt; return structured result."""
         ...
 
+    def stream(self, prompt: str, **kwargs: object) -> LLMStream:
+        """Yield completion text deltas as they arrive and return the final LLMResult.
+
+        The default yields invoke() in one piece. Closing the generator early (e.g. on a
+        disallowed path) should abort the request.
+        """
+        result = self.invoke(prompt, **kwargs)
+        yield result.content
+        return result
+
+    async def ainvoke(self, prompt: str, **kwargs: object) -> LLMResult:
+        """Async invoke; the default offloads the blocking invoke to a worker thread."""
+        return await asyncio.to_thread(self.invoke, prompt, **kwargs)
+
     @property
     @abstractmethod
     def model_name(self) -> str:
         """Model identifier for logging."""
         ...
+
+    def close(self) -> None:
+        """Release pooled connections; adapters without resources need not override."""
+        return None
+
+    def __enter__(self) -> BaseLLM:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def aclose(self) -> None:
+        """Async counterpart of close(); also releases async connection pools."""
+        self.close()
+
+    async def aclose_async_pools(self) -> None:
+        """Close only the async connection pools; the next async call opens new ones.
+
+        An httpx.AsyncClient belongs to the event loop that first used it: call this
+        before that loop ends (e.g. at the end of asyncio.run()).
+        """
+        return None
+
+    async def __aenter__(self) -> BaseLLM:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
@@ -0,0 +1,216 @@
+"""Content-addressed on-disk cache for LLM responses (size-bounded LRU + TTL)."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream, StreamCapture
+
+_RESULT_FIELDS = {f.name for f in fields(LLMResult)}
+
+
+def _default_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(os.environ.get("CODING_AGENTS_LLM_CACHE_DIR", Path(base) / "coding-agents" / "llm"))
+
+
+def cache_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+    """Stable sha256 over everything that determines the completion."""
+    blob = json.dumps(
+        {"provider": provider, "model": model, "temperature": temperature, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters for one cache instance (process-local)."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+
+class DiskCache:
+    """One JSON file per key under <dir>/<key[:2]>/<key>.json.
+
+    Recency is tracked via file mtime (bumped on hit), so LRU order survives
+    restarts and is shared by concurrent processes using the same directory.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self.directory = Path(directory) if directory else _default_dir()
+        self.max_bytes = max_bytes or int(
+            os.environ.get("CODING_AGENTS_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+        )
+        self.ttl_seconds = ttl_seconds or float(
+            os.environ.get("CODING_AGENTS_LLM_CACHE_TTL", str(7 * 24 * 3600))
+        )
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out: list[tuple[float, int, Path]] = []
+        if not self.directory.exists():
+            return out
+        for p in self.directory.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self.stats.misses += 1
+                return None
+            if time.time() - float(entry.get("created", 0)) > self.ttl_seconds:
+                self._remove(path)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            with contextlib.suppress(OSError):
+                os.utime(path)
+            self.stats.hits += 1
+            return dict(entry["value"])
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        path = self._path(key)
+        data = json.dumps({"created": time.time(), "value": value}, ensure_ascii=False)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size = self._current_size() - previous + path.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if self._size is not None:
+            self._size -= size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the store is at 90% of max_bytes."""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _mtime, _size, path in entries:
+            if self._size <= target:
+                break
+            self._remove(path)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._size = 0
+
+
+class CachedLLM(BaseLLM):
+    """BaseLLM wrapper that serves repeated (provider, model, temperature, prompt) from disk."""
+
+    def __init__(self, inner: BaseLLM, provider: str, temperature: float, cache: DiskCache) -> None:
+        self.inner = inner
+        self.provider = provider
+        self.temperature = temperature
+        self.cache = cache
+
+    @property
+    def model_name(self) -> str:
+        return self.inner.model_name
+
+    def _key(self, prompt: str, kwargs: dict[str, Any]) -> str:
+        temperature = float(kwargs.get("temperature", self.temperature))
+        return cache_key(self.provider, self.model_name, temperature, prompt)
+
+    @staticmethod
+    def _from_entry(entry: dict[str, Any], started: float) -> LLMResult:
+        """Rebuild a hit; timings describe the lookup, not the original call."""
+        values = {k: v for k, v in entry.items() if k in _RESULT_FIELDS}
+        values.update(
+            latency_s=time.monotonic() - started, ttft_s=None, queue_wait_s=0.0, retries=0
+        )
+        values["cached"] = True
+        return LLMResult(**values)
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        started = time.monotonic()
+        key = self._key(prompt, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self._from_entry(entry, started)
+        result = self.inner.invoke(prompt, **kwargs)
+        self.cache.put(key, asdict(result))
+        return result
+
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        """Replay a hit in one piece; on a miss, cache only a fully consumed stream."""
+        started = time.monotonic()
+        key = self._key(prompt, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None:
+            hit = self._from_entry(entry, started)
+            yield hit.content
+            return hit
+        parts: list[str] = []
+        capture = StreamCapture(self.inner.stream(prompt, **kwargs))
+        for delta in capture:
+            parts.append(delta)
+            yield delta
+        result = capture.result or LLMResult(content="".join(parts), model=self.model_name)
+        self.cache.put(key, asdict(result))
+        return result
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        started = time.monotonic()
+        key = self._key(prompt, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self._from_entry(entry, started)
+        result = await self.inner.ainvoke(prompt, **kwargs)
+        self.cache.put(key, asdict(result))
+        return result
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
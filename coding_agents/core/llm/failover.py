@@ -0,0 +1,293 @@
+"""Hedged requests, provider failover and circuit breaking over several BaseLLMs.
+
+Each member (provider:model) has a process-wide latency histogram and circuit
+breaker. HedgedLLM calls the first healthy member; if no answer arrives within
+that member's latency percentile it sends the same prompt to the next healthy
+member and returns whichever good answer comes first. Errors fail over to the
+next member and count against the breaker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream, StreamCapture
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+class LatencyHistogram:
+    """Rolling window of recent successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 10) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """p in [0, 100]; None until min_samples latencies have been seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """closed → open after failure_threshold consecutive errors; one trial call after reset_timeout."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether allow() would admit a call, without moving OPEN to HALF_OPEN."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            return (
+                self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout
+            )
+
+    def allow(self) -> bool:
+        """Admit a call; an OPEN breaker past reset_timeout becomes HALF_OPEN (one trial)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class ProviderHealth:
+    histogram: LatencyHistogram
+    breaker: CircuitBreaker
+
+
+_HEALTH: dict[str, ProviderHealth] = {}
+_HEALTH_LOCK = threading.Lock()
+
+
+def provider_health(name: str) -> ProviderHealth:
+    """Process-wide latency/breaker state for one provider:model."""
+    with _HEALTH_LOCK:
+        health = _HEALTH.get(name)
+        if health is None:
+            health = ProviderHealth(
+                histogram=LatencyHistogram(),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(
+                        os.environ.get("CODING_AGENTS_LLM_BREAKER_FAILURES", "5")
+                    ),
+                    reset_timeout=float(os.environ.get("CODING_AGENTS_LLM_BREAKER_RESET", "30")),
+                ),
+            )
+            _HEALTH[name] = health
+        return health
+
+
+@dataclass
+class Member:
+    name: str
+    llm: BaseLLM
+
+    @property
+    def health(self) -> ProviderHealth:
+        return provider_health(self.name)
+
+
+class HedgedLLM(BaseLLM):
+    """Composite BaseLLM over members in preference order (primary first)."""
+
+    def __init__(
+        self,
+        members: list[tuple[str, BaseLLM]],
+        hedge_percentile: float | None = None,
+        initial_hedge_after: float | None = None,
+    ) -> None:
+        if not members:
+            raise ValueError("HedgedLLM needs at least one member")
+        self.members = [Member(name, llm) for name, llm in members]
+        self.hedge_percentile = hedge_percentile or float(
+            os.environ.get("CODING_AGENTS_LLM_HEDGE_PERCENTILE", "95")
+        )
+        self.initial_hedge_after = initial_hedge_after or float(
+            os.environ.get("CODING_AGENTS_LLM_HEDGE_AFTER", "20")
+        )
+
+    @property
+    def model_name(self) -> str:
+        return self.members[0].llm.model_name
+
+    def _candidates(self) -> list[Member]:
+        """Members whose breaker admits a call; if all are open, try them all anyway.
+
+        Ranking only peeks at the breakers: allow() (and with it the HALF_OPEN trial)
+        is taken in _start() for the members actually launched.
+        """
+        healthy = [m for m in self.members if m.health.breaker.available()]
+        return healthy or list(self.members)
+
+    @staticmethod
+    def _start(member: Member) -> None:
+        member.health.breaker.allow()
+
+    def hedge_delay(self, member: Member) -> float:
+        observed = member.health.histogram.percentile(self.hedge_percentile)
+        return observed if observed is not None else self.initial_hedge_after
+
+    @staticmethod
+    def _record(member: Member, started: float, ok: bool) -> None:
+        if ok:
+            member.health.histogram.record(time.monotonic() - started)
+            member.health.breaker.record_success()
+        else:
+            member.health.breaker.record_failure()
+
+    def _call(self, member: Member, prompt: str, kwargs: dict[str, Any]) -> LLMResult:
+        started = time.monotonic()
+        try:
+            result = member.llm.invoke(prompt, **kwargs)
+        except Exception:
+            self._record(member, started, ok=False)
+            raise
+        self._record(member, started, ok=True)
+        return result
+
+    async def _acall(self, member: Member, prompt: str, kwargs: dict[str, Any]) -> LLMResult:
+        started = time.monotonic()
+        try:
+            result = await member.llm.ainvoke(prompt, **kwargs)
+        except Exception:
+            self._record(member, started, ok=False)
+            raise
+        self._record(member, started, ok=True)
+        return result
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        queue = self._candidates()
+        pending: dict[Future[LLMResult], Member] = {}
+        errors: list[Exception] = []
+        last: Member | None = None
+
+        def launch() -> None:
+            nonlocal last
+            last = queue.pop(0)
+            self._start(last)
+            pending[_EXECUTOR.submit(self._call, last, prompt, kwargs)] = last
+
+        launch()
+        while pending:
+            timeout = self.hedge_delay(last) if queue and last is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                launch()  # slow tail: hedge to the next member
+                continue
+            for fut in done:
+                pending.pop(fut)
+                try:
+                    return fut.result()
+                except Exception as e:
+                    errors.append(e)
+            if not pending and queue:
+                launch()  # all in-flight calls failed: fail over
+        raise RuntimeError(f"All LLM providers failed: {errors}") from errors[-1]
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        queue = self._candidates()
+        pending: dict[asyncio.Task[LLMResult], Member] = {}
+        errors: list[Exception] = []
+        last: Member | None = None
+
+        def launch() -> None:
+            nonlocal last
+            last = queue.pop(0)
+            self._start(last)
+            pending[asyncio.ensure_future(self._acall(last, prompt, kwargs))] = last
+
+        launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay(last) if queue and last is not None else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        errors.append(e)
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise RuntimeError(f"All LLM providers failed: {errors}") from errors[-1]
+
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        """Fail over between members until one produces its first chunk (no hedging)."""
+        errors: list[Exception] = []
+        for member in self._candidates():
+            self._start(member)
+            started = time.monotonic()
+            capture = StreamCapture(member.llm.stream(prompt, **kwargs))
+            try:
+                yield from capture
+            except Exception as e:
+                self._record(member, started, ok=False)
+                if capture.chunks:
+                    raise
+                errors.append(e)
+                continue
+            self._record(member, started, ok=True)
+            return capture.result
+        raise RuntimeError(f"All LLM providers failed: {errors}") from errors[-1]
+
+    def close(self) -> None:
+        for member in self.members:
+            member.llm.close()
+
+    async def aclose(self) -> None:
+        for member in self.members:
+            await member.llm.aclose()
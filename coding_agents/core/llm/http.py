@@ -0,0 +1,65 @@
+"""Shared HTTP connection pools for LLM adapters (keep-alive, HTTP/2, bounded limits)."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+import httpx
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool limits; defaults overridable via CODING_AGENTS_LLM_* env vars."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    timeout: float = 60.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> PoolConfig:
+        return cls(
+            max_connections=int(os.environ.get("CODING_AGENTS_LLM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("CODING_AGENTS_LLM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.environ.get("CODING_AGENTS_LLM_KEEPALIVE_EXPIRY", "60")),
+            timeout=float(os.environ.get("CODING_AGENTS_LLM_TIMEOUT", "60")),
+            http2=os.environ.get("CODING_AGENTS_LLM_HTTP2", "1") not in ("0", "false", "no"),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def make_client(config: PoolConfig | None = None) -> httpx.Client:
+    """Build a long-lived pooled client; HTTP/2 only if the h2 extra is installed."""
+    cfg = config or PoolConfig.from_env()
+    return httpx.Client(
+        limits=cfg.limits,
+        timeout=cfg.timeout,
+        http2=cfg.http2 and _http2_available(),
+    )
+
+
+def make_async_client(config: PoolConfig | None = None) -> httpx.AsyncClient:
+    """Async counterpart of make_client; bound to the event loop that first uses it."""
+    cfg = config or PoolConfig.from_env()
+    return httpx.AsyncClient(
+        limits=cfg.limits,
+        timeout=cfg.timeout,
+        http2=cfg.http2 and _http2_available(),
+    )
@@ -3,62 +3,192 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 
-from pydantic import SecretStr
+import httpx
 
-from coding_agents.core.llm.base import BaseLLM, LLMResult
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream, make_usage
+from coding_agents.core.llm.http import PoolConfig, make_async_client, make_client
+from coding_agents.core.llm.ratelimit import ThrottledError, parse_retry_after
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+
+def _as_throttled(err: Exception) -> ThrottledError | None:
+    """Map an OpenAI 429 to ThrottledError so the shared limiter can back off."""
+    if getattr(err, "status_code", None) != 429:
+        return None
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    return ThrottledError(f"OpenAI throttled: {err}", parse_retry_after(headers.get("retry-after")))
+
+
+def _usage(message: Any) -> dict[str, int] | None:
+    """Token usage from a LangChain message: usage_metadata, else response_metadata.token_usage."""
+    meta = getattr(message, "usage_metadata", None)
+    if isinstance(meta, dict) and meta:
+        return make_usage(
+            meta.get("input_tokens"), meta.get("output_tokens"), meta.get("total_tokens")
+        )
+    response_meta = getattr(message, "response_metadata", None)
+    if isinstance(response_meta, dict):
+        u = response_meta.get("token_usage")
+        if isinstance(u, dict):
+            return make_usage(
+                u.get("prompt_tokens"), u.get("completion_tokens"), u.get("total_tokens")
+            )
+    return None
 
 
 class OpenAILLM(BaseLLM):
-    """OpenAI Chat Completions; default model gpt-4o-mini."""
+    """OpenAI Chat Completions; default model gpt-4o-mini.
+
+    The ChatOpenAI model and its pooled httpx clients (sync and async) are built
+    once and reused, so consecutive calls share warm keep-alive connections.
+    """
 
     def __init__(
         self,
         api_key: str | None = None,
         model: str = "gpt-4o-mini",
         temperature: float = 0.2,
+        pool: PoolConfig | None = None,
     ) -> None:
         api_key_str = api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key_str:
             raise ValueError("OPENAI_API_KEY not set")
 
-        self._api_key = SecretStr(api_key_str)
+        from pydantic import SecretStr
+
+        self._api_key: SecretStr = SecretStr(api_key_str)
         self._model = model
         self._temperature = temperature
+        self._pool = pool or PoolConfig.from_env()
+        self._http_client: httpx.Client | None = None
+        self._http_async_client: httpx.AsyncClient | None = None
+        self._chat_models: dict[float, Any] = {}
+        self._lock = threading.Lock()
 
     @property
     def model_name(self) -> str:
         return self._model
 
-    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+    def _chat_model(self, temperature: float) -> Any:
+        """Return the cached ChatOpenAI for this temperature, creating it on first use."""
+        llm = self._chat_models.get(temperature)
+        if llm is not None:
+            return llm
         try:
             from langchain_openai import ChatOpenAI
         except ImportError as err:
             raise ImportError("langchain-openai required for OpenAILLM") from err
 
-        llm = ChatOpenAI(
-            model=self._model,
-            temperature=float(kwargs.get("temperature", self._temperature)),
-            api_key=self._api_key,
-        )
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = make_client(self._pool)
+            if self._http_async_client is None:
+                self._http_async_client = make_async_client(self._pool)
+            llm = self._chat_models.get(temperature)
+            if llm is None:
+                llm = ChatOpenAI(
+                    model=self._model,
+                    temperature=temperature,
+                    api_key=self._api_key,
+                    http_client=self._http_client,
+                    http_async_client=self._http_async_client,
+                    timeout=self._pool.timeout,
+                    # 429s surface as ThrottledError and are retried by RateLimitedLLM.
+                    max_retries=0,
+                    # Final stream chunk carries token usage.
+                    stream_usage=True,
+                )
+                self._chat_models[temperature] = llm
+        return llm
+
+    def close(self) -> None:
+        with self._lock:
+            self._chat_models.clear()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            # An async pool cannot be closed synchronously; drop it so aclose()/GC reclaims it.
+            self._http_async_client = None
 
-        response = llm.invoke(prompt)
+    async def aclose(self) -> None:
+        async_client, self._http_async_client = self._http_async_client, None
+        if async_client is not None:
+            await async_client.aclose()
+        self.close()
 
+    async def aclose_async_pools(self) -> None:
+        with self._lock:
+            async_client, self._http_async_client = self._http_async_client, None
+            # Chat models hold the async client: rebuilt with a new one on next use.
+            self._chat_models.clear()
+        if async_client is not None:
+            await async_client.aclose()
+
+    def _to_result(self, response: Any, started: float) -> LLMResult:
         content = getattr(response, "content", None)
         if not isinstance(content, str):
             content = str(content)
+        return LLMResult(
+            content=content,
+            model=self._model,
+            usage=_usage(response),
+            latency_s=time.monotonic() - started,
+        )
 
-        usage: dict[str, Any] = {}
-        meta = getattr(response, "response_metadata", None)
-        if isinstance(meta, dict):
-            u = meta.get("usage")
-            if isinstance(u, dict):
-                usage = u
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        llm = self._chat_model(float(kwargs.get("temperature", self._temperature)))
+        started = time.monotonic()
+        try:
+            return self._to_result(llm.invoke(prompt), started)
+        except Exception as e:
+            throttled = _as_throttled(e)
+            if throttled is not None:
+                raise throttled from e
+            raise
 
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        llm = self._chat_model(float(kwargs.get("temperature", self._temperature)))
+        started = time.monotonic()
+        ttft: float | None = None
+        usage: dict[str, int] | None = None
+        parts: list[str] = []
+        try:
+            for chunk in llm.stream(prompt):
+                usage = _usage(chunk) or usage
+                content = getattr(chunk, "content", "")
+                if content:
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    text = content if isinstance(content, str) else str(content)
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            throttled = _as_throttled(e)
+            if throttled is not None:
+                raise throttled from e
+            raise
         return LLMResult(
-            content=content,
+            content="".join(parts),
             model=self._model,
-            raw=response,
             usage=usage,
+            latency_s=time.monotonic() - started,
+            ttft_s=ttft,
         )
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        llm = self._chat_model(float(kwargs.get("temperature", self._temperature)))
+        started = time.monotonic()
+        try:
+            return self._to_result(await llm.ainvoke(prompt), started)
+        except Exception as e:
+            throttled = _as_throttled(e)
+            if throttled is not None:
+                raise throttled from e
+            raise
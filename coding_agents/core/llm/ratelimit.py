@@ -0,0 +1,337 @@
+"""Process-wide adaptive rate limiting for LLM calls.
+
+Each provider gets one RateLimiter shared by every adapter and chain in the
+process. It combines a requests-per-second bucket, a tokens-per-minute bucket
+and an AIMD concurrency window: the window grows additively on success and is
+halved on a throttling response, and a Retry-After pauses all callers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream, StreamCapture
+
+_POLL_SECONDS = 0.05
+
+
+class ThrottledError(RuntimeError):
+    """Provider answered 429 (or equivalent); retry_after in seconds if it said so."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as delta-seconds or HTTP-date → seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Classic token bucket; amounts may exceed capacity (the caller waits for a full bucket)."""
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.level
+        return 0.0 if needed <= 0 else needed / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+@dataclass
+class LimiterStats:
+    acquired: int = 0
+    throttled: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+
+class RateLimiter:
+    """RPS + TPM buckets with an AIMD concurrency window (see module docstring)."""
+
+    def __init__(
+        self,
+        requests_per_second: float | None = None,
+        tokens_per_minute: float | None = None,
+        initial_concurrency: float = 4.0,
+        max_concurrency: float = 32.0,
+    ) -> None:
+        self._requests = (
+            TokenBucket(requests_per_second, max(1.0, requests_per_second))
+            if requests_per_second
+            else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute else None
+        )
+        self.concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.stats = LimiterStats()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, provider: str) -> RateLimiter:
+        """CODING_AGENTS_LLM_<PROVIDER>_RPS / _TPM / _CONCURRENCY / _MAX_CONCURRENCY."""
+        prefix = f"CODING_AGENTS_LLM_{provider.upper()}_"
+
+        def num(name: str) -> float | None:
+            raw = os.environ.get(prefix + name)
+            return float(raw) if raw else None
+
+        return cls(
+            requests_per_second=num("RPS"),
+            tokens_per_minute=num("TPM"),
+            initial_concurrency=num("CONCURRENCY") or 4.0,
+            max_concurrency=num("MAX_CONCURRENCY") or 32.0,
+        )
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take a slot and return 0, or return how long to wait before retrying."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.in_flight >= math.floor(self.concurrency):
+            return _POLL_SECONDS
+        waits = [0.0]
+        if self._requests is not None:
+            waits.append(self._requests.wait_time(1, now))
+        if self._tokens is not None:
+            waits.append(self._tokens.wait_time(tokens, now))
+        if max(waits) > 0:
+            return max(waits)
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+        self.in_flight += 1
+        return 0.0
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            self.stats.queue_depth += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+
+    def _leave_queue(self, waited: float) -> float:
+        with self._lock:
+            self.stats.queue_depth -= 1
+            self.stats.acquired += 1
+            self.stats.total_wait += waited
+            self.stats.max_wait = max(self.stats.max_wait, waited)
+        return waited
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until a slot is free; return seconds spent waiting."""
+        started = time.monotonic()
+        self._enter_queue()
+        while True:
+            with self._lock:
+                delay = self._try_acquire(tokens)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+        return self._leave_queue(time.monotonic() - started)
+
+    async def aacquire(self, tokens: float = 0) -> float:
+        started = time.monotonic()
+        self._enter_queue()
+        while True:
+            with self._lock:
+                delay = self._try_acquire(tokens)
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        return self._leave_queue(time.monotonic() - started)
+
+    def release(self, ok: bool, tokens_delta: float = 0) -> None:
+        """Free the slot; ok=True grows the window by ~1 per window's worth of successes."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if ok:
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1 / self.concurrency
+                )
+            if self._tokens is not None and tokens_delta:
+                self._tokens.take(tokens_delta)
+
+    def on_throttle(self, retry_after: float | None) -> None:
+        """Multiplicative decrease; pause everyone until Retry-After if given."""
+        with self._lock:
+            self.stats.throttled += 1
+            self.concurrency = max(1.0, self.concurrency / 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+_LIMITERS: dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Process-wide limiter for provider, configured from env on first use."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = RateLimiter.from_env(provider)
+            _LIMITERS[provider] = limiter
+        return limiter
+
+
+def limiter_stats() -> dict[str, LimiterStats]:
+    """Snapshot of queue depth / wait-time metrics for every provider used so far."""
+    with _LIMITERS_LOCK:
+        return {provider: limiter.stats for provider, limiter in _LIMITERS.items()}
+
+
+def _estimate_tokens(prompt: str) -> int:
+    # ~4 chars/token for the prompt plus a typical completion; corrected by actual usage.
+    return len(prompt) // 4 + 512
+
+
+def _actual_tokens(result: LLMResult) -> int | None:
+    usage = result.usage or {}
+    total = usage.get("total_tokens")
+    return int(total) if isinstance(total, int) else None
+
+
+class RateLimitedLLM(BaseLLM):
+    """Wraps an adapter: waits for a limiter slot, retries throttled calls with backoff.
+
+    Results carry the total limiter wait (queue_wait_s) and the number of retries.
+    """
+
+    def __init__(
+        self, inner: BaseLLM, limiter: RateLimiter, max_retries: int | None = None
+    ) -> None:
+        self.inner = inner
+        self.limiter = limiter
+        self.max_retries = (
+            max_retries
+            if max_retries is not None
+            else int(os.environ.get("CODING_AGENTS_LLM_MAX_RETRIES", "4"))
+        )
+
+    @property
+    def model_name(self) -> str:
+        return self.inner.model_name
+
+    @staticmethod
+    def _backoff(attempt: int, err: ThrottledError) -> float:
+        # With Retry-After the limiter itself pauses all callers; otherwise back off exponentially.
+        return 0.0 if err.retry_after is not None else min(30.0, 2.0**attempt)
+
+    def _settle(self, ok: bool, estimate: int, result: LLMResult | None = None) -> None:
+        actual = _actual_tokens(result) if result is not None else None
+        self.limiter.release(ok, tokens_delta=(actual - estimate) if actual is not None else 0)
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        estimate = _estimate_tokens(prompt)
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += self.limiter.acquire(estimate)
+            try:
+                result = self.inner.invoke(prompt, **kwargs)
+            except ThrottledError as e:
+                self._settle(False, estimate)
+                self.limiter.on_throttle(e.retry_after)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            except Exception:
+                self._settle(False, estimate)
+                raise
+            self._settle(True, estimate, result)
+            return replace(result, queue_wait_s=waited, retries=attempt)
+        raise RuntimeError("Unreachable")
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        estimate = _estimate_tokens(prompt)
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += await self.limiter.aacquire(estimate)
+            try:
+                result = await self.inner.ainvoke(prompt, **kwargs)
+            except ThrottledError as e:
+                self._settle(False, estimate)
+                self.limiter.on_throttle(e.retry_after)
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            except Exception:
+                self._settle(False, estimate)
+                raise
+            self._settle(True, estimate, result)
+            return replace(result, queue_wait_s=waited, retries=attempt)
+        raise RuntimeError("Unreachable")
+
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        """Holds one slot for the whole stream; throttling is retried only before the first chunk."""
+        estimate = _estimate_tokens(prompt)
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += self.limiter.acquire(estimate)
+            capture = StreamCapture(self.inner.stream(prompt, **kwargs))
+            try:
+                yield from capture
+            except ThrottledError as e:
+                self._settle(False, estimate)
+                self.limiter.on_throttle(e.retry_after)
+                if capture.chunks or attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            except BaseException:
+                self._settle(False, estimate)
+                raise
+            self._settle(True, estimate, capture.result)
+            if capture.result is None:
+                return None
+            return replace(capture.result, queue_wait_s=waited, retries=attempt)
+        return None
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    async def aclose_async_pools(self) -> None:
+        await self.inner.aclose_async_pools()
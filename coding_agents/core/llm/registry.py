@@ -1,24 +1,168 @@
-"""LLM registry: openai (default) or yandex."""
+"""LLM registry: openai (default) or yandex.
+
+Adapters are memoized per (provider, model, temperature) so a long-running
+process (e.g. `coding-agents serve`) reuses their warm connection pools, and
+each sits behind its provider's shared RateLimiter.
+With fallbacks configured (per call or CODING_AGENTS_LLM_FALLBACK, e.g.
+"yandex,openai:gpt-4o") the adapters are combined into a HedgedLLM. With cache
+enabled (per call or CODING_AGENTS_LLM_CACHE=1) the result is wrapped in
+CachedLLM backed by one process-wide DiskCache. Inside use_cassette() the LLM
+is wrapped in CassetteLLM, which records calls or replays them without creating
+an adapter (no API keys needed).
+"""
 
 from __future__ import annotations
 
 import os
+import threading
 
+from coding_agents.core.cassette import CassetteLLM, active_cassette
 from coding_agents.core.llm.base import BaseLLM
-from coding_agents.core.llm.openai_adapter import OpenAILLM
-from coding_agents.core.llm.yandex_adapter import YandexLLM
+from coding_agents.core.llm.cache import CachedLLM, DiskCache
+from coding_agents.core.llm.failover import HedgedLLM
+from coding_agents.core.llm.ratelimit import RateLimitedLLM, get_rate_limiter
+
+_INSTANCES: dict[tuple[str, str, float], BaseLLM] = {}
+# Hedged/cached wrappers around _INSTANCES, keyed by their full configuration.
+_WRAPPERS: dict[tuple[object, ...], BaseLLM] = {}
+_CACHE: DiskCache | None = None
+_LOCK = threading.Lock()
+
+_DEFAULT_MODELS = {"openai": "gpt-4o-mini", "yandex": "yandexgpt/latest"}
+
+
+def _create(provider: str, model: str, temperature: float) -> BaseLLM:
+    """Adapter behind the provider's process-wide rate limiter."""
+    adapter: BaseLLM
+    # Adapters are imported on first use so a Yandex-only run never loads the OpenAI stack.
+    if provider == "yandex":
+        from coding_agents.core.llm.yandex_adapter import YandexLLM
+
+        adapter = YandexLLM(model=model, temperature=temperature)
+    else:
+        from coding_agents.core.llm.openai_adapter import OpenAILLM
+
+        adapter = OpenAILLM(model=model, temperature=temperature)
+    return RateLimitedLLM(adapter, get_rate_limiter(provider))
+
+
+def _resolve(provider: str | None, model: str | None) -> tuple[str, str]:
+    provider = (provider or "openai").lower()
+    if provider != "yandex":
+        provider = "openai"
+    return provider, model or _DEFAULT_MODELS[provider]
+
+
+def _parse_fallback(spec: str) -> list[tuple[str, str]]:
+    """ "yandex,openai:gpt-4o" → [("yandex", default model), ("openai", "gpt-4o")]."""
+    out: list[tuple[str, str]] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, model = item.partition(":")
+        out.append(_resolve(provider, model or None))
+    return out
+
+
+def _adapter(provider: str, model: str, temperature: float) -> BaseLLM:
+    key = (provider, model, temperature)
+    llm = _INSTANCES.get(key)
+    if llm is None:
+        llm = _create(*key)
+        _INSTANCES[key] = llm
+    return llm
+
+
+def _cache_enabled_from_env() -> bool:
+    return os.environ.get("CODING_AGENTS_LLM_CACHE", "").lower() in ("1", "true", "yes")
+
+
+def get_llm_cache() -> DiskCache:
+    """Process-wide response cache (directory/limits from CODING_AGENTS_LLM_CACHE_* env)."""
+    global _CACHE
+    with _LOCK:
+        if _CACHE is None:
+            _CACHE = DiskCache()
+        return _CACHE
 
 
 def get_llm(
     provider: str | None = None,
     model: str | None = None,
     temperature: float = 0.2,
+    cache: bool | None = None,
+    fallback: str | None = None,
 ) -> BaseLLM:
-    """Return LLM by provider: openai (default) or yandex."""
-    provider = (provider or os.environ.get("CODING_AGENTS_LLM_PROVIDER", "openai")).lower()
-    if provider == "yandex":
-        return YandexLLM(temperature=temperature)
-    return OpenAILLM(
-        model=model or "gpt-4o-mini",
-        temperature=temperature,
-    )
+    """Return LLM by provider: openai (default) or yandex; shared per (provider, model, temperature).
+
+    cache: serve repeated prompts from the on-disk cache; None follows CODING_AGENTS_LLM_CACHE.
+    fallback: comma-separated provider[:model] list to hedge/fail over to; None follows
+    CODING_AGENTS_LLM_FALLBACK.
+    """
+    primary = _resolve(provider or os.environ.get("CODING_AGENTS_LLM_PROVIDER"), model)
+    cassette = active_cassette()
+    if cassette is not None and cassette.replaying:
+        return CassetteLLM(None, cassette, model=primary[1])
+    llm = _shared_llm(primary, float(temperature), cache, fallback)
+    return CassetteLLM(llm, cassette, model=primary[1]) if cassette is not None else llm
+
+
+def _shared_llm(
+    primary: tuple[str, str], temperature: float, cache: bool | None, fallback: str | None
+) -> BaseLLM:
+    spec = os.environ.get("CODING_AGENTS_LLM_FALLBACK", "") if fallback is None else fallback
+    alternates = [alt for alt in _parse_fallback(spec) if alt != primary]
+    use_cache = _cache_enabled_from_env() if cache is None else cache
+    disk = get_llm_cache() if use_cache else None
+    with _LOCK:
+        llm = _adapter(*primary, temperature)
+        if alternates:
+            key: tuple[object, ...] = ("hedged", primary, tuple(alternates), temperature)
+            hedged = _WRAPPERS.get(key)
+            if hedged is None:
+                members = [
+                    (f"{p}:{m}", _adapter(p, m, temperature)) for p, m in [primary, *alternates]
+                ]
+                hedged = HedgedLLM(members)
+                _WRAPPERS[key] = hedged
+            llm = hedged
+        if disk is None:
+            return llm
+        key = ("cached", primary, tuple(alternates), temperature)
+        cached = _WRAPPERS.get(key)
+        if cached is None:
+            cached = CachedLLM(llm, provider=primary[0], temperature=temperature, cache=disk)
+            _WRAPPERS[key] = cached
+        return cached
+
+
+def close_llms() -> None:
+    """Close and forget all memoized adapters (call on process shutdown)."""
+    with _LOCK:
+        instances = list(_INSTANCES.values())
+        _INSTANCES.clear()
+        _WRAPPERS.clear()
+    for llm in instances:
+        llm.close()
+
+
+async def aclose_async_pools() -> None:
+    """Close the async pools of all memoized adapters, which stay usable.
+
+    For code that runs its own asyncio.run(): the pools are bound to that loop.
+    """
+    with _LOCK:
+        instances = list(_INSTANCES.values())
+    for llm in instances:
+        await llm.aclose_async_pools()
+
+
+async def aclose_llms() -> None:
+    """Async variant of close_llms(); also closes async pools (use from an event loop)."""
+    with _LOCK:
+        instances = list(_INSTANCES.values())
+        _INSTANCES.clear()
+        _WRAPPERS.clear()
+    for llm in instances:
+        await llm.aclose()
@@ -2,14 +2,39 @@
 
 from __future__ import annotations
 
+import json
 import os
+import threading
+import time
 from typing import Any
 
-from coding_agents.core.llm.base import BaseLLM, LLMResult
+import httpx
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult, LLMStream, make_usage
+from coding_agents.core.llm.http import PoolConfig, make_async_client, make_client
+from coding_agents.core.llm.ratelimit import ThrottledError, parse_retry_after
+
+YANDEX_COMPLETION_URL = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
+
+
+def _parse_usage(result: dict[str, Any]) -> dict[str, int] | None:
+    """result.usage carries token counts as strings (inputTextTokens, completionTokens, ...)."""
+    usage = result.get("usage") or {}
+
+    def num(name: str) -> int | None:
+        value = usage.get(name)
+        return int(value) if value not in (None, "") else None
+
+    return make_usage(num("inputTextTokens"), num("completionTokens"), num("totalTokens"))
 
 
 class YandexLLM(BaseLLM):
-    """YandexGPT via Yandex Cloud API; requires YANDEX_API_KEY and YANDEX_FOLDER_ID."""
+    """YandexGPT via Yandex Cloud API; requires YANDEX_API_KEY and YANDEX_FOLDER_ID.
+
+    Owns one pooled httpx client (plus an async one for ainvoke) for its lifetime,
+    so repeated calls reuse keep-alive connections; call close()/aclose() (or use
+    as a context manager) to release them.
+    """
 
     def __init__(
         self,
@@ -17,6 +42,7 @@ class YandexLLM(BaseLLM):
         folder_id: str | None = None,
         model: str = "yandexgpt/latest",
         temperature: float = 0.2,
+        pool: PoolConfig | None = None,
     ) -> None:
         self._api_key = api_key or os.environ.get("YANDEX_API_KEY")
         self._folder_id = folder_id or os.environ.get("YANDEX_FOLDER_ID")
@@ -24,39 +50,135 @@ class YandexLLM(BaseLLM):
             raise ValueError("YANDEX_API_KEY and YANDEX_FOLDER_ID required")
         self._model = model
         self._temperature = temperature
+        self._pool = pool or PoolConfig.from_env()
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
 
     @property
     def model_name(self) -> str:
         return self._model
 
-    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
-        import httpx
-        url = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
-        headers = {"Authorization": f"Api-Key {self._api_key}"}
-        folder_id = os.getenv("YANDEX_FOLDER_ID")
-        if not folder_id:
-            raise ValueError("YANDEX_FOLDER_ID not set")
-        
-        model_uri = f"gpt://{folder_id}/yandexgpt/latest"
-        payload = {
-            "modelUri": model_uri,
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = make_client(self._pool)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = make_async_client(self._pool)
+        return self._async_client
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            # An async pool cannot be closed synchronously; drop it so aclose()/GC reclaims it.
+            self._async_client = None
+
+    async def aclose(self) -> None:
+        async_client, self._async_client = self._async_client, None
+        if async_client is not None:
+            await async_client.aclose()
+        self.close()
+
+    async def aclose_async_pools(self) -> None:
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+        if async_client is not None:
+            await async_client.aclose()
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Api-Key {self._api_key}"}
+
+    def _payload(self, prompt: str, stream: bool = False, **kwargs: Any) -> dict[str, Any]:
+        return {
+            "modelUri": f"gpt://{self._folder_id}/{self._model}",
             "completionOptions": {
-                "temperature": self._temperature,
+                "temperature": float(kwargs.get("temperature", self._temperature)),
                 "maxTokens": str(int(os.getenv("YANDEX_MAX_TOKENS", "1024"))),
-                "stream": False,
+                "stream": stream,
             },
             "messages": [{"role": "user", "text": prompt}],
         }
-        
-        with httpx.Client() as client:
-            r = client.post(url, json=payload, headers=headers, timeout=60)
-        
-            if r.status_code >= 400:
-                raise RuntimeError(f"YandexGPT error {r.status_code}: {r.text}")
-        
-            data = r.json()
+
+    @staticmethod
+    def _raise_for_status(r: httpx.Response) -> None:
+        if r.status_code == 429:
+            raise ThrottledError(
+                f"YandexGPT throttled: {r.text}", parse_retry_after(r.headers.get("Retry-After"))
+            )
+        if r.status_code >= 400:
+            raise RuntimeError(f"YandexGPT error {r.status_code}: {r.text}")
+
+    def _to_result(self, r: httpx.Response, started: float) -> LLMResult:
+        self._raise_for_status(r)
+        result = r.json().get("result", {})
 
         text = ""
-        for chunk in data.get("result", {}).get("alternatives", []):
+        for chunk in result.get("alternatives", []):
             text += chunk.get("message", {}).get("text", "")
-        return LLMResult(content=text, model=self._model, usage=None)
+        return LLMResult(
+            content=text,
+            model=self._model,
+            usage=_parse_usage(result),
+            latency_s=time.monotonic() - started,
+        )
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        started = time.monotonic()
+        r = self.client.post(
+            YANDEX_COMPLETION_URL, json=self._payload(prompt, **kwargs), headers=self._headers
+        )
+        return self._to_result(r, started)
+
+    async def ainvoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        started = time.monotonic()
+        r = await self.async_client.post(
+            YANDEX_COMPLETION_URL, json=self._payload(prompt, **kwargs), headers=self._headers
+        )
+        return self._to_result(r, started)
+
+    def stream(self, prompt: str, **kwargs: Any) -> LLMStream:
+        """Stream with "stream": true; each NDJSON line carries the full text (and usage) so far."""
+        started = time.monotonic()
+        ttft: float | None = None
+        usage: dict[str, int] | None = None
+        payload = self._payload(prompt, stream=True, **kwargs)
+        with self.client.stream(
+            "POST", YANDEX_COMPLETION_URL, json=payload, headers=self._headers
+        ) as r:
+            if r.status_code >= 400:
+                r.read()
+                self._raise_for_status(r)
+            seen = ""
+            for line in r.iter_lines():
+                if not line.strip():
+                    continue
+                result = json.loads(line).get("result", {})
+                usage = _parse_usage(result) or usage
+                alternatives = result.get("alternatives", [])
+                text = "".join(a.get("message", {}).get("text", "") for a in alternatives)
+                if text.startswith(seen):
+                    delta, seen = text[len(seen) :], text
+                else:
+                    delta, seen = text, seen + text
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    yield delta
+        return LLMResult(
+            content=seen,
+            model=self._model,
+            usage=usage,
+            latency_s=time.monotonic() - started,
+            ttft_s=ttft,
+        )
@@ -1,6 +1,23 @@
 """Prompt templates and registry for Code Agent and Reviewer Agent."""
 
-from coding_agents.core.prompts.code_agent import CODE_AGENT_PROMPTS
-from coding_agents.core.prompts.reviewer_agent import REVIEWER_AGENT_PROMPTS
+from coding_agents.core.prompts.budget import (
+    BudgetReport,
+    Section,
+    get_token_counter,
+    prompt_token_budget,
+    render_prompt,
+)
+from coding_agents.core.prompts.code_agent import CODE_AGENT_BUDGET, CODE_AGENT_PROMPTS
+from coding_agents.core.prompts.reviewer_agent import REVIEWER_AGENT_BUDGET, REVIEWER_AGENT_PROMPTS
 
-__all__ = ["CODE_AGENT_PROMPTS", "REVIEWER_AGENT_PROMPTS"]
+__all__ = [
+    "CODE_AGENT_BUDGET",
+    "CODE_AGENT_PROMPTS",
+    "REVIEWER_AGENT_BUDGET",
+    "REVIEWER_AGENT_PROMPTS",
+    "BudgetReport",
+    "Section",
+    "get_token_counter",
+    "prompt_token_budget",
+    "render_prompt",
+]
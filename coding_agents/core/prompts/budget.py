@@ -0,0 +1,178 @@
+"""Token-aware prompt budgeting: per-model token counting and per-section allocation.
+
+Sections are filled in ascending priority order (ties keep declaration order),
+so the same inputs always produce the same prompt. Item-based sections (paths,
+whole files, diff hunks) keep a prefix of their items; text sections with
+truncate=True may be cut to the remaining budget instead of dropped.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Protocol
+
+# Context windows (tokens) by model prefix; unknown models get DEFAULT_CONTEXT_WINDOW.
+CONTEXT_WINDOWS: dict[str, int] = {
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_000_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-3.5-turbo": 16_000,
+    "yandexgpt": 32_000,
+}
+DEFAULT_CONTEXT_WINDOW = 16_000
+# Tokens reserved for the completion (Yandex maxTokens defaults to 1024; patches need more).
+OUTPUT_RESERVE = 4_096
+# Upper bound on prompt size regardless of window: large prompts cost money and latency.
+DEFAULT_MAX_PROMPT_TOKENS = 24_000
+
+
+class TokenCounter(Protocol):
+    """Counts and truncates text in a model's tokens."""
+
+    def count(self, text: str) -> int: ...
+
+    def truncate(self, text: str, max_tokens: int) -> str: ...
+
+
+class CharTokenCounter:
+    """Heuristic counter (~chars_per_token characters per token); errs on the high side."""
+
+    def __init__(self, chars_per_token: float = 3.0) -> None:
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, int(max_tokens * self.chars_per_token))]
+
+
+class TiktokenCounter:
+    """Exact counter for OpenAI models."""
+
+    def __init__(self, encoding: Any) -> None:
+        self._encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return str(self._encoding.decode(tokens[: max(0, max_tokens)]))
+
+
+@cache
+def get_token_counter(model: str) -> TokenCounter:
+    """tiktoken for OpenAI models when its encoding is available; heuristic otherwise."""
+    if not model.startswith("yandex"):
+        try:
+            import tiktoken
+
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+            return TiktokenCounter(encoding)
+        except Exception:
+            pass
+    return CharTokenCounter()
+
+
+def prompt_token_budget(model: str) -> int:
+    """Target prompt size for model: window minus output reserve, capped by env/default."""
+    window = DEFAULT_CONTEXT_WINDOW
+    for prefix, size in CONTEXT_WINDOWS.items():
+        if model.startswith(prefix):
+            window = size
+            break
+    cap = int(os.environ.get("CODING_AGENTS_PROMPT_MAX_TOKENS", str(DEFAULT_MAX_PROMPT_TOKENS)))
+    return max(0, min(window - OUTPUT_RESERVE, cap))
+
+
+@dataclass
+class Section:
+    """One budgeted template field.
+
+    items: units kept in order and dropped from the tail (a single text is one item).
+    truncate: cut the first item that does not fit instead of dropping it.
+    """
+
+    name: str
+    items: list[str]
+    priority: int
+    joiner: str = "\n"
+    truncate: bool = False
+    empty: str = ""
+
+
+@dataclass
+class BudgetReport:
+    """What a budgeted render used and dropped, per section."""
+
+    budget: int
+    used: int = 0
+    tokens: dict[str, int] = field(default_factory=dict)
+    kept: dict[str, int] = field(default_factory=dict)
+    dropped: dict[str, int] = field(default_factory=dict)
+    truncated: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "used": self.used,
+            "tokens": self.tokens,
+            "kept": self.kept,
+            "dropped": {k: v for k, v in self.dropped.items() if v},
+            "truncated": self.truncated,
+        }
+
+
+def render_prompt(
+    template: str,
+    counter: TokenCounter,
+    budget: int,
+    fixed: dict[str, str],
+    sections: list[Section],
+) -> tuple[str, BudgetReport, dict[str, list[str]]]:
+    """Format template with fixed fields plus as much of each section as fits in budget.
+
+    Returns (prompt, report, kept items per section).
+    """
+    skeleton = template.format(**fixed, **{s.name: "" for s in sections})
+    report = BudgetReport(budget=budget)
+    remaining = budget - counter.count(skeleton)
+    kept: dict[str, list[str]] = {s.name: [] for s in sections}
+
+    for section in sorted(sections, key=lambda s: s.priority):
+        joiner_cost = counter.count(section.joiner) if section.joiner else 0
+        used = 0
+        for item in section.items:
+            cost = counter.count(item) + (joiner_cost if kept[section.name] else 0)
+            if cost <= remaining:
+                kept[section.name].append(item)
+                remaining -= cost
+                used += cost
+                continue
+            room = remaining - (joiner_cost if kept[section.name] else 0)
+            if section.truncate and room > 0:
+                cut = counter.truncate(item, room)
+                if cut:
+                    kept[section.name].append(cut)
+                    cost = counter.count(cut) + remaining - room
+                    remaining -= cost
+                    used += cost
+                    report.truncated.append(section.name)
+            break
+        report.tokens[section.name] = used
+        report.kept[section.name] = len(kept[section.name])
+        report.dropped[section.name] = len(section.items) - len(kept[section.name])
+
+    values = {s.name: s.joiner.join(kept[s.name]) if kept[s.name] else s.empty for s in sections}
+    prompt = template.format(**fixed, **values)
+    report.used = counter.count(prompt)
+    return prompt, report, kept
@@ -12,6 +12,9 @@ Title: {title}
 Body:
 {body}
 
+## Likely relevant files (from the repository symbol index)
+{relevant_files}
+
 ## File inventory (only these paths exist; do not reference others)
 {file_inventory}
 
@@ -27,6 +30,29 @@ FILES:
 <path2>
 """
 
+# Edit protocol shared by the patch and fix prompts (parsed by agents.code_agent.file_blocks).
+_EDIT_FORMAT = """For each existing file, output:
+--- EDIT: <path>
+<<<<<<< SEARCH
+<lines copied exactly from the current file, enough to be unique>
+=======
+<replacement lines>
+>>>>>>> REPLACE
+--- END EDIT
+
+Repeat SEARCH/REPLACE pairs inside one EDIT block for several changes to a file; keep each
+SEARCH short. Only for new files, or files of at most {full_rewrite_lines} lines, you may
+instead output the whole content:
+--- FILE: <path>
+<full new content>
+--- END FILE
+
+Files marked as excerpts show only the code relevant to the plan; a line like
+`...  # lines 40-85 elided` stands for code that is not shown. Never copy such a line
+into SEARCH, and anchor edits on the lines that are shown.
+
+Do not output paths that are not in the file inventory."""
+
 CODE_AGENT_PATCH = """## Issue
 Title: {title}
 Body:
@@ -39,12 +65,31 @@ Body:
 {file_contents}
 
 ## Task
-Generate the exact file changes. For each file, output:
---- FILE: <path>
-<full new content>
---- END FILE
+Generate the exact file changes as edits. """ + _EDIT_FORMAT
 
-Do not output paths that are not in the file inventory."""
+CODE_AGENT_FIX = (
+    """## Issue
+Title: {title}
+Body:
+{body}
+
+## Your plan (from the first iteration)
+{plan}
+
+## CI failures
+{ci_failures}
+
+## Reviewer feedback
+{review_comments}
+
+## Current content of the files involved (your branch)
+{file_contents}
+
+## Task
+Your pull request did not pass. Fix the problems above with minimal changes on top of the
+current files; do not redo work that is already correct. Output the changes as edits. """
+    + _EDIT_FORMAT
+)
 
 CODE_AGENT_SELF_CHECK = """## Issue
 {title}
@@ -60,5 +105,13 @@ CODE_AGENT_PROMPTS = {
     "system": CODE_AGENT_SYSTEM,
     "plan": CODE_AGENT_PLAN,
     "patch": CODE_AGENT_PATCH,
+    "fix": CODE_AGENT_FIX,
     "self_check": CODE_AGENT_SELF_CHECK,
 }
+
+# Budget priorities for variable template fields (lower is filled first; see prompts.budget).
+CODE_AGENT_BUDGET = {
+    "plan": {"body": 0, "relevant_files": 1, "file_inventory": 2},
+    "patch": {"body": 0, "file_contents": 1},
+    "fix": {"ci_failures": 0, "review_comments": 0, "file_contents": 1, "plan": 2, "body": 3},
+}
@@ -55,3 +55,14 @@ REVIEWER_AGENT_PROMPTS = {
     "verdict": REVIEWER_AGENT_VERDICT,
     "summary": REVIEWER_AGENT_SUMMARY,
 }
+
+# Budget priorities for variable template fields (lower is filled first; see prompts.budget).
+REVIEWER_AGENT_BUDGET = {
+    "verdict": {
+        "issue_body": 0,
+        "ci_summary": 0,
+        "changed_files": 1,
+        "diff_excerpt": 2,
+        "pr_body": 3,
+    },
+}
@@ -0,0 +1,85 @@
+"""Unit tests: batched `git cat-file` blob reader (any ref, SHA cache, zero-copy)."""
+
+import subprocess
+
+from coding_agents.core.git import GitRepo
+from coding_agents.core.git.blobs import BATCH_NAMES, ZERO_COPY_BYTES, BlobReader
+
+
+def _git(repo, *args):
+    base = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    return subprocess.run([*base, *args], cwd=repo, check=True, capture_output=True, text=True)
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("x = 1\n")
+    (repo / "big.bin").write_bytes(b"\0" * (ZERO_COPY_BYTES + 1))
+    _git(repo, "init", "-q")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "one")
+    (repo / "a.py").write_text("x = 2\n")
+    _git(repo, "commit", "-qam", "two")
+    return repo
+
+
+def test_reads_any_ref_in_one_round_trip(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    with BlobReader(repo) as reader:
+        names = ["HEAD~1:a.py", "HEAD:a.py", "HEAD:big.bin", "HEAD:nope.py", "HEAD:"]
+        got = reader.read_many(names)
+        assert list(got) == names
+        assert got["HEAD~1:a.py"] == b"x = 1\n"
+        assert got["HEAD:a.py"] == b"x = 2\n"
+        assert got["HEAD:nope.py"] is None and got["HEAD:"] is None  # missing; a tree
+        big = got["HEAD:big.bin"]
+        assert isinstance(big, memoryview) and big.readonly and len(big) == ZERO_COPY_BYTES + 1
+        assert reader.round_trips == 1  # names resolved and read in the same batch
+
+        # Same content under another name: served from the SHA cache.
+        sha = _git(repo, "rev-parse", "HEAD:a.py").stdout.strip()
+        assert reader.read(sha) == b"x = 2\n"
+        assert reader.hits == 1 and reader.round_trips == 1
+
+
+def test_missing_name_with_spaces_keeps_the_pipe_in_sync(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    with BlobReader(repo) as reader:
+        got = reader.read_many(["HEAD:my file.py", "HEAD:a.py", "HEAD:no such file.py"])
+        assert got == {
+            "HEAD:my file.py": None,
+            "HEAD:a.py": b"x = 2\n",
+            "HEAD:no such file.py": None,
+        }
+        assert reader.read("HEAD~1:a.py") == b"x = 1\n"
+
+
+def test_large_batches_are_chunked(tmp_path) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for i in range(BATCH_NAMES + 10):
+        (repo / f"f{i}.txt").write_text(f"{i}\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "many")
+    with BlobReader(repo) as reader:
+        texts = reader.read_text(f"HEAD:f{i}.txt" for i in range(BATCH_NAMES + 10))
+    assert texts[f"HEAD:f{BATCH_NAMES + 5}.txt"] == f"{BATCH_NAMES + 5}\n"
+
+
+def test_read_files_falls_back_to_working_tree(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    (repo / "new.py").write_text("y = 1\n")
+    git = GitRepo(repo)
+    shas = {"a.py": _git(repo, "rev-parse", "HEAD~1:a.py").stdout.strip()}
+    assert git.read_files(["a.py", "new.py", "gone.py"], shas=shas) == {
+        "a.py": "x = 1\n",
+        "new.py": "y = 1\n",
+    }
+    assert git.read_files(["a.py", "new.py"], ref="HEAD~1") == {"a.py": "x = 1\n"}
+    reader = git.blobs
+    git.close()
+    assert reader._batch is None and git._blobs is None
+    assert git.read_files(["a.py"], ref="HEAD") == {"a.py": "x = 2\n"}  # restarts on demand
+    git.close()
@@ -0,0 +1,43 @@
+"""Unit tests: BM25 chunk retrieval and rank fusion."""
+
+import subprocess
+
+import pytest
+from coding_agents.core.index import BM25Index, fuse_rankings
+
+pytest.importorskip("numpy")
+
+
+def _repo(tmp_path):
+    (tmp_path / "billing.py").write_text(
+        "\n".join(
+            ["# filler"] * 45 + ["def compute_invoice_total(items):", "    return sum(items)"]
+        )
+    )
+    (tmp_path / "users.py").write_text("def create_user(name):\n    return {'name': name}\n")
+    (tmp_path / "notes.txt").write_text("invoice totals are rounded\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    return tmp_path
+
+
+def test_top_chunks_and_files(tmp_path) -> None:
+    index = BM25Index.open(_repo(tmp_path))
+    hits = index.top_chunks("invoice total is wrong", k=2)
+    assert (hits[0].path, hits[0].start_line, hits[0].end_line) == ("billing.py", 41, 47)
+    files = [path for path, _ in index.top_files("create user", k=5)]
+    assert files[0] == "users.py"
+    assert index.top_files("zzzz unknown words") == []
+
+
+def test_reopen_memory_maps_until_tree_changes(tmp_path) -> None:
+    root = _repo(tmp_path)
+    BM25Index.open(root)
+    again = BM25Index.open(root)
+    assert type(again.arrays["docs"]).__name__ == "memmap"
+    (root / "users.py").write_text("def delete_account():\n    pass\n")
+    rebuilt = BM25Index.open(root)
+    assert rebuilt.top_files("delete account")[0][0] == "users.py"
+
+
+def test_fuse_rankings() -> None:
+    assert fuse_rankings(["a", "b"], ["b", "c"])[0] == "b"
@@ -0,0 +1,48 @@
+"""Unit tests: bulk scheduler (bounded concurrency, streamed results, report)."""
+
+import asyncio
+
+import pytest
+from coding_agents.cli.bulk import BulkItem, BulkReport, parse_numbers, run_bulk
+
+
+def test_parse_numbers_ranges() -> None:
+    assert parse_numbers("3, 10-12,3") == [3, 10, 11, 12]
+    with pytest.raises(ValueError):
+        parse_numbers("5-2")
+    with pytest.raises(ValueError):
+        parse_numbers("a")
+
+
+async def test_run_bulk_bounds_concurrency_and_streams() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def worker(n: int) -> tuple[bool, str]:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (n % 3))
+        in_flight -= 1
+        if n == 4:
+            raise RuntimeError("boom")
+        return True, f"done {n}"
+
+    report = BulkReport()
+    items = [item async for item in run_bulk(range(8), worker, 3, report)]
+    assert peak == 3
+    assert sorted(i.number for i in items) == list(range(8))
+    assert report.failed == 1
+    assert next(i for i in items if i.number == 4).message == "RuntimeError: boom"
+    assert report.wall_s > 0
+
+
+def test_report_percentiles_and_markdown() -> None:
+    report = BulkReport(
+        [BulkItem(n, n != 2, "m", float(n)) for n in range(1, 11)], wall_s=30.0, concurrency=2
+    )
+    assert report.percentile(50) == 5.0
+    assert report.percentile(95) == 10.0
+    assert report.throughput_per_min == 20.0
+    assert "9 ok, 1 failed" in report.summary()
+    assert "| #2 | failed |" in report.markdown("Bulk")
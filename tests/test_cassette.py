@@ -0,0 +1,93 @@
+"""Unit tests: record/replay cassettes for LLM and GitHub I/O."""
+
+import json
+import subprocess
+from typing import Any
+
+import pytest
+from coding_agents.core.cassette import (
+    REPLAY,
+    CassetteLLM,
+    CassetteMissError,
+    _digest,
+    use_cassette,
+)
+from coding_agents.core.git import GitRepo
+from coding_agents.core.github import GitHubClient
+from coding_agents.core.llm import get_llm
+from coding_agents.core.llm.base import BaseLLM, LLMResult, StreamCapture
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @property
+    def model_name(self) -> str:
+        return "gpt-4o-mini"
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        self.calls += 1
+        return LLMResult(content=f"{prompt}#{self.calls}", model="gpt-4o-mini", latency_s=0.5)
+
+
+def test_llm_record_then_replay_without_credentials(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "run.json.gz"
+    inner = CountingLLM()
+    with use_cassette(path) as cassette:
+        llm = CassetteLLM(inner, cassette, model="gpt-4o-mini")
+        assert llm.invoke("a").content == "a#1"
+        assert llm.invoke("a").content == "a#2"
+        assert "".join(llm.stream("b")) == "b#3"
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with use_cassette(path, REPLAY):
+        replayed = get_llm(provider="openai")
+        assert [replayed.invoke("a").content for _ in range(3)] == ["a#1", "a#2", "a#2"]
+        capture = StreamCapture(replayed.stream("b"))
+        assert "".join(capture) == "b#3"
+        assert capture.result is not None and capture.result.latency_s == 0.5
+        with pytest.raises(CassetteMissError):
+            replayed.invoke("never recorded")
+    assert inner.calls == 3
+
+
+def test_github_replay_serves_recorded_response(tmp_path, monkeypatch) -> None:
+    repo = {"full_name": "o/r", "name": "r", "url": "https://api.github.com/repos/o/r"}
+    entry = {
+        "verb": "GET",
+        "url": "/repos/o/r",
+        "status": 200,
+        "headers": {"content-type": "application/json"},
+        "body": json.dumps(repo),
+        "elapsed": 0.01,
+    }
+    key = _digest("GET", "api.github.com", "/repos/o/r", None)
+    path = tmp_path / "gh.json"
+    path.write_text(json.dumps({"version": 1, "llm": {}, "http": {key: [entry]}}))
+
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    with use_cassette(path, REPLAY):
+        assert GitHubClient().get_repo("o/r").full_name == "o/r"
+
+
+def test_replay_never_pushes(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GITHUB_REPOSITORY", raising=False)
+    remote, repo = tmp_path / "remote.git", tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("x = 1\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+    for args in (["init", "-q", "-b", "main"], ["add", "-A"], ["commit", "-qm", "init"]):
+        subprocess.run([*git, *args], cwd=repo, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=repo, check=True)
+    path = tmp_path / "run.json"
+    path.write_text(json.dumps({"version": 1, "llm": {}, "http": {}}))
+
+    with use_cassette(path, REPLAY):
+        GitRepo(repo).push(branch="main")
+    branches = ["git", "for-each-ref", "refs/heads"]
+    assert subprocess.run(branches, cwd=remote, capture_output=True, text=True).stdout == ""
+    GitRepo(repo).push(branch="main")
+    assert subprocess.run(branches, cwd=remote, capture_output=True, text=True).stdout
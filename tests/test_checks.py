@@ -0,0 +1,61 @@
+"""Unit tests: pre-flight checks (parallel run, per-tool timeouts)."""
+
+import time
+
+from agents.code_agent.checks import preflight_config, run_preflight
+
+
+def _tree(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("def f():\n    return 1\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_mod.py").write_text(
+        "from pkg.mod import f\n\n\ndef test_f():\n    assert f() == 2\n"
+    )
+    (tmp_path / "tests" / "test_other.py").write_text("def test_x():\n    pass\n")
+    return tmp_path
+
+
+def test_preflight_reports_failures_and_timings(tmp_path) -> None:
+    root = _tree(tmp_path)
+    report = run_preflight(root, ["pkg/mod.py"], ("compile", "pytest"))
+    by_tool = {r.tool: r for r in report.results}
+    assert by_tool["compile"].ok
+    assert not by_tool["pytest"].ok and "assert 1 == 2" in by_tool["pytest"].output
+    assert not report.ok
+    assert set(report.timings()) == {"compile", "pytest"}
+    assert "pytest FAILED" in report.summary()
+    assert report.failures().startswith("### pytest: failure")
+
+
+def test_per_tool_timeout(tmp_path) -> None:
+    root = _tree(tmp_path)
+    (root / "tests" / "test_mod.py").write_text(
+        "import time\n\nimport pkg.mod\n\n\ndef test_slow():\n    time.sleep(30)\n"
+    )
+    started = time.perf_counter()
+    report = run_preflight(root, ["pkg/mod.py"], ("compile", "pytest"), {"pytest": 1.0})
+    assert time.perf_counter() - started < 15
+    assert report.results[1].output == "pytest timed out after 1s"
+
+
+def test_preflight_config_from_env(monkeypatch) -> None:
+    monkeypatch.setenv("CODING_AGENTS_PREFLIGHT", "compile, mypy,unknown")
+    monkeypatch.setenv("CODING_AGENTS_PREFLIGHT_TIMEOUTS", "mypy=12")
+    assert preflight_config() == (("compile", "mypy"), {"mypy": 12.0})
+    monkeypatch.setenv("CODING_AGENTS_PREFLIGHT", "off")
+    assert preflight_config()[0] == ()
+
+
+def test_tools_do_not_see_secrets(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("GITHUB_TOKEN", "ghs_secret")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-secret")
+    root = _tree(tmp_path)
+    (root / "tests" / "test_mod.py").write_text(
+        "import os\n\nimport pkg.mod\n\n\ndef test_env():\n"
+        "    assert 'GITHUB_TOKEN' not in os.environ\n"
+        "    assert 'OPENAI_API_KEY' not in os.environ\n"
+        "    assert os.environ.get('PATH')\n"
+    )
+    report = run_preflight(root, ["pkg/mod.py"], ("pytest",))
+    assert report.ok and not report.results[0].skipped, report.failures()
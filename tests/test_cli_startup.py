@@ -0,0 +1,32 @@
+"""Unit tests: CLI cold start stays free of heavy imports; lazy package exports."""
+
+import subprocess
+import sys
+
+import coding_agents.core.llm as llm_pkg
+import pytest
+from coding_agents.cli import bench
+
+
+def test_cli_import_does_not_load_heavy_modules() -> None:
+    code = (
+        "import sys, coding_agents.cli.main\n"
+        "heavy = ['github', 'git', 'httpx', 'pydantic', 'langchain_openai', 'agents.code_agent']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+
+
+def test_llm_package_exports_resolve_lazily() -> None:
+    assert llm_pkg.get_llm is llm_pkg.registry.get_llm
+    assert set(llm_pkg.__all__) >= {"BaseLLM", "OpenAILLM", "get_llm", "limiter_stats"}
+    with pytest.raises(AttributeError):
+        llm_pkg.not_an_export  # noqa: B018
+
+
+def test_bench_history_roundtrip(tmp_path) -> None:
+    history = tmp_path / "startup.jsonl"
+    assert bench.last_entry(history) is None
+    bench.record(history, [bench.StartupSample(argv=["--help"], runs_ms=[30.0, 10.0, 20.0])])
+    assert bench.last_entry(history) == {"--help": 20.0}
@@ -0,0 +1,72 @@
+"""Unit tests: SEARCH/REPLACE edit parsing and the fuzzy-anchored in-memory applier."""
+
+import pytest
+from agents.code_agent.edits import (
+    FULL_REWRITE_MAX_LINES,
+    PatchConflictError,
+    SearchReplace,
+    apply_edits,
+    parse_edits,
+    resolve_block,
+)
+from agents.code_agent.file_blocks import PatchBlock
+
+SOURCE = "def f():\n    return 1\n\n\ndef g():\n    return 2\n"
+
+
+def test_parse_edits_pairs() -> None:
+    body = "<<<<<<< SEARCH\na\n=======\nb\n>>>>>>> REPLACE\nnoise\n<<<<<<< SEARCH\nc\n=======\n>>>>>>> REPLACE"
+    assert parse_edits(body) == [SearchReplace("a", "b"), SearchReplace("c", "")]
+
+
+def test_exact_edit_keeps_rest_of_file() -> None:
+    result = apply_edits("m.py", SOURCE, [SearchReplace("    return 2", "    return 3")])
+    assert result.conflicts == []
+    assert result.content == SOURCE.replace("return 2", "return 3")
+    assert result.fuzzy == 0
+
+
+def test_whitespace_drift_is_reindented() -> None:
+    source = "class A:\n    def f(self):\n        return 1\n"
+    edit = SearchReplace("def f(self):\n    return 1", "def f(self):\n    return 2")
+    result = apply_edits("m.py", source, [edit])
+    assert result.conflicts == []
+    assert result.fuzzy == 1
+    assert result.content == "class A:\n    def f(self):\n        return 2\n"
+
+
+def test_fuzzy_anchor_tolerates_small_typos() -> None:
+    edit = SearchReplace("def g():\n    retrun 2", "def g():\n    return 22")
+    result = apply_edits("m.py", SOURCE, [edit])
+    assert result.conflicts == []
+    assert result.content.endswith("def g():\n    return 22\n")
+
+
+def test_missing_and_ambiguous_anchors_are_conflicts() -> None:
+    result = apply_edits(
+        "m.py",
+        SOURCE,
+        [SearchReplace("class Missing:\n    pass", "x"), SearchReplace("", "def h():\n    pass")],
+    )
+    assert [c.reason for c in result.conflicts] == ["SEARCH not found"]
+    assert result.content.endswith("def h():\n    pass\n")
+    ambiguous = apply_edits("m.py", "x = 1\nx = 1\n", [SearchReplace("x = 1", "x = 2")])
+    assert "2 places" in ambiguous.conflicts[0].reason
+
+
+def test_empty_search_on_empty_file_has_no_leading_blank_line() -> None:
+    result = apply_edits("m.py", "", [SearchReplace("", "def h():\n    pass")])
+    assert result.content == "def h():\n    pass\n"
+    assert apply_edits("m.py", "", []).content == ""
+
+
+def test_full_rewrite_only_for_new_or_small_files() -> None:
+    assert resolve_block(PatchBlock("new.py", "x = 1"), None) == "x = 1"
+    assert resolve_block(PatchBlock("max.py", "x = 1"), "x = 0\n" * FULL_REWRITE_MAX_LINES)
+    large = "x = 0\n" * (FULL_REWRITE_MAX_LINES + 1)
+    with pytest.raises(PatchConflictError) as err:
+        resolve_block(PatchBlock("big.py", "x = 1"), large)
+    assert err.value.conflicts[0].path == "big.py"
+    edit = "<<<<<<< SEARCH\nx = 0\nx = 0\n=======\ny = 1\n>>>>>>> REPLACE"
+    with pytest.raises(PatchConflictError):
+        resolve_block(PatchBlock("big.py", edit, "edit"), large)
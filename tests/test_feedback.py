@@ -0,0 +1,106 @@
+"""Unit tests: CI/review feedback polling for fix iterations."""
+
+from types import SimpleNamespace as Ns
+
+from agents.code_agent.chain import CodeAgentChain, CodeAgentResult
+from agents.code_agent.feedback import FeedbackTimeouts, collect_feedback, wait_for_ci
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _run(name, status, conclusion=None, annotations=()):
+    return Ns(
+        name=name,
+        status=status,
+        conclusion=conclusion,
+        output=Ns(title=f"{name} failed", summary="", text=None),
+        get_annotations=lambda: list(annotations),
+    )
+
+
+class FakeGitHub:
+    def __init__(self, runs_by_poll, reviews=(), comments=()) -> None:
+        self.runs_by_poll = list(runs_by_poll)
+        self.reviews = list(reviews)
+        self.comments = list(comments)
+
+    def get_check_runs(self, repo, sha):
+        return self.runs_by_poll.pop(0) if len(self.runs_by_poll) > 1 else self.runs_by_poll[0]
+
+    def get_reviews(self, repo, pr):
+        return self.reviews
+
+    def get_review_comments(self, repo, pr):
+        return self.comments
+
+
+TIMEOUTS = FeedbackTimeouts(ci_s=100, review_s=50, poll_s=10)
+
+
+def test_ci_waits_for_completion_and_reports_failures() -> None:
+    clock = FakeClock()
+    note = Ns(path="src/a.py", start_line=3, message="E501 line too long")
+    gh = FakeGitHub(
+        [
+            [_run("lint", "in_progress")],
+            [_run("lint", "completed", "failure", [note]), _run("test", "completed", "success")],
+        ]
+    )
+    conclusion, summary, paths = wait_for_ci(gh, "o/r", "abc", TIMEOUTS, clock.sleep, clock)
+    assert conclusion == "failure"
+    assert "src/a.py:3: E501" in summary and "test" not in summary
+    assert paths == ["src/a.py"]
+    assert clock.now == 10
+
+
+def test_ci_timeout_and_no_ci() -> None:
+    clock = FakeClock()
+    gh = FakeGitHub([[_run("slow", "queued")]])
+    conclusion, summary, _ = wait_for_ci(gh, "o/r", "abc", TIMEOUTS, clock.sleep, clock)
+    assert conclusion == "pending" and "slow" in summary
+    fb = collect_feedback(FakeGitHub([[]]), "o/r", 1, "abc", TIMEOUTS, clock.sleep, clock)
+    assert fb.ci_conclusion == "none" and fb.ci_passed
+
+
+def test_review_of_pushed_commit_only() -> None:
+    clock = FakeClock()
+    stale = Ns(id=1, commit_id="old", state="APPROVED", body="lgtm")
+    current = Ns(id=2, commit_id="abc", state="CHANGES_REQUESTED", body="Please fix")
+    comments = [
+        Ns(pull_request_review_id=1, path="old.py", line=1, original_line=1, body="x"),
+        Ns(pull_request_review_id=2, path="src/b.py", line=None, original_line=7, body="rename"),
+    ]
+    gh = FakeGitHub([[_run("test", "completed", "success")]], [stale, current], comments)
+    fb = collect_feedback(gh, "o/r", 1, "abc", TIMEOUTS, clock.sleep, clock)
+    assert fb.ci_passed and not fb.approved
+    assert fb.review == "Please fix\n- src/b.py:7: rename"
+    assert fb.paths == ["src/b.py"]
+
+    gh.reviews = [stale]
+    fb = collect_feedback(gh, "o/r", 1, "abc", TIMEOUTS, clock.sleep, clock)
+    assert fb.review_state is None and fb.review == ""
+
+
+def test_chain_refreshes_its_lease_while_polling(monkeypatch) -> None:
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    beats = []
+    chain = CodeAgentChain.__new__(CodeAgentChain)
+    chain.gh = FakeGitHub([[_run("slow", "queued")]])
+    chain.repo_full_name = "o/r"
+    chain.git = Ns(repo=Ns(head=Ns(commit=Ns(hexsha="abc"))))
+    chain.max_iterations = 2
+    chain.feedback_timeouts = FeedbackTimeouts(ci_s=0.05, review_s=0.05, poll_s=0.001)
+    chain.heartbeat = lambda: beats.append(1)
+    started = CodeAgentResult(True, "agent/issue-1", 7, "PR #7", 0)
+    result = chain._iterate(1, None, [], started, None)
+    assert "no feedback" in result.message
+    assert len(beats) > 2  # before polling and at every poll, not only once per round
@@ -0,0 +1,33 @@
+"""Unit tests: incremental FILE-block parsing of streamed patch output."""
+
+import pytest
+from agents.code_agent.file_blocks import DisallowedPathError, FileBlockParser, parse_file_blocks
+
+
+def test_blocks_emitted_as_soon_as_closed() -> None:
+    parser = FileBlockParser({"a.py", "b.py"})
+    assert parser.feed("--- FILE: a.py\nprint(1)\n") == []
+    assert parser.feed("--- END FI") == []
+    assert parser.feed("LE\n--- FILE: b.py\nx = 2") == [("a.py", "print(1)", "file")]
+    assert parser.close() == [("b.py", "x = 2", "file")]
+
+
+def test_next_header_closes_previous_block() -> None:
+    text = "--- FILE: a.py\none\n--- FILE: b.py\ntwo\n--- END FILE\n"
+    assert parse_file_blocks(text, {"a.py", "b.py"}) == {"a.py": "one", "b.py": "two"}
+
+
+def test_disallowed_path_raises_on_header() -> None:
+    parser = FileBlockParser({"a.py"})
+    assert parser.feed("--- FILE: a.py\nok\n--- END FILE\n") == [("a.py", "ok", "file")]
+    with pytest.raises(DisallowedPathError) as err:
+        parser.feed("--- FILE: ../etc/passwd\n")
+    assert err.value.path == "../etc/passwd"
+
+
+def test_edit_blocks_carry_their_kind() -> None:
+    parser = FileBlockParser({"a.py"})
+    text = "--- EDIT: a.py\n<<<<<<< SEARCH\nx = 1\n=======\nx = 2\n>>>>>>> REPLACE\n--- END EDIT\n"
+    [block] = parser.feed(text)
+    assert block.kind == "edit"
+    assert block.content.startswith("<<<<<<< SEARCH")
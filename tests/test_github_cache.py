@@ -0,0 +1,107 @@
+"""Unit tests: GitHub object cache (TTL, ETag revalidation) and request counting."""
+
+import json
+
+import pytest
+from coding_agents.core.cassette import REPLAY, _digest, use_cassette
+from coding_agents.core.github import GitHubClient, github_stats
+from coding_agents.core.github.cache import request_kind
+from coding_agents.core.github.pr import get_pr_context
+
+PULL = {
+    "number": 5,
+    "title": "t",
+    "url": "https://api.github.com/repos/o/r/pulls/5",
+    "base": {"ref": "main"},
+    "head": {"ref": "agent/1"},
+}
+
+
+def _entry(verb, url, status, body="", headers=None):
+    return {
+        "verb": verb,
+        "url": url,
+        "status": status,
+        "headers": {"content-type": "application/json", **(headers or {})},
+        "body": body,
+        "elapsed": 0.0,
+    }
+
+
+@pytest.fixture
+def cassette(tmp_path, monkeypatch):
+    pull = "/repos/o/r/pulls/5"
+    comments = "/repos/o/r/issues/5/comments"
+    http = {
+        _digest("GET", "api.github.com", pull, None): [
+            _entry("GET", pull, 200, json.dumps(PULL), {"etag": '"v1"'}),
+            _entry("GET", pull, 304),
+        ],
+        _digest("POST", "api.github.com", comments, json.dumps({"body": "hi"})): [
+            _entry("POST", comments, 201, json.dumps({"id": 1, "body": "hi"})),
+        ],
+        _digest("GET", "api.github.com", f"{pull}/reviews", None): [
+            _entry(
+                "GET",
+                f"{pull}/reviews",
+                200,
+                json.dumps([{"id": 1, "state": "COMMENTED"}]),
+                {"link": f'<https://api.github.com{pull}/reviews?page=2>; rel="next"'},
+            ),
+        ],
+        _digest("GET", "api.github.com", f"{pull}/reviews?page=2", None): [
+            _entry("GET", f"{pull}/reviews?page=2", 200, json.dumps([{"id": 2}])),
+        ],
+        _digest("GET", "api.github.com", f"{pull}/files", None): [
+            _entry("GET", f"{pull}/files", 200, json.dumps([{"filename": "a.py"}])),
+        ],
+    }
+    path = tmp_path / "gh.json"
+    path.write_text(json.dumps({"version": 1, "llm": {}, "http": http}))
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    with use_cassette(path, REPLAY):
+        yield
+
+
+def test_pull_is_fetched_once_then_revalidated(cassette) -> None:
+    stats = github_stats()
+    before = (stats.by_kind["pull"], stats.hits, stats.not_modified)
+    gh = GitHubClient()
+    gh.cache.ttl_s = 3600
+    first = gh.get_pull("o/r", 5)
+    assert first.title == "t" and first.etag == '"v1"'
+    assert gh.get_pull("o/r", 5) is first  # fresh: no request
+    gh.cache.ttl_s = 0
+    assert gh.get_pull("o/r", 5) is first  # stale: conditional GET answered with 304
+    assert (stats.by_kind["pull"], stats.hits, stats.not_modified) == (
+        before[0] + 2,
+        before[1] + 1,
+        before[2] + 1,
+    )
+
+
+def test_comment_needs_no_repo_or_issue_fetch(cassette) -> None:
+    stats = github_stats()
+    requests = stats.requests
+    assert GitHubClient().create_comment("o/r", 5, "hi").body == "hi"
+    assert stats.requests == requests + 1
+
+
+def test_pages_and_direct_pygithub_calls_are_counted(cassette) -> None:
+    stats = github_stats()
+    requests = stats.requests
+    gh = GitHubClient()
+    assert [r.id for r in gh.get_reviews("o/r", 5)] == [1, 2]
+    assert stats.requests == requests + 2  # one per page
+    lazy = gh._repo_ref("o/r").get_pull(5)  # completed by get_pr_context, not the client
+    requests = stats.requests
+    assert get_pr_context(lazy).changed_files == ["a.py"]
+    assert stats.requests == requests + 2  # the pull itself and its files
+
+
+def test_request_kind() -> None:
+    assert request_kind("https://api.github.com/repos/o/r") == "repo"
+    assert request_kind("/repos/o/r/pulls/5") == "pull"
+    assert request_kind("/repos/o/r/pulls?state=open") == "pulls"
+    assert request_kind("/repos/o/r/issues/5/comments") == "comments"
+    assert request_kind(f"/repos/o/r/commits/{'a' * 40}/check-runs") == "check-runs"
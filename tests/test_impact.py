@@ -0,0 +1,58 @@
+"""Unit tests: test-impact selection from the import graph (cache by blob SHA)."""
+
+import pytest
+from coding_agents.core.index import ImpactMap
+
+
+def _tree(root):
+    files = {
+        "pkg/__init__.py": "",
+        "pkg/core.py": "def f():\n    return 1\n",
+        "pkg/api.py": "from pkg.core import f\n",
+        "pkg/extra.py": "X = 1\n",
+        "tests/conftest.py": "",
+        "tests/test_api.py": "from pkg.api import f\n",
+        "tests/test_extra.py": "import pkg.extra\n",
+        "tests/unit/test_core.py": "from pkg import core\n",
+    }
+    for path, text in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+    return root
+
+
+def test_select_follows_transitive_imports(tmp_path) -> None:
+    impact = ImpactMap.open(_tree(tmp_path))
+    assert impact.select(["pkg/core.py"]) == ["tests/test_api.py", "tests/unit/test_core.py"]
+    assert impact.select(["pkg/extra.py"]) == ["tests/test_extra.py"]
+    assert impact.select(["tests/test_extra.py", "README.md"]) == ["tests/test_extra.py"]
+    assert len(impact.select(["tests/conftest.py"])) == 3
+    assert len(impact.select(["pyproject.toml"])) == 3
+
+
+def test_refresh_recomputes_only_changed_closures(tmp_path) -> None:
+    root = _tree(tmp_path)
+    assert ImpactMap.open(root).recomputed == 3
+    assert ImpactMap.open(root).recomputed == 0
+    (root / "pkg" / "extra.py").write_text("from pkg.core import f\n")
+    impact = ImpactMap.open(root)
+    assert impact.recomputed == 1
+    assert "tests/test_extra.py" in impact.select(["pkg/core.py"])
+
+
+def test_removed_module_selects_its_importers(tmp_path) -> None:
+    root = _tree(tmp_path)
+    ImpactMap.open(root)
+    (root / "pkg" / "extra.py").unlink()
+    assert ImpactMap.open(root).select(["pkg/extra.py"]) == ["tests/test_extra.py"]
+
+
+def test_coverage_adds_node_ids(tmp_path) -> None:
+    coverage = pytest.importorskip("coverage")
+    root = _tree(tmp_path)
+    data = coverage.CoverageData(basename=str(root / ".coverage"))
+    data.set_context("tests/test_extra.py::test_reads_data|run")
+    data.add_lines({str(root / "pkg" / "core.py"): [1, 2]})
+    data.write()
+    impact = ImpactMap.open(root, coverage_file=root / ".coverage")
+    assert impact.select(["pkg/core.py"])[-1] == "tests/test_extra.py::test_reads_data"
@@ -0,0 +1,90 @@
+"""Unit tests: index-backed file inventory (ignores, binary/oversized, incremental cache)."""
+
+import subprocess
+
+from coding_agents.core.git import GitRepo
+from coding_agents.core.git import inventory as inventory_module
+from coding_agents.core.git.inventory import FileInventory
+
+
+def _git(repo, *args):
+    base = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*base, *args], cwd=repo, check=True, capture_output=True)
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "a.py").write_text("x = 1\n")
+    (repo / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0")
+    (repo / "big.txt").write_text("y" * 2_000)
+    (repo / ".gitignore").write_text("node_modules/\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "init")
+    (repo / "node_modules" / "pkg").mkdir(parents=True)
+    (repo / "node_modules" / "pkg" / "index.js").write_text("ignored\n")
+    (repo / "new.py").write_text("z = 1\n")
+    return repo
+
+
+def test_tracked_untracked_binary_and_oversized(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    tracked = FileInventory(repo)
+    tracked.refresh()
+    assert sorted(tracked.entries) == [".gitignore", "big.txt", "logo.png", "src/a.py"]
+    assert tracked.entries["logo.png"].binary
+    assert tracked.paths(max_bytes=1_000) == [".gitignore", "src/a.py"]
+
+    everything = FileInventory(repo, include_untracked=True)
+    everything.refresh()
+    assert "new.py" in everything.entries and everything.entries["new.py"].sha is None
+    assert not any(p.startswith("node_modules") for p in everything.entries)
+    assert GitRepo(repo).list_files() == ["big.txt", "new.py", "src/a.py"]
+
+
+def test_refresh_is_incremental_and_cached_on_disk(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    first = FileInventory(repo)
+    first.refresh()
+    assert first.examined == 4
+
+    again = FileInventory(repo)
+    assert not again.refresh() and again.examined == 0
+
+    (repo / "src" / "a.py").write_text("x = 2\n")
+    _git(repo, "add", "src/a.py")
+    inventory_module._MEMORY.clear()  # as in a new process: only the file cache is left
+    updated = FileInventory(repo)
+    assert updated.refresh()
+    assert updated.examined == 1
+    assert updated.entries["src/a.py"].sha == GitRepo(repo).blob_shas()["src/a.py"]
+
+
+
+
+def test_unchanged_tree_with_untracked_files_is_a_no_op(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    first = FileInventory(repo, include_untracked=True)
+    assert first.refresh()
+    assert (repo / ".coding-agents" / "inventory.json").exists()
+    again = FileInventory(repo, include_untracked=True)
+    assert not again.refresh() and again.examined == 0
+    assert not any(p.startswith(".coding-agents") for p in again.entries)
+
+def test_files_outside_sparse_checkout_keep_size_and_binary_flag(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    _git(repo, "sparse-checkout", "set", "--no-cone", "/src/")
+    assert not (repo / "logo.png").exists()
+    inventory = FileInventory(repo)
+    inventory.refresh()
+    logo, big = inventory.entries["logo.png"], inventory.entries["big.txt"]
+    assert logo.sparse and logo.binary and logo.size == 11
+    assert big.sparse and not big.binary and big.size == 2_000
+    assert inventory.paths(max_bytes=1_000) == [".gitignore", "src/a.py"]
+
+def test_outside_git_checkout_walks_tree(tmp_path) -> None:
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "b.py").write_text("")
+    assert GitRepo(tmp_path).list_files() == ["a.py"]
@@ -0,0 +1,61 @@
+"""Unit tests: async and streaming LLM interface (ainvoke, stream, async context)."""
+
+import json
+from typing import Any
+
+import httpx
+from coding_agents.core.llm.base import BaseLLM, LLMResult
+from coding_agents.core.llm.yandex_adapter import YandexLLM
+
+
+class EchoLLM(BaseLLM):
+    """Sync-only adapter: relies on the default ainvoke offload."""
+
+    closed = False
+
+    @property
+    def model_name(self) -> str:
+        return "echo"
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        return LLMResult(content=prompt.upper(), model="echo")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+async def test_default_ainvoke_and_async_context() -> None:
+    async with EchoLLM() as llm:
+        result = await llm.ainvoke("hi")
+    assert result.content == "HI"
+    assert llm.closed  # type: ignore[attr-defined]
+
+
+async def test_yandex_ainvoke_uses_async_pool() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json={"result": {"alternatives": [{"message": {"text": "pong"}}]}}
+        )
+
+    llm = YandexLLM(api_key="k", folder_id="f")
+    llm._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    result = await llm.ainvoke("ping")
+    assert result.content == "pong"
+    await llm.aclose()
+    assert llm._async_client is None
+
+
+def test_yandex_stream_yields_deltas() -> None:
+    lines = [
+        {"result": {"alternatives": [{"message": {"text": "He"}}]}},
+        {"result": {"alternatives": [{"message": {"text": "Hello"}}]}},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["completionOptions"]["stream"] is True
+        return httpx.Response(200, text=body)
+
+    llm = YandexLLM(api_key="k", folder_id="f")
+    llm._client = httpx.Client(transport=httpx.MockTransport(handler))
+    assert list(llm.stream("hi")) == ["He", "llo"]
@@ -0,0 +1,64 @@
+"""Unit tests: on-disk LLM response cache (keys, hit/miss, TTL, LRU eviction)."""
+
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult
+from coding_agents.core.llm.cache import CachedLLM, DiskCache, cache_key
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @property
+    def model_name(self) -> str:
+        return "m"
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        self.calls += 1
+        return LLMResult(content=f"answer:{prompt}", model="m")
+
+
+def test_cache_key_depends_on_all_inputs() -> None:
+    base = cache_key("openai", "m", 0.2, "p")
+    assert base == cache_key("openai", "m", 0.2, "p")
+    assert base != cache_key("yandex", "m", 0.2, "p")
+    assert base != cache_key("openai", "m", 0.1, "p")
+    assert base != cache_key("openai", "m", 0.2, "q")
+
+
+def test_cached_llm_hits_and_misses(tmp_path: Path) -> None:
+    inner = CountingLLM()
+    llm = CachedLLM(inner, provider="openai", temperature=0.2, cache=DiskCache(tmp_path))
+    assert llm.invoke("x").content == "answer:x"
+    assert llm.invoke("x").content == "answer:x"
+    llm.invoke("x", temperature=0.9)
+    assert inner.calls == 2
+    assert llm.cache.stats.hits == 1
+    assert llm.cache.stats.misses == 2
+
+
+def test_ttl_expiry(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path, ttl_seconds=0.01)
+    cache.put("ab" * 32, {"content": "c", "model": "m", "usage": None})
+    time.sleep(0.02)
+    assert cache.get("ab" * 32) is None
+    assert cache.stats.expired == 1
+
+
+def test_lru_eviction_keeps_recent(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path)
+    value = {"content": "x" * 100, "model": "m", "usage": None}
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    for n, key in enumerate(keys):
+        cache.put(key, value)
+        os.utime(cache._path(key), (n, n))
+    cache.get(keys[0])  # bump to most recent
+    cache.max_bytes = int(cache._path(keys[0]).stat().st_size * 3.5)
+    cache.put("ff" * 32, value)
+    assert cache.stats.evictions == 1
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
@@ -0,0 +1,113 @@
+"""Unit tests: hedged requests, failover and circuit breaking."""
+
+import time
+from typing import Any
+
+import pytest
+from coding_agents.core.llm.base import BaseLLM, LLMResult
+from coding_agents.core.llm.failover import (
+    CircuitBreaker,
+    HedgedLLM,
+    LatencyHistogram,
+    provider_health,
+)
+
+
+class FakeLLM(BaseLLM):
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False) -> None:
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.name
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return LLMResult(content=self.name, model=self.name)
+
+
+def _unique(name: str) -> str:
+    return f"{name}-{time.monotonic_ns()}"
+
+
+def test_histogram_percentile_needs_samples() -> None:
+    hist = LatencyHistogram(min_samples=3)
+    hist.record(1.0)
+    assert hist.percentile(95) is None
+    hist.record(2.0)
+    hist.record(3.0)
+    assert hist.percentile(50) == 2.0
+
+
+def test_breaker_opens_and_half_opens() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()  # single trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failover_on_error() -> None:
+    primary, backup = FakeLLM("p", fail=True), FakeLLM("b")
+    llm = HedgedLLM([(_unique("p"), primary), (_unique("b"), backup)], initial_hedge_after=5)
+    assert llm.invoke("x").content == "b"
+
+
+def test_hedge_fires_on_slow_primary() -> None:
+    primary, backup = FakeLLM("p", delay=0.5), FakeLLM("b")
+    llm = HedgedLLM([(_unique("p"), primary), (_unique("b"), backup)], initial_hedge_after=0.05)
+    started = time.monotonic()
+    assert llm.invoke("x").content == "b"
+    assert time.monotonic() - started < 0.4
+
+
+def test_open_breaker_skips_member() -> None:
+    name = _unique("p")
+    breaker = provider_health(name).breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    primary, backup = FakeLLM("p"), FakeLLM("b")
+    llm = HedgedLLM([(name, primary), (_unique("b"), backup)])
+    assert llm.invoke("x").content == "b"
+    assert primary.calls == 0
+
+
+def test_half_open_member_not_launched_keeps_its_trial() -> None:
+    name = _unique("b")
+    breaker = provider_health(name).breaker
+    breaker.reset_timeout = 0.01
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    time.sleep(0.02)
+    primary, backup = FakeLLM("p"), FakeLLM("b")
+    llm = HedgedLLM([(_unique("p"), primary), (name, backup)], initial_hedge_after=5)
+    assert llm.invoke("x").content == "p"
+    assert backup.calls == 0
+    # Ranking the backup did not use up its trial call: it is still eligible.
+    assert breaker.state == CircuitBreaker.OPEN and breaker.available()
+    llm = HedgedLLM([(name, backup)])
+    assert llm.invoke("x").content == "b"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_async_hedge() -> None:
+    primary, backup = FakeLLM("p", delay=0.5), FakeLLM("b")
+    llm = HedgedLLM([(_unique("p"), primary), (_unique("b"), backup)], initial_hedge_after=0.05)
+    assert (await llm.ainvoke("x")).content == "b"
+
+
+def test_all_fail_raises() -> None:
+    llm = HedgedLLM([(_unique("p"), FakeLLM("p", fail=True))])
+    with pytest.raises(RuntimeError, match="All LLM providers failed"):
+        llm.invoke("x")
@@ -0,0 +1,54 @@
+"""Unit tests: latency, TTFT and token usage reported in LLMResult."""
+
+import json
+from types import SimpleNamespace
+
+import httpx
+from coding_agents.core.llm.base import StreamCapture
+from coding_agents.core.llm.openai_adapter import _usage
+from coding_agents.core.llm.yandex_adapter import YandexLLM
+
+_USAGE = {"inputTextTokens": "12", "completionTokens": "3", "totalTokens": "15"}
+
+
+def test_yandex_invoke_reports_usage_and_latency() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = {"result": {"alternatives": [{"message": {"text": "pong"}}], "usage": _USAGE}}
+        return httpx.Response(200, json=body)
+
+    llm = YandexLLM(api_key="k", folder_id="f")
+    llm._client = httpx.Client(transport=httpx.MockTransport(handler))
+    result = llm.invoke("ping")
+    assert (result.prompt_tokens, result.completion_tokens, result.total_tokens) == (12, 3, 15)
+    assert result.latency_s is not None and result.ttft_s is None
+
+
+def test_yandex_stream_returns_result_with_ttft() -> None:
+    lines = [
+        {"result": {"alternatives": [{"message": {"text": "He"}}]}},
+        {"result": {"alternatives": [{"message": {"text": "Hello"}}], "usage": _USAGE}},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text="\n".join(json.dumps(line) for line in lines))
+
+    llm = YandexLLM(api_key="k", folder_id="f")
+    llm._client = httpx.Client(transport=httpx.MockTransport(handler))
+    capture = StreamCapture(llm.stream("hi"))
+    assert "".join(capture) == "Hello"
+    assert capture.result is not None
+    assert capture.result.content == "Hello"
+    assert capture.result.total_tokens == 15
+    assert capture.result.ttft_s is not None
+    assert capture.result.ttft_s <= capture.result.latency_s  # type: ignore[operator]
+
+
+def test_openai_usage_from_message_metadata() -> None:
+    message = SimpleNamespace(usage_metadata={"input_tokens": 5, "output_tokens": 7})
+    assert _usage(message) == {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}
+    legacy = SimpleNamespace(
+        usage_metadata=None,
+        response_metadata={"token_usage": {"prompt_tokens": 1, "completion_tokens": 2}},
+    )
+    assert _usage(legacy) == {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}
+    assert _usage(SimpleNamespace()) is None
@@ -0,0 +1,82 @@
+"""Unit tests: adaptive rate limiting (token buckets, AIMD, Retry-After)."""
+
+import time
+from typing import Any
+
+from coding_agents.core.llm.base import BaseLLM, LLMResult
+from coding_agents.core.llm.ratelimit import (
+    RateLimitedLLM,
+    RateLimiter,
+    ThrottledError,
+    parse_retry_after,
+)
+
+
+class FlakyLLM(BaseLLM):
+    """Throttles the first `throttles` calls."""
+
+    def __init__(self, throttles: int, retry_after: float | None = None) -> None:
+        self.throttles = throttles
+        self.retry_after = retry_after
+        self.calls = 0
+
+    @property
+    def model_name(self) -> str:
+        return "flaky"
+
+    def invoke(self, prompt: str, **kwargs: Any) -> LLMResult:
+        self.calls += 1
+        if self.calls <= self.throttles:
+            raise ThrottledError("429", self.retry_after)
+        return LLMResult(content="ok", model="flaky", usage={"total_tokens": 10})
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+
+
+def test_aimd_window() -> None:
+    limiter = RateLimiter(initial_concurrency=4)
+    limiter.on_throttle(None)
+    assert limiter.concurrency == 2
+    limiter.acquire()
+    limiter.release(ok=True)
+    assert limiter.concurrency == 2.5
+    assert limiter.stats.throttled == 1
+    assert limiter.stats.acquired == 1
+
+
+def test_rps_bucket_spaces_requests() -> None:
+    limiter = RateLimiter(requests_per_second=20)
+    started = time.monotonic()
+    for _ in range(22):
+        limiter.acquire()
+        limiter.release(ok=True)
+    assert time.monotonic() - started >= 0.08
+    assert limiter.stats.max_wait > 0
+
+
+def test_retries_throttled_call_honouring_retry_after() -> None:
+    inner = FlakyLLM(throttles=1, retry_after=0.05)
+    llm = RateLimitedLLM(inner, RateLimiter(), max_retries=2)
+    started = time.monotonic()
+    result = llm.invoke("x")
+    assert result.content == "ok"
+    assert inner.calls == 2
+    assert result.retries == 1
+    assert result.queue_wait_s >= 0.04
+    assert time.monotonic() - started >= 0.05
+    assert llm.limiter.in_flight == 0
+
+
+def test_gives_up_after_max_retries() -> None:
+    llm = RateLimitedLLM(FlakyLLM(throttles=5, retry_after=0), RateLimiter(), max_retries=1)
+    try:
+        llm.invoke("x")
+    except ThrottledError:
+        pass
+    else:
+        raise AssertionError("expected ThrottledError")
+    assert llm.limiter.stats.throttled == 2
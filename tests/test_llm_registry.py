@@ -0,0 +1,45 @@
+"""Unit tests: LLM registry memoization and pooled client lifecycle."""
+
+import asyncio
+
+import pytest
+from coding_agents.core.llm.registry import aclose_async_pools, close_llms, get_llm
+
+
+@pytest.fixture(autouse=True)
+def _yandex_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("YANDEX_API_KEY", "test-key")
+    monkeypatch.setenv("YANDEX_FOLDER_ID", "test-folder")
+    close_llms()
+
+
+def test_get_llm_memoized_per_key() -> None:
+    a = get_llm(provider="yandex", temperature=0.2)
+    b = get_llm(provider="yandex", temperature=0.2)
+    c = get_llm(provider="yandex", temperature=0.1)
+    assert a is b
+    assert a is not c
+
+
+def test_close_llms_releases_pool() -> None:
+    llm = get_llm(provider="yandex")
+    client = llm.inner.client  # type: ignore[attr-defined]
+    close_llms()
+    assert client.is_closed
+    assert get_llm(provider="yandex") is not llm
+
+
+def test_async_pools_do_not_outlive_their_event_loop() -> None:
+    llm = get_llm(provider="yandex")
+
+    async def run() -> object:
+        client = llm.inner.async_client  # type: ignore[attr-defined]
+        await aclose_async_pools()
+        return client
+
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+    assert first is not second and first.is_closed  # type: ignore[attr-defined]
+    sync = llm.inner.client  # type: ignore[attr-defined]
+    asyncio.run(aclose_async_pools())
+    assert not sync.is_closed and get_llm(provider="yandex") is llm
@@ -0,0 +1,106 @@
+"""Unit tests: cached bare mirrors, sparse partial checkouts, on-demand materialization."""
+
+import subprocess
+
+import pytest
+from coding_agents.core.git import GitRepo
+from coding_agents.core.git.inventory import FileInventory
+from coding_agents.core.git.mirrors import RepoMirrors, auth_env, sparse_pattern
+
+
+def _git(repo, *args):
+    base = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    return subprocess.run(
+        [*base, *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def mirrors(tmp_path, monkeypatch):
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GITHUB_REPOSITORY", raising=False)
+    upstream = tmp_path / "upstream" / "acme" / "app"
+    (upstream / "src" / "pkg").mkdir(parents=True)
+    (upstream / "README.md").write_text("app\n")
+    (upstream / "src" / "pkg" / "a.py").write_text("x = 1\n")
+    (upstream / "src" / "pkg" / "b.py").write_text("y = 1\n")
+    _git(upstream, "init", "-q", "-b", "main")
+    _git(upstream, "config", "uploadpack.allowFilter", "true")
+    _git(upstream, "add", "-A")
+    _git(upstream, "commit", "-qm", "init")
+    url = f"file://{tmp_path}/upstream/{{repo}}"
+    return RepoMirrors(tmp_path / "mirrors", url=url, ttl_s=3600, token="")
+
+
+def _blobs(repo) -> int:
+    objects = _git(repo, "cat-file", "--batch-all-objects", "--batch-check")
+    return sum(1 for line in objects.splitlines() if line.split()[1] == "blob")
+
+
+def test_mirror_is_blobless_and_fetched_incrementally(mirrors, tmp_path) -> None:
+    mirror = mirrors.mirror("acme/app")
+    assert _git(mirror, "rev-parse", "--is-bare-repository") == "true"
+    assert _blobs(mirror) == 0
+    assert mirrors.mirror("acme/app") == mirror and mirrors.fetches == 1  # within TTL
+
+    upstream = tmp_path / "upstream" / "acme" / "app"
+    (upstream / "c.py").write_text("z = 1\n")
+    _git(upstream, "add", "c.py")
+    _git(upstream, "commit", "-qm", "more")
+    mirrors.mirror("acme/app", refresh=True)
+    assert mirrors.fetches == 2
+    assert _git(mirror, "rev-parse", "main") == _git(upstream, "rev-parse", "HEAD")
+
+
+def test_sparse_checkout_materializes_on_demand(mirrors) -> None:
+    checkout = mirrors.checkout("acme/app", paths=["src/pkg/a.py"])
+    assert (checkout / "README.md").exists() and (checkout / "src/pkg/a.py").exists()
+    assert not (checkout / "src/pkg/b.py").exists()
+
+    git = GitRepo(checkout)
+    # The whole tree is listed from the index; indexes only see what is on disk.
+    assert git.list_files() == ["README.md", "src/pkg/a.py", "src/pkg/b.py"]
+    assert sorted(git.blob_shas()) == ["README.md", "src/pkg/a.py"]
+    # Not fetched just to be listed: size unknown until the file is checked out.
+    fetched = _blobs(checkout)
+    inventory = FileInventory(checkout)
+    inventory.refresh()
+    assert inventory.entries["src/pkg/b.py"].size == -1 and _blobs(checkout) == fetched
+
+    git.materialize(["src/pkg/b.py", "src/pkg/new.py"])
+    assert (checkout / "src/pkg/b.py").read_text() == "y = 1\n"
+    assert "src/pkg/b.py" in git.blob_shas()
+    mirrors.remove(checkout)
+    assert not checkout.exists()
+
+
+def test_commit_and_push_from_checkout_go_upstream(mirrors, tmp_path) -> None:
+    checkout = mirrors.checkout("acme/app")
+    git = GitRepo(checkout)
+    git.create_branch("agent/1")
+    git.materialize(["src/pkg/a.py"])
+    git.write_file("src/pkg/a.py", "x = 2\n")
+    sha = git.commit("change", ["src/pkg/a.py"])
+    assert _git(checkout, "diff", "--name-only", "HEAD~1", "HEAD") == "src/pkg/a.py"
+    git.push("origin", "agent/1")
+    upstream = tmp_path / "upstream" / "acme" / "app"
+    assert _git(upstream, "rev-parse", "agent/1") == sha
+
+
+def test_sparse_pattern_escapes_wildcards() -> None:
+    assert sparse_pattern("docs/[draft]*.md") == "/docs/\\[draft]\\*.md"
+
+
+def test_token_is_scoped_to_the_command_not_stored(mirrors, monkeypatch) -> None:
+    monkeypatch.delenv("GIT_CONFIG_COUNT", raising=False)
+    env = auth_env("tok", "https://github.com/acme/app.git")
+    assert env["GIT_CONFIG_COUNT"] == "1"
+    assert env["GIT_CONFIG_KEY_0"] == "http.https://github.com/.extraheader"
+    assert env["GIT_CONFIG_VALUE_0"].startswith("AUTHORIZATION: basic ")
+    assert auth_env(None) == {} and auth_env("tok", "file:///tmp/x") == {}
+
+    mirrors.token = "tok"
+    checkout = mirrors.checkout("acme/app")
+    for config in [checkout / ".git" / "config", mirrors.mirror_path("acme/app") / "config"]:
+        text = config.read_text()
+        assert "extraheader" not in text and env["GIT_CONFIG_VALUE_0"] not in text
@@ -0,0 +1,126 @@
+"""Unit tests: commits built with git plumbing (no checkout, bare repos, ref CAS, push)."""
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from coding_agents.core.git import GitRepo
+from coding_agents.core.git.plumbing import CommitBuilder
+from git.exc import GitCommandError
+
+
+def _git(repo, *args):
+    base = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    return subprocess.run(
+        [*base, *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "a.py").write_text("x = 1\n")
+    (repo / "old.py").write_text("gone\n")
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "init")
+    return repo
+
+
+@pytest.fixture(autouse=True)
+def _identity(monkeypatch):
+    for var in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(var, "t")
+    for var in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, "t@t")
+
+
+def test_commit_leaves_checkout_and_index_alone(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    head = _git(repo, "rev-parse", "HEAD")
+    sha = GitRepo(repo).commit_files(
+        {"src/a.py": "x = 2\n", "new/b.py": "y = 1\n", "old.py": None}, "patch"
+    )
+    assert _git(repo, "rev-parse", f"{sha}^") == head
+    assert _git(repo, "show", f"{sha}:src/a.py") == "x = 2"
+    assert _git(repo, "ls-tree", "-r", "--name-only", sha).split() == ["new/b.py", "src/a.py"]
+    # HEAD, index and working tree are untouched.
+    assert _git(repo, "rev-parse", "HEAD") == head
+    assert _git(repo, "status", "--porcelain") == ""
+    assert (repo / "src" / "a.py").read_text() == "x = 1\n"
+
+
+def test_edits_keep_the_mode_of_existing_paths(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    (repo / "bin").mkdir()
+    (repo / "bin" / "run.sh").write_text("#!/bin/sh\n")
+    (repo / "bin" / "run.sh").chmod(0o755)
+    (repo / "link").symlink_to("old.py")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "modes")
+    sha = GitRepo(repo).commit_files(
+        {"bin/run.sh": "#!/bin/sh\nexit 0\n", "link": "src/a.py", "bin/new.sh": "echo\n"}, "patch"
+    )
+    modes = {
+        line.split("\t")[1]: line.split()[0]
+        for line in _git(repo, "ls-tree", "-r", sha).splitlines()
+    }
+    assert modes["bin/run.sh"] == "100755"
+    assert modes["link"] == "120000"
+    assert modes["bin/new.sh"] == "100644"
+    assert _git(repo, "show", f"{sha}:bin/run.sh") == "#!/bin/sh\nexit 0"
+
+
+
+def test_paths_with_tabs_and_newlines(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    odd = ["docs/a\tb.md", "docs/line\nbreak.md"]
+    sha = GitRepo(repo).commit_files({odd[0]: "tab\n", odd[1]: "newline\n"}, "patch")
+    listed = _git(repo, "ls-tree", "-r", "-z", "--name-only", sha).split("\0")
+    assert sorted(p for p in listed if p.startswith("docs/")) == odd
+    assert _git(repo, "cat-file", "blob", f"{sha}:{odd[0]}") == "tab"
+
+def test_concurrent_commits_on_bare_mirror(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    bare = tmp_path / "mirror.git"
+    _git(tmp_path, "clone", "-q", "--bare", str(repo), str(bare))
+    mirror = GitRepo(bare)
+
+    def run(i: int) -> str:
+        return mirror.commit_files({f"f{i}.py": f"{i}\n"}, f"run {i}", base="main", branch=f"b{i}")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        shas = list(pool.map(run, range(8)))
+    assert len(set(shas)) == 8
+    for i, sha in enumerate(shas):
+        assert _git(bare, "rev-parse", f"b{i}") == sha
+        assert _git(bare, "show", f"{sha}:f{i}.py") == str(i)
+
+
+def test_update_ref_refuses_to_overwrite_moved_branch(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    first, second = CommitBuilder(repo), CommitBuilder(repo)
+    first.write("a.txt", "1")
+    second.write("a.txt", "2")
+    first.update_ref("feature", first.commit("one"))
+    with pytest.raises(GitCommandError):
+        second.update_ref("feature", second.commit("two"))
+    # The branch moved past base: the winner's commit stays.
+    first.write("a.txt", "3")
+    again = first.commit("three")
+    with pytest.raises(GitCommandError):
+        first.update_ref("feature", again)
+    first.update_ref("feature", again, force=True)
+    assert _git(repo, "rev-parse", "feature") == again
+
+
+def test_push_commit_without_checkout(tmp_path) -> None:
+    repo = _repo(tmp_path)
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", str(remote))
+    _git(repo, "remote", "add", "origin", str(remote))
+    git = GitRepo(repo)
+    sha = git.commit_files({"src/a.py": "x = 3\n"}, "patch")
+    git.push("origin", "agent/1", source=sha)
+    assert _git(remote, "rev-parse", "refs/heads/agent/1") == sha
+    assert git.repo.active_branch.name == "main"
@@ -0,0 +1,45 @@
+"""Unit tests: token-aware prompt budgeting."""
+
+from coding_agents.core.prompts.budget import CharTokenCounter, Section, render_prompt
+
+COUNTER = CharTokenCounter(chars_per_token=1.0)
+TEMPLATE = "T:{title}|B:{body}|F:{files}"
+
+
+def test_everything_fits() -> None:
+    prompt, report, kept = render_prompt(
+        TEMPLATE,
+        COUNTER,
+        100,
+        fixed={"title": "t"},
+        sections=[Section("body", ["hello"], 0), Section("files", ["a", "b"], 1)],
+    )
+    assert prompt == "T:t|B:hello|F:a\nb"
+    assert report.dropped == {"body": 0, "files": 0}
+    assert kept["files"] == ["a", "b"]
+
+
+def test_priority_order_and_drops_reported() -> None:
+    skeleton = len(TEMPLATE.format(title="t", body="", files=""))
+    prompt, report, kept = render_prompt(
+        TEMPLATE,
+        COUNTER,
+        skeleton + 8,
+        fixed={"title": "t"},
+        sections=[
+            Section("files", ["aaa", "bbb", "ccc"], 1),
+            Section("body", ["0123456789"], 0, truncate=True),
+        ],
+    )
+    assert kept["body"] == ["01234567"]
+    assert kept["files"] == []
+    assert report.truncated == ["body"]
+    assert report.as_dict()["dropped"] == {"files": 3}
+    assert len(prompt) <= skeleton + 8
+
+
+def test_empty_placeholder_when_all_dropped() -> None:
+    prompt, _, _ = render_prompt(
+        "{files}", COUNTER, 0, fixed={}, sections=[Section("files", ["x"], 0, empty="(none)")]
+    )
+    assert prompt == "(none)"
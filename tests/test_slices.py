@@ -0,0 +1,56 @@
+"""Unit tests: AST-sliced file windows and anchoring edits through slice regions."""
+
+from agents.code_agent.edits import SearchReplace, apply_edits
+from coding_agents.core.index import slice_source
+from coding_agents.core.index.slices import SLICE_MIN_LINES
+
+
+def _module(n_funcs: int) -> str:
+    funcs = [
+        f"def helper_{i}(x):\n    y = x + {i}\n    y *= 2\n    return y\n\n" for i in range(n_funcs)
+    ]
+    tail = (
+        "def parse_config(path):\n    y = len(os.path.basename(path))\n    y *= 2\n    return y\n"
+    )
+    return "import os\n\n\n" + "\n".join(funcs) + tail
+
+
+def test_small_files_are_sent_whole() -> None:
+    source = "def f():\n    return 1\n"
+    view = slice_source("m.py", source, "parse config")
+    assert not view.sliced
+    assert view.text == source
+
+
+def test_unrelated_bodies_collapse_to_signatures() -> None:
+    source = _module(40)
+    assert source.count("\n") > SLICE_MIN_LINES
+    view = slice_source("m.py", source, "Fix parse_config for relative paths")
+    assert view.sliced
+    assert view.selected == ("parse_config",)
+    assert "def helper_3(x):\n    ...  # lines" in view.text
+    assert "y = x + 3" not in view.text
+    assert "def parse_config(path):\n    y = len(os.path.basename(path))" in view.text
+    lines = source.split("\n")
+    for a, b in view.regions:
+        assert "\n".join(lines[a - 1 : b]) in view.text
+
+
+def test_slices_are_cached_per_blob_sha() -> None:
+    source = _module(40)
+    first = slice_source("m.py", source, "parse config")
+    again = slice_source("other.py", source, "parse config")
+    assert again.text == first.text and again.sha == first.sha
+    assert again.path == "other.py"
+
+
+def test_regions_disambiguate_repeated_anchor() -> None:
+    source = _module(40)
+    view = slice_source("m.py", source, "parse config")
+    edit = SearchReplace("    y *= 2\n    return y", "    return y * 3")
+    assert "matches 41 places" in apply_edits("m.py", source, [edit]).conflicts[0].reason
+    # Only parse_config's copy was shown to the model, so that is the one edited.
+    result = apply_edits("m.py", source, [edit], view.regions)
+    assert result.conflicts == []
+    assert result.content.endswith("basename(path))\n    return y * 3\n")
+    assert result.content.count("y *= 2") == 40
@@ -0,0 +1,92 @@
+"""Unit tests: speculative patch candidates (local checks, scoring, early exit)."""
+
+import asyncio
+import subprocess
+
+from agents.code_agent.checks import compile_check, run_checks
+from agents.code_agent.speculative import Candidate, Variant, speculate
+from coding_agents.core.git import WorktreePool
+from coding_agents.core.llm.base import BaseLLM, LLMResult
+
+
+class FakeLLM(BaseLLM):
+    def __init__(self, answer: str, delay: float = 0.0) -> None:
+        self.answer = answer
+        self.delay = delay
+        self.cancelled = False
+
+    def invoke(self, prompt: str, **kwargs: object) -> LLMResult:
+        return LLMResult(content=self.answer, model="fake")
+
+    async def ainvoke(self, prompt: str, **kwargs: object) -> LLMResult:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return LLMResult(content=self.answer, model="fake")
+
+    @property
+    def model_name(self) -> str:
+        return "fake"
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("x = 1\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run([*git, "add", "-A"], cwd=repo, check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], cwd=repo, check=True)
+    return repo
+
+
+def _resolve(answer: str) -> dict[str, str]:
+    if answer == "conflict":
+        raise ValueError("SEARCH text not found")
+    if answer == "unwritable":
+        return {"a.py/b.py": "x = 1\n"}  # a.py is a file: writing the candidate fails
+    return {"a.py": answer}
+
+
+def test_compile_check_reports_syntax_errors(tmp_path) -> None:
+    (tmp_path / "ok.py").write_text("x = 1\n")
+    (tmp_path / "bad.py").write_text("def f(:\n")
+    result = compile_check(tmp_path, ["ok.py", "bad.py", "notes.md"])
+    assert not result.ok and result.problems == 1
+    assert result.output.startswith("bad.py:1: SyntaxError")
+    assert [r.tool for r in run_checks(tmp_path, ["ok.py"], ("compile",))] == ["compile"]
+
+
+async def test_first_clean_candidate_wins_and_cancels_rest(tmp_path) -> None:
+    pool = WorktreePool(_repo(tmp_path), size=3, root=tmp_path / "scratch")
+    slow = FakeLLM("x = 3\n", delay=5)
+    variants = [
+        Variant("broken", FakeLLM("x = (\n"), 0.2),
+        Variant("good", FakeLLM("x = 2\n", delay=0.05), 0.5),
+        Variant("slow", slow, 0.8),
+    ]
+    winner, scored = await speculate("p", variants, _resolve, pool, tools=("compile",))
+    assert winner.label == "good" and winner.passed
+    assert [c.label for c in scored] == ["broken", "good"]
+    assert slow.cancelled
+    assert pool.leased == 0
+    # Scratch checks never touch the main checkout.
+    assert (tmp_path / "repo" / "a.py").read_text() == "x = 1\n"
+
+
+async def test_best_scored_candidate_when_none_passes(tmp_path) -> None:
+    pool = WorktreePool(_repo(tmp_path), size=2, root=tmp_path / "scratch")
+    variants = [
+        Variant("conflict", FakeLLM("conflict"), 0.2),
+        Variant("unwritable", FakeLLM("unwritable", delay=0.02), 0.3),
+        Variant("broken", FakeLLM("x = (\n", delay=0.1), 0.5),
+    ]
+    winner, scored = await speculate("p", variants, _resolve, pool, tools=("compile",))
+    assert winner.label == "broken"
+    assert Candidate.score(scored[0]) > Candidate.score(scored[2])
+    assert "SEARCH text not found" in scored[0].summary()
+    # A candidate that fails while being checked is scored, not raised.
+    assert scored[1].label == "unwritable" and scored[1].error
+    assert pool.leased == 0
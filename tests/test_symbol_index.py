@@ -0,0 +1,46 @@
+"""Unit tests: persistent symbol / import-graph index."""
+
+import subprocess
+
+from coding_agents.core.index import SymbolIndex
+from coding_agents.core.index.symbols import parse_source, terms
+
+
+def _repo(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "limiter.py").write_text(
+        "class RateLimiter:\n    def acquire(self):\n        pass\n"
+    )
+    (tmp_path / "pkg" / "client.py").write_text(
+        "from .limiter import RateLimiter\n\ndef fetch():\n    return RateLimiter()\n"
+    )
+    (tmp_path / "README.md").write_text("docs\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+    return tmp_path
+
+
+def test_parse_source_resolves_relative_imports() -> None:
+    symbols, imports = parse_source("pkg/client.py", "from .limiter import RateLimiter\n")
+    assert symbols == []
+    assert "pkg.limiter" in imports
+
+
+def test_terms_split_identifiers() -> None:
+    assert {"rate", "limiter", "ratelimiter"} <= terms("RateLimiter")
+
+
+def test_index_graph_rank_and_incremental_refresh(tmp_path) -> None:
+    root = _repo(tmp_path)
+    index = SymbolIndex.open(root)
+    assert index.reparsed == 4
+    assert ("class", "RateLimiter", 1) in index.symbols_of("pkg/limiter.py")
+    assert index.importers_of("pkg/limiter.py") == {"pkg/client.py"}
+    assert index.rank("Rate limiter is too slow")[0][0] == "pkg/limiter.py"
+
+    (root / "pkg" / "client.py").write_text("def fetch_all():\n    return []\n")
+    again = SymbolIndex.open(root)
+    assert again.reparsed == 1
+    assert again.importers_of("pkg/limiter.py") == set()
+    assert again.index_path.exists()
@@ -0,0 +1,83 @@
+"""Unit tests: git worktree pool (leases, reset between leases, bound, reclamation, refresh)."""
+
+import gc
+import subprocess
+import threading
+
+import pytest
+from coding_agents.core.git import WorktreePool
+from coding_agents.core.git.worktrees import PoolExhaustedError
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("x = 1\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run([*git, "add", "-A"], cwd=repo, check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], cwd=repo, check=True)
+    return repo
+
+
+def test_lease_is_reset_between_runs(tmp_path) -> None:
+    pool = WorktreePool(_repo(tmp_path), size=1)
+    with pool.lease() as path:
+        (path / "a.py").write_text("x = 2\n")
+        (path / "new.py").write_text("junk\n")
+        (path / ".coding-agents").mkdir()
+        (path / ".coding-agents" / "symbols.json").write_text("{}")
+    with pool.lease() as again:
+        assert again == path
+        assert (again / "a.py").read_text() == "x = 1\n"
+        assert not (again / "new.py").exists()
+        assert (again / ".coding-agents" / "symbols.json").exists()  # index cache survives
+
+
+def test_pool_is_bounded_and_blocks(tmp_path) -> None:
+    pool = WorktreePool(_repo(tmp_path), size=2)
+    first, second = pool.acquire(), pool.acquire()
+    assert first.path != second.path
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire(timeout=0.05)
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    third = pool.acquire(timeout=5)
+    assert third.path == first.path
+    pool.release(second)
+    pool.release(third)
+    assert pool.leased == 0
+
+
+def test_leaked_leases_are_reclaimed_overdue_ones_are_not(tmp_path, caplog) -> None:
+    repo = _repo(tmp_path)
+    pool = WorktreePool(repo, size=1)
+    pool.acquire()  # dropped without release
+    gc.collect()
+    assert pool.leased == 0
+    held = pool.acquire()
+    pool.max_lease_s = 0.0
+    # Overdue but still held: reported, never handed to someone else.
+    with caplog.at_level("WARNING"), pytest.raises(PoolExhaustedError):
+        pool.acquire(timeout=0.05)
+    assert pool.overdue == 1 and "without refresh" in caplog.text
+    pool.max_lease_s = 3600.0
+    held.refresh()
+    assert pool.refresh(held.path, held.token)
+    pool.release(held)
+    assert not pool.refresh(held.path, held.token)
+    # A new pool adopts the worktrees left on disk instead of adding more.
+    assert WorktreePool(repo, size=1).acquire(timeout=1).path == held.path
+
+
+def test_serve_keeps_one_pool_per_repository(tmp_path) -> None:
+    pytest.importorskip("fastapi")
+    from coding_agents.cli import serve
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first, second = _repo(tmp_path / "a"), _repo(tmp_path / "b")
+    (first / "pkg").mkdir()
+    pool = serve._worktrees(first)
+    assert serve._worktrees(first / "pkg") is pool
+    assert serve._worktrees(second).repo.working_tree_dir == str(second.resolve())
+    serve._pools.clear()